@@ -13,6 +13,8 @@ public class MenuSystem
     
     public async Task Run()
     {
+        await using var _ = _pythonBridge;
+        
         while (true)
         {
             Console.Clear();
@@ -28,7 +30,7 @@ public class MenuSystem
             }
             catch (Exception ex)
             {
-                AnsiConsole.MarkupLine($"[red]❌ Error: {ex.Message}[/]");
+                AnsiConsole.MarkupLine($"[red]❌ Error: {Markup.Escape(ex.Message)}[/]");
                 AnsiConsole.MarkupLine("[yellow]Lihat logs/setup.log untuk detail[/]");
                 ConsoleHelper.PressEnterToContinue();
             }
@@ -139,22 +141,16 @@ public class MenuSystem
     
     private async Task ExecuteSetupChoice(string choice)
     {
-        await AnsiConsole.Status()
-            .Spinner(Spinner.Known.Dots)
-            .SpinnerStyle(Style.Parse("cyan bold"))
-            .StartAsync("Menjalankan operasi...", async ctx =>
-            {
-                if (choice.Contains("1."))
-                    await _pythonBridge.InitializeConfiguration();
-                else if (choice.Contains("2."))
-                    await _pythonBridge.ImportApiKeys();
-                else if (choice.Contains("3."))
-                    await _pythonBridge.ShowApiKeysStatus();
-                else if (choice.Contains("4."))
-                    await _pythonBridge.ImportGitHubTokens();
-                else if (choice.Contains("5."))
-                    await _pythonBridge.ValidateGitHubTokens();
-            });
+        if (choice.Contains("1."))
+            await _pythonBridge.InitializeConfiguration();
+        else if (choice.Contains("2."))
+            await _pythonBridge.ImportApiKeys();
+        else if (choice.Contains("3."))
+            await _pythonBridge.ShowApiKeysStatus();
+        else if (choice.Contains("4."))
+            await _pythonBridge.ImportGitHubTokens();
+        else if (choice.Contains("5."))
+            await _pythonBridge.ValidateGitHubTokens();
         
         ConsoleHelper.PressEnterToContinue();
     }
@@ -167,7 +163,7 @@ public class MenuSystem
             
             var panel = new Panel(
                 new Markup("[cyan bold]🤝 MANAJEMEN KOLABORASI[/]\n\n" +
-                          "[grey]💡 Tip: Jalankan secara berurutan (1 → 2 → 3)[/]")
+                          "[grey]💡 Tip: Jalankan 1 → 4 berurutan, atau Pipeline untuk semua tahap sekaligus[/]")
             )
             {
                 Border = BoxBorder.Double,
@@ -184,7 +180,9 @@ public class MenuSystem
                     {
                         "1. Auto Invite Collaborators",
                         "2. Auto Accept Invitations",
-                        "3. Auto Set Secrets (Actions + Codespaces)",
+                        "3. Auto Create or Sync Fork",
+                        "4. Auto Set Secrets",
+                        "5. Onboarding Pipeline (Invite → Deploy)",
                         "← Kembali ke Main Menu"
                     })
             );
@@ -198,18 +196,16 @@ public class MenuSystem
     
     private async Task ExecuteCollaborationChoice(string choice)
     {
-        await AnsiConsole.Status()
-            .Spinner(Spinner.Known.Star)
-            .SpinnerStyle(Style.Parse("green bold"))
-            .StartAsync("Memproses...", async ctx =>
-            {
-                if (choice.Contains("1."))
-                    await _pythonBridge.AutoInviteCollaborators();
-                else if (choice.Contains("2."))
-                    await _pythonBridge.AutoAcceptInvitations();
-                else if (choice.Contains("3."))
-                    await _pythonBridge.AutoSetSecrets();
-            });
+        if (choice.Contains("1."))
+            await _pythonBridge.AutoInviteCollaborators();
+        else if (choice.Contains("2."))
+            await _pythonBridge.AutoAcceptInvitations();
+        else if (choice.Contains("3."))
+            await _pythonBridge.AutoCreateOrSyncFork();
+        else if (choice.Contains("4."))
+            await _pythonBridge.AutoSetSecrets();
+        else if (choice.Contains("5."))
+            await _pythonBridge.OnboardingPipeline();
         
         ConsoleHelper.PressEnterToContinue();
     }
@@ -250,18 +246,12 @@ public class MenuSystem
     
     private async Task ExecuteDeploymentChoice(string choice)
     {
-        await AnsiConsole.Status()
-            .Spinner(Spinner.Known.Dots2)
-            .SpinnerStyle(Style.Parse("yellow bold"))
-            .StartAsync("Executing...", async ctx =>
-            {
-                if (choice.Contains("1."))
-                    await _pythonBridge.DeployToGitHub();
-                else if (choice.Contains("2."))
-                    await _pythonBridge.TriggerWorkflow();
-                else if (choice.Contains("3."))
-                    await _pythonBridge.ShowWorkflowStatus();
-            });
+        if (choice.Contains("1."))
+            await _pythonBridge.DeployToGitHub();
+        else if (choice.Contains("2."))
+            await _pythonBridge.TriggerWorkflow();
+        else if (choice.Contains("3."))
+            await _pythonBridge.ShowWorkflowStatus();
         
         ConsoleHelper.PressEnterToContinue();
     }
@@ -1,15 +1,33 @@
+using System.Collections.Concurrent;
 using System.Diagnostics;
 using System.Text;
+using System.Text.Json;
+using System.Text.Json.Nodes;
 using CliWrap;
 using CliWrap.Buffered;
 using Spectre.Console;
 
 namespace DatagramOrchestrator.UI;
 
-public class PythonBridge
+/// <summary>
+/// Menjalankan satu proses worker Python (<c>python -m orchestrator.worker</c>) selama UI hidup
+/// dan berbicara JSON-RPC berbingkai Content-Length lewat stdio. Import, cache, dan connection
+/// pool di sisi Python tetap hangat di antara aksi menu.
+/// </summary>
+public class PythonBridge : IAsyncDisposable
 {
+    private static readonly TimeSpan WorkerStartTimeout = TimeSpan.FromSeconds(30);
+    private static readonly TimeSpan WorkerShutdownTimeout = TimeSpan.FromSeconds(5);
+    
     private readonly string _pythonExecutable;
     private readonly string _baseDirectory;
+    private readonly SemaphoreSlim _startLock = new(1, 1);
+    private readonly SemaphoreSlim _writeLock = new(1, 1);
+    private readonly ConcurrentDictionary<long, TaskCompletionSource<JsonNode?>> _pending = new();
+    private Process? _worker;
+    private Stream? _workerInput;
+    private TaskCompletionSource<bool> _workerReady = new(TaskCreationOptions.RunContinuationsAsynchronously);
+    private long _nextRequestId;
     
     public PythonBridge()
     {
@@ -116,384 +134,307 @@ public class PythonBridge
     // SETUP & KONFIGURASI METHODS
     // ========================================
     
-    public async Task InitializeConfiguration()
-    {
-        AnsiConsole.Clear();
-        var panel = new Panel("[cyan bold]1. INITIALIZE CONFIGURATION[/]")
-        {
-            Border = BoxBorder.Rounded,
-            BorderStyle = new Style(Color.Cyan1)
-        };
-        AnsiConsole.Write(panel);
-        
-        var username = AnsiConsole.Ask<string>("\n[cyan]Username GitHub utama:[/]");
-        var repoName = AnsiConsole.Ask<string>("[cyan]Nama repository:[/]");
-        var token = AnsiConsole.Prompt(
-            new TextPrompt<string>("[cyan]GitHub Personal Access Token:[/]")
-                .Secret()
-        );
-        
-        var script = $@"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.core import initialize_configuration
-from orchestrator.helpers import save_json_file, CONFIG_FILE
-
-config = {{
-    'main_account_username': '{username}',
-    'main_repo_name': '{repoName}',
-    'main_token': '{token}'
-}}
-save_json_file(CONFIG_FILE, config)
-print('SUCCESS: Configuration saved')
-";
-        
-        await ExecutePythonScript(script);
-    }
+    public Task InitializeConfiguration() => RunAction("initialize_configuration");
     
-    public async Task ImportApiKeys()
-    {
-        AnsiConsole.Clear();
-        var panel = new Panel("[cyan bold]2. IMPORT API KEYS[/]")
-        {
-            Border = BoxBorder.Rounded,
-            BorderStyle = new Style(Color.Cyan1)
-        };
-        AnsiConsole.Write(panel);
-        
-        var choice = AnsiConsole.Prompt(
-            new SelectionPrompt<string>()
-                .Title("[cyan]Pilih metode import:[/]")
-                .AddChoices(new[] { "1. Input manual", "2. Import dari file .txt" })
-        );
-        
-        if (choice.Contains("1."))
-        {
-            await ImportApiKeysManual();
-        }
-        else
-        {
-            var filePath = AnsiConsole.Ask<string>("[cyan]Path ke file .txt:[/]");
-            await ImportApiKeysFromFile(filePath);
-        }
-    }
+    public Task ImportApiKeys() => RunAction("import_api_keys");
     
-    private async Task ImportApiKeysManual()
-    {
-        var keys = new List<string>();
-        
-        while (true)
-        {
-            var key = AnsiConsole.Ask<string>($"[cyan]API Key #{keys.Count + 1} (kosongkan untuk selesai):[/]");
-            if (string.IsNullOrWhiteSpace(key))
-                break;
-            keys.Add(key);
-        }
-        
-        if (keys.Count > 0)
-        {
-            var script = $@"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.helpers import API_KEYS_FILE
-from pathlib import Path
-
-keys = {string.Join(",", keys.Select(k => $"'{k}'"))}
-API_KEYS_FILE.write_text('\n'.join([{string.Join(",", keys.Select(k => $"'{k}'"))}]), encoding='utf-8')
-print(f'SUCCESS: Saved {{len([{string.Join(",", keys.Select(k => $"'{k}'"))}])}} API keys')
-";
-            await ExecutePythonScript(script);
-        }
-    }
+    public Task ShowApiKeysStatus() => RunAction("show_api_keys_status");
     
-    private async Task ImportApiKeysFromFile(string filePath)
-    {
-        var script = $@"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.core import import_api_keys
-from orchestrator.helpers import API_KEYS_FILE
-from pathlib import Path
-
-source = Path('{filePath.Replace("\\", "\\\\")}')
-if source.is_file():
-    content = source.read_text(encoding='utf-8')
-    API_KEYS_FILE.write_text(content, encoding='utf-8')
-    count = len([l for l in content.splitlines() if l.strip()])
-    print(f'SUCCESS: Imported {{count}} API keys')
-else:
-    print('ERROR: File not found')
-";
-        await ExecutePythonScript(script);
-    }
+    public Task ImportGitHubTokens() => RunAction("import_github_tokens");
     
-    public async Task ShowApiKeysStatus()
-    {
-        var script = @"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.helpers import API_KEYS_FILE, read_file_lines
-
-keys = read_file_lines(API_KEYS_FILE)
-print(f'TOTAL: {len(keys)}')
-for i, key in enumerate(keys[:3], 1):
-    masked = f'{key[:8]}...{key[-6:]}' if len(key) > 14 else '***'
-    print(f'KEY{i}: {masked}')
-";
-        var output = await ExecutePythonScript(script);
-        DisplayApiKeysStatus(output);
-    }
-    
-    private void DisplayApiKeysStatus(string output)
-    {
-        AnsiConsole.Clear();
-        var panel = new Panel("[cyan bold]3. API KEYS STATUS[/]")
-        {
-            Border = BoxBorder.Rounded,
-            BorderStyle = new Style(Color.Cyan1)
-        };
-        AnsiConsole.Write(panel);
-        
-        var lines = output.Split('\n', StringSplitOptions.RemoveEmptyEntries);
-        var total = lines.FirstOrDefault(l => l.StartsWith("TOTAL:"))?.Split(':')[1].Trim() ?? "0";
-        
-        var table = new Table()
-            .Border(TableBorder.Rounded)
-            .AddColumn("[yellow]#[/]")
-            .AddColumn("[cyan]API Key (Masked)[/]");
-        
-        foreach (var line in lines.Where(l => l.StartsWith("KEY")))
-        {
-            var parts = line.Split(':');
-            table.AddRow(parts[0].Replace("KEY", ""), parts[1].Trim());
-        }
-        
-        AnsiConsole.MarkupLine($"\n[green]Total API Keys:[/] [cyan bold]{total}[/]\n");
-        AnsiConsole.Write(table);
-    }
-    
-    public async Task ImportGitHubTokens()
-    {
-        AnsiConsole.Clear();
-        var filePath = AnsiConsole.Ask<string>("[cyan]Path ke file .txt berisi tokens:[/]");
-        
-        var script = $@"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.core import import_github_tokens
-from orchestrator.helpers import TOKENS_FILE
-from pathlib import Path
-
-source = Path('{filePath.Replace("\\", "\\\\")}')
-if source.is_file():
-    content = source.read_text(encoding='utf-8')
-    tokens = [l.strip() for l in content.splitlines() if l.strip().startswith(('ghp_', 'github_pat_'))]
-    if tokens:
-        TOKENS_FILE.write_text('\n'.join(tokens), encoding='utf-8')
-        print(f'SUCCESS: Imported {{len(tokens)}} tokens')
-    else:
-        print('ERROR: No valid tokens found')
-else:
-    print('ERROR: File not found')
-";
-        await ExecutePythonScript(script);
-    }
-    
-    public async Task ValidateGitHubTokens()
-    {
-        var script = @"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.core import validate_github_tokens
-validate_github_tokens()
-";
-        await ExecutePythonScriptWithLiveOutput(script);
-    }
+    public Task ValidateGitHubTokens() => RunAction("validate_github_tokens");
     
     // ========================================
     // MANAJEMEN KOLABORASI METHODS
     // ========================================
     
-    public async Task AutoInviteCollaborators()
-    {
-        var script = @"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.core import invoke_auto_invite
-invoke_auto_invite()
-";
-        await ExecutePythonScriptWithLiveOutput(script);
-    }
+    public Task AutoInviteCollaborators() => RunAction("invoke_auto_invite");
     
-    public async Task AutoAcceptInvitations()
-    {
-        var script = @"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.core import invoke_auto_accept
-invoke_auto_accept()
-";
-        await ExecutePythonScriptWithLiveOutput(script);
-    }
+    public Task AutoAcceptInvitations() => RunAction("invoke_auto_accept");
     
-    public async Task AutoSetSecrets()
-    {
-        var script = @"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.core import invoke_auto_set_secrets
-invoke_auto_set_secrets()
-";
-        await ExecutePythonScriptWithLiveOutput(script);
-    }
+    public Task AutoCreateOrSyncFork() => RunAction("invoke_auto_create_or_sync_fork");
+    
+    public Task AutoSetSecrets() => RunAction("invoke_auto_set_secrets");
+    
+    public Task OnboardingPipeline() => RunAction("invoke_onboarding_pipeline");
     
     // ========================================
     // DEPLOYMENT & MONITORING METHODS
     // ========================================
     
-    public async Task DeployToGitHub()
-    {
-        var script = @"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.core import deploy_to_github
-deploy_to_github()
-";
-        await ExecutePythonScriptWithLiveOutput(script);
-    }
+    public Task DeployToGitHub() => RunAction("deploy_to_github");
     
-    public async Task TriggerWorkflow()
-    {
-        var script = @"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.core import invoke_workflow_trigger
-invoke_workflow_trigger()
-";
-        await ExecutePythonScriptWithLiveOutput(script);
-    }
+    public Task TriggerWorkflow() => RunAction("invoke_workflow_trigger");
     
-    public async Task ShowWorkflowStatus()
-    {
-        var script = @"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.core import show_workflow_status
-show_workflow_status()
-";
-        await ExecutePythonScriptWithLiveOutput(script);
-    }
+    public Task ShowWorkflowStatus() => RunAction("show_workflow_status");
     
     // ========================================
     // UTILITIES METHODS
     // ========================================
     
-    public async Task ViewLogs()
+    public Task ViewLogs() => RunAction("view_logs");
+    
+    public Task CleanCache() => RunAction("clean_cache");
+    
+    // ========================================
+    // WORKER (JSON-RPC) METHODS
+    // ========================================
+    
+    private async Task RunAction(string action)
     {
-        var script = @"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.core import view_logs
-view_logs()
-";
-        await ExecutePythonScriptWithLiveOutput(script);
+        try
+        {
+            var result = await Request("run", new JsonObject { ["action"] = action });
+            if (result?["cancelled"]?.GetValue<bool>() == true)
+                AnsiConsole.MarkupLine("[yellow]⚠️  Aksi dibatalkan.[/]");
+        }
+        catch (PythonWorkerException ex)
+        {
+            AnsiConsole.MarkupLine($"[red]❌ {Markup.Escape(ex.Message)}[/]");
+        }
     }
     
-    public async Task CleanCache()
+    private async Task<JsonNode?> Request(string method, JsonObject? parameters = null)
     {
-        var confirmed = AnsiConsole.Confirm("[yellow]Hapus semua file cache?[/]");
-        if (!confirmed)
+        await EnsureWorkerStarted();
+        
+        var id = Interlocked.Increment(ref _nextRequestId);
+        var completion = new TaskCompletionSource<JsonNode?>(TaskCreationOptions.RunContinuationsAsynchronously);
+        _pending[id] = completion;
+        
+        try
+        {
+            await Send(new JsonObject
+            {
+                ["jsonrpc"] = "2.0",
+                ["id"] = id,
+                ["method"] = method,
+                ["params"] = parameters ?? new JsonObject()
+            });
+        }
+        catch (Exception ex) when (ex is IOException or ObjectDisposedException)
         {
-            AnsiConsole.MarkupLine("[yellow]Operasi dibatalkan.[/]");
-            return;
+            _pending.TryRemove(id, out _);
+            throw new PythonWorkerException($"Worker Python tidak bisa dihubungi: {ex.Message}");
         }
         
-        var script = @"
-import sys
-sys.path.insert(0, '.')
-from orchestrator.helpers import TOKEN_CACHE_FILE, INVITED_USERS_FILE, ACCEPTED_USERS_FILE, SECRETS_SET_FILE
-
-files = [TOKEN_CACHE_FILE, INVITED_USERS_FILE, ACCEPTED_USERS_FILE, SECRETS_SET_FILE]
-count = 0
-for f in files:
-    if f.exists():
-        f.unlink()
-        count += 1
-        print(f'DELETED: {f.name}')
-print(f'SUCCESS: Cleaned {count} cache files')
-";
-        await ExecutePythonScript(script);
+        return await completion.Task;
     }
     
-    // ========================================
-    // HELPER METHODS
-    // ========================================
-    
-    private async Task<string> ExecutePythonScript(string script)
+    private async Task EnsureWorkerStarted()
     {
+        await _startLock.WaitAsync();
         try
         {
-            var result = await Cli.Wrap(_pythonExecutable)
-                .WithArguments("-c")
-                .WithStandardInputPipe(PipeSource.FromString(script))
-                .WithWorkingDirectory(_baseDirectory)
-                .WithValidation(CommandResultValidation.None)
-                .ExecuteBufferedAsync();
+            if (_worker is { HasExited: false })
+                return;
             
-            var output = result.StandardOutput + result.StandardError;
+            _workerReady = new TaskCompletionSource<bool>(TaskCreationOptions.RunContinuationsAsynchronously);
+            var startInfo = new ProcessStartInfo
+            {
+                FileName = _pythonExecutable,
+                Arguments = "-u -m orchestrator.worker",
+                WorkingDirectory = _baseDirectory,
+                RedirectStandardInput = true,
+                RedirectStandardOutput = true,
+                RedirectStandardError = true,
+                StandardErrorEncoding = Encoding.UTF8,
+                UseShellExecute = false,
+                CreateNoWindow = true
+            };
+            startInfo.Environment["PYTHONIOENCODING"] = "utf-8";
             
-            if (output.Contains("SUCCESS:"))
+            var worker = Process.Start(startInfo)
+                ?? throw new PythonWorkerException("Gagal menjalankan worker Python");
+            worker.ErrorDataReceived += (_, e) =>
             {
-                var message = output.Split("SUCCESS:")[1].Trim();
-                AnsiConsole.MarkupLine($"[green]✅ {message}[/]");
-            }
-            else if (output.Contains("ERROR:"))
+                if (!string.IsNullOrEmpty(e.Data))
+                    AnsiConsole.MarkupLine($"[grey]{Markup.Escape(e.Data)}[/]");
+            };
+            worker.BeginErrorReadLine();
+            
+            _worker = worker;
+            _workerInput = worker.StandardInput.BaseStream;
+            _ = Task.Run(() => ReadMessages(worker));
+            
+            var ready = await Task.WhenAny(_workerReady.Task, Task.Delay(WorkerStartTimeout));
+            if (ready != _workerReady.Task || !_workerReady.Task.Result)
+                throw new PythonWorkerException("Worker Python tidak merespons saat start (lihat output di atas)");
+        }
+        finally
+        {
+            _startLock.Release();
+        }
+    }
+    
+    private async Task Send(JsonObject message)
+    {
+        var body = Encoding.UTF8.GetBytes(message.ToJsonString());
+        var header = Encoding.ASCII.GetBytes($"Content-Length: {body.Length}\r\n\r\n");
+        
+        await _writeLock.WaitAsync();
+        try
+        {
+            var input = _workerInput ?? throw new PythonWorkerException("Worker Python belum berjalan");
+            await input.WriteAsync(header);
+            await input.WriteAsync(body);
+            await input.FlushAsync();
+        }
+        finally
+        {
+            _writeLock.Release();
+        }
+    }
+    
+    private async Task ReadMessages(Process worker)
+    {
+        var output = worker.StandardOutput.BaseStream;
+        var workerReady = _workerReady;
+        try
+        {
+            while (await ReadMessage(output) is JsonObject message)
             {
-                var message = output.Split("ERROR:")[1].Trim();
-                AnsiConsole.MarkupLine($"[red]❌ {message}[/]");
+                if (message["method"]?.GetValue<string>() is string method)
+                    await HandleWorkerCall(method, message);
+                else if (message["id"] is JsonValue id && id.TryGetValue(out long requestId)
+                         && _pending.TryRemove(requestId, out var completion))
+                {
+                    if (message["error"] is JsonObject error)
+                        completion.TrySetException(new PythonWorkerException(
+                            error["message"]?.GetValue<string>() ?? "Worker Python mengembalikan error"));
+                    else
+                        completion.TrySetResult(message["result"]);
+                }
             }
-            
-            return output;
         }
         catch (Exception ex)
         {
-            AnsiConsole.MarkupLine($"[red]❌ Python execution failed: {ex.Message}[/]");
-            return string.Empty;
+            // Apa pun penyebabnya (bingkai rusak, JSON tidak valid, error saat menangani prompt),
+            // request yang menunggu harus digagalkan agar tidak menggantung selamanya.
+            AnsiConsole.MarkupLine($"[red]❌ Koneksi worker Python terputus: {Markup.Escape(ex.Message)}[/]");
+        }
+        
+        workerReady.TrySetResult(false);
+        foreach (var id in _pending.Keys)
+        {
+            if (_pending.TryRemove(id, out var completion))
+                completion.TrySetException(new PythonWorkerException("Worker Python berhenti"));
         }
     }
     
-    private async Task ExecutePythonScriptWithLiveOutput(string script)
+    private async Task HandleWorkerCall(string method, JsonObject message)
     {
-        try
+        var parameters = message["params"] as JsonObject;
+        switch (method)
         {
-            await AnsiConsole.Status()
-                .Spinner(Spinner.Known.Dots)
-                .StartAsync("Processing...", async ctx =>
+            case "ready":
+                _workerReady.TrySetResult(true);
+                break;
+            case "event":
+                RenderEvent(parameters?["type"]?.GetValue<string>(), parameters?["text"]?.GetValue<string>() ?? "");
+                break;
+            case "prompt":
+                var text = parameters?["text"]?.GetValue<string>() ?? "";
+                var secret = parameters?["secret"]?.GetValue<bool>() == true;
+                var prompt = new TextPrompt<string>(Markup.Escape(text.Trim())).AllowEmpty();
+                if (secret)
+                    prompt = prompt.Secret();
+                var answer = AnsiConsole.Prompt(prompt);
+                await Send(new JsonObject
                 {
-                    var stdOutBuffer = new StringBuilder();
-                    var stdErrBuffer = new StringBuilder();
-                    
-                    await Cli.Wrap(_pythonExecutable)
-                        .WithArguments("-c")
-                        .WithStandardInputPipe(PipeSource.FromString(script))
-                        .WithWorkingDirectory(_baseDirectory)
-                        .WithStandardOutputPipe(PipeTarget.ToDelegate(line =>
-                        {
-                            stdOutBuffer.AppendLine(line);
-                            AnsiConsole.MarkupLine(line);
-                        }))
-                        .WithStandardErrorPipe(PipeTarget.ToDelegate(line =>
-                        {
-                            stdErrBuffer.AppendLine(line);
-                            AnsiConsole.MarkupLine($"[yellow]{line}[/]");
-                        }))
-                        .WithValidation(CommandResultValidation.None)
-                        .ExecuteAsync();
+                    ["jsonrpc"] = "2.0",
+                    ["id"] = message["id"]?.DeepClone(),
+                    ["result"] = answer
                 });
+                break;
         }
-        catch (Exception ex)
+    }
+    
+    private static void RenderEvent(string? type, string text)
+    {
+        var color = type switch
+        {
+            "success" => "green",
+            "error" => "red",
+            "warning" => "yellow",
+            "info" => "cyan",
+            "header" => "magenta bold",
+            _ => null
+        };
+        
+        if (color == null)
+            AnsiConsole.WriteLine(text);
+        else
+            AnsiConsole.MarkupLine($"[{color}]{Markup.Escape(text)}[/]");
+    }
+    
+    private static async Task<JsonNode?> ReadMessage(Stream stream)
+    {
+        int? length = null;
+        while (true)
+        {
+            var line = await ReadHeaderLine(stream);
+            if (line == null)
+                return null;
+            if (line.Length == 0)
+            {
+                if (length == null)
+                    continue;
+                break;
+            }
+            
+            var separator = line.IndexOf(':');
+            if (separator > 0 && line[..separator].Trim().Equals("Content-Length", StringComparison.OrdinalIgnoreCase))
+            {
+                if (!int.TryParse(line[(separator + 1)..].Trim(), out var parsed) || parsed < 0)
+                    throw new InvalidDataException($"Content-Length tidak valid: {line}");
+                length = parsed;
+            }
+        }
+        
+        var body = new byte[length ?? throw new InvalidDataException("Content-Length tidak ada")];
+        await stream.ReadExactlyAsync(body);
+        return JsonNode.Parse(body);
+    }
+    
+    private static async Task<string?> ReadHeaderLine(Stream stream)
+    {
+        var bytes = new List<byte>();
+        var buffer = new byte[1];
+        while (true)
+        {
+            if (await stream.ReadAsync(buffer) == 0)
+                return null;
+            if (buffer[0] == (byte)'\n')
+                return Encoding.ASCII.GetString(bytes.ToArray()).TrimEnd('\r');
+            bytes.Add(buffer[0]);
+        }
+    }
+    
+    public async ValueTask DisposeAsync()
+    {
+        var worker = _worker;
+        if (worker is { HasExited: false })
         {
-            AnsiConsole.MarkupLine($"[red]❌ Error: {ex.Message}[/]");
+            try
+            {
+                var shutdown = Request("shutdown");
+                await Task.WhenAny(shutdown, Task.Delay(WorkerShutdownTimeout));
+                using var timeout = new CancellationTokenSource(WorkerShutdownTimeout);
+                await worker.WaitForExitAsync(timeout.Token);
+            }
+            catch (Exception ex) when (ex is PythonWorkerException or OperationCanceledException or IOException)
+            {
+                worker.Kill(entireProcessTree: true);
+            }
         }
+        worker?.Dispose();
+        _worker = null;
+        GC.SuppressFinalize(this);
     }
 }
+
+public class PythonWorkerException : Exception
+{
+    public PythonWorkerException(string message) : base(message) { }
+}
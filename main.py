@@ -3,28 +3,56 @@
 import os
 import sys
 import time
+import importlib
+import subprocess
+import threading
 from typing import List, Dict, Callable
 from orchestrator.helpers import (
-    Style, print_success, print_warning, print_error,
-    initialize_directories, check_dependencies, press_enter_to_continue
-)
-from orchestrator.setup import (
-    initialize_configuration, import_api_keys, show_api_keys_status,
-    import_github_tokens, validate_github_tokens
-)
-from orchestrator.collaboration import (
-    invoke_auto_invite, invoke_auto_accept, invoke_auto_create_or_sync_fork
-)
-from orchestrator.secrets import (
-    invoke_auto_set_secrets
-)
-from orchestrator.deployment import (
-    deploy_to_github, invoke_workflow_trigger, show_workflow_status
-)
-from orchestrator.utils import (
-    view_logs, clean_cache, manual_workflow_control
+    Style, print_success, print_warning, print_error, print_info,
+    initialize_directories, check_dependencies, wait_for_tool_probe, press_enter_to_continue,
+    track_command, start_metrics_server
 )
 
+# Batas median cold start (interpreter + import + cek dependensi sampai menu siap).
+STARTUP_BUDGET_MS = 100
+
+
+def lazy_action(module: str, name: str) -> Callable[[], None]:
+    """Aksi menu yang modulnya baru di-import saat dipilih (durasi & hasil dicatat ke metrik)."""
+    def action():
+        track_command(name, lambda: getattr(importlib.import_module(module), name)())
+    return action
+
+
+def start_background_revalidation():
+    """Import modul token dan mulai validasi ulang di thread terpisah agar menu tidak menunggu."""
+    def start():
+        importlib.import_module("orchestrator.tokens").start_background_revalidation()
+    threading.Thread(target=start, name="token-revalidation-start", daemon=True).start()
+
+
+def run_startup_benchmark(runs: int = 5) -> int:
+    """Mengukur cold start main.py di proses baru; exit code 1 jika median melebihi budget."""
+    command = [sys.executable, os.path.abspath(__file__), "--exit-after-startup"]
+    # Putaran pemanasan mengisi cache probe tool (seperti start pertama setelah instalasi).
+    if subprocess.run(command, stdout=subprocess.DEVNULL).returncode != 0:
+        print_error("❌ Startup gagal, benchmark dibatalkan.")
+        return 1
+
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    median = sorted(timings)[len(timings) // 2]
+    print_info(f"⏱️ Cold start: median {median:.0f} ms, min {min(timings):.0f} ms, max {max(timings):.0f} ms ({runs} run)")
+    if median > STARTUP_BUDGET_MS:
+        print_error(f"❌ Melebihi budget {STARTUP_BUDGET_MS} ms")
+        return 1
+    print_success(f"✅ Dalam budget {STARTUP_BUDGET_MS} ms")
+    return 0
+
 
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -76,16 +104,21 @@ def main():
     try:
         initialize_directories()
         check_dependencies()
+        if "--exit-after-startup" in sys.argv:
+            wait_for_tool_probe()
+            return
+        start_background_revalidation()
+        start_metrics_server()
 
         menu_definitions: Dict[str, tuple] = {
             '1': (
                 "📋 Setup & Konfigurasi",
                 [
-                    initialize_configuration,
-                    import_api_keys,
-                    show_api_keys_status,
-                    import_github_tokens,
-                    validate_github_tokens
+                    lazy_action("orchestrator.setup", "initialize_configuration"),
+                    lazy_action("orchestrator.setup", "import_api_keys"),
+                    lazy_action("orchestrator.setup", "show_api_keys_status"),
+                    lazy_action("orchestrator.setup", "import_github_tokens"),
+                    lazy_action("orchestrator.setup", "validate_github_tokens")
                 ],
                 [
                     "Initialize Configuration",
@@ -99,28 +132,32 @@ def main():
             '2': (
                 "🤝 Manajemen Kolaborasi",
                 [
-                    invoke_auto_invite,
-                    invoke_auto_accept,
-                    invoke_auto_create_or_sync_fork,
-                    invoke_auto_set_secrets
+                    lazy_action("orchestrator.collaboration", "invoke_auto_invite"),
+                    lazy_action("orchestrator.collaboration", "invoke_auto_accept"),
+                    lazy_action("orchestrator.collaboration", "invoke_auto_create_or_sync_fork"),
+                    lazy_action("orchestrator.secrets", "invoke_auto_set_secrets"),
+                    lazy_action("orchestrator.pipeline", "invoke_onboarding_pipeline")
                 ],
                 [
                     "Auto Invite Collaborators",
                     "Auto Accept Invitations",
                     "Auto Create or Sync Fork",
-                    "Auto Set Secrets"
+                    "Auto Set Secrets",
+                    "Onboarding Pipeline (Invite → Deploy)"
                 ],
-                "Jalankan secara berurutan dari atas ke bawah"
+                "Jalankan 1-4 berurutan, atau Pipeline untuk semua tahap sekaligus"
             ),
             '3': (
                 "🚀 Deployment & Monitoring",
                 [
-                    deploy_to_github,
-                    invoke_workflow_trigger,
-                    show_workflow_status
+                    lazy_action("orchestrator.deployment", "deploy_to_github"),
+                    lazy_action("orchestrator.scheduler", "invoke_schedule_planner"),
+                    lazy_action("orchestrator.deployment", "invoke_workflow_trigger"),
+                    lazy_action("orchestrator.deployment", "show_workflow_status")
                 ],
                 [
                     "Deploy to GitHub",
+                    "Plan Keys per Account (Scheduler)",
                     "Trigger Workflow",
                     "Show Workflow Status"
                 ],
@@ -129,14 +166,16 @@ def main():
             '4': (
                 "🔧 Utilities",
                 [
-                    view_logs,
-                    clean_cache,
-                    manual_workflow_control
+                    lazy_action("orchestrator.utils", "view_logs"),
+                    lazy_action("orchestrator.utils", "clean_cache"),
+                    lazy_action("orchestrator.utils", "manual_workflow_control"),
+                    lazy_action("orchestrator.utils", "show_rate_limit_status")
                 ],
                 [
                     "View Logs",
                     "Clean Cache",
-                    "Manual Workflow Control"
+                    "Manual Workflow Control",
+                    "Rate Limit Status"
                 ]
             )
         }
@@ -164,4 +203,6 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
+    if "--startup-benchmark" in sys.argv:
+        sys.exit(run_startup_benchmark())
     main()
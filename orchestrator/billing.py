@@ -0,0 +1,86 @@
+# orchestrator/billing.py
+
+import json
+import time
+import threading
+from typing import Any, Dict, Optional
+
+from .helpers import (
+    print_warning,
+    run_gh_api,
+    get_setting,
+    load_json_file,
+    save_json_file,
+    BILLING_CACHE_FILE
+)
+from .executor import run_batch
+
+_billing_lock = threading.Lock()
+
+
+def parse_actions_minutes(billing_data: Dict[str, Any]) -> int:
+    """Menjumlahkan menit Actions dari respons billing usage (storage/GigabyteHours diabaikan)."""
+    total_minutes = 0
+    for item in billing_data.get("usageItems", []):
+        if item.get("product") == "actions" and item.get("unitType") == "Minutes":
+            total_minutes += item.get("quantity", 0)
+    return int(total_minutes)
+
+
+def fetch_actions_minutes(username: str, token: str) -> Optional[int]:
+    """Mengambil total menit Actions satu akun; None jika gagal."""
+    result = run_gh_api(f"api /users/{username}/settings/billing/usage", token, timeout=30)
+    if not result["success"]:
+        print_warning(f"⚠️ Gagal mengambil data billing untuk {username}: {result.get('error')}")
+        return None
+    try:
+        return parse_actions_minutes(json.loads(result["output"]))
+    except (json.JSONDecodeError, KeyError, ValueError, TypeError) as e:
+        print_warning(f"⚠️ Error parsing billing data untuk {username}: {str(e)}")
+        return None
+
+
+def get_billing_snapshot(accounts: Dict[str, str], refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Snapshot menit Actions untuk banyak akun sekaligus.
+
+    Args:
+        accounts: {username: token}
+        refresh: abaikan cache dan ambil ulang semua akun
+
+    Returns:
+        {username: {"minutes": int, "fetched_at": epoch}} untuk akun yang
+        berhasil. Record disimpan ringkas di cache dan dipakai ulang selama
+        `billing_cache_ttl` detik; akun yang kedaluwarsa diambil paralel.
+    """
+    ttl = float(get_setting("billing_cache_ttl"))
+    now = time.time()
+    with _billing_lock:
+        cached = load_json_file(BILLING_CACHE_FILE)
+
+    snapshot: Dict[str, Dict[str, Any]] = {}
+    stale = []
+    for username, token in accounts.items():
+        record = cached.get(username)
+        if record and not refresh and now - record.get("fetched_at", 0) < ttl:
+            snapshot[username] = record
+        else:
+            stale.append((username, token))
+
+    if stale:
+        fetch = lambda entry: fetch_actions_minutes(*entry)
+        for (username, _), minutes in run_batch(stale, fetch, token_of=lambda entry: entry[1]):
+            if minutes is not None:
+                snapshot[username] = {"minutes": minutes, "fetched_at": time.time()}
+
+        with _billing_lock:
+            cached = load_json_file(BILLING_CACHE_FILE)
+            cached.update({u: snapshot[u] for u, _ in stale if u in snapshot})
+            save_json_file(BILLING_CACHE_FILE, cached)
+
+    return snapshot
+
+
+def get_actions_minutes(username: str, token: str) -> int:
+    """Menit Actions satu akun lewat snapshot (0 jika tidak tersedia)."""
+    record = get_billing_snapshot({username: token}).get(username)
+    return record["minutes"] if record else 0
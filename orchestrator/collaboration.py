@@ -3,7 +3,8 @@
 import json
 import time
 import re
-from typing import List, Set, Tuple, Dict
+import threading
+from typing import Any, Iterator, List, Set, Tuple, Dict, Optional
 
 from .helpers import (
     Style,
@@ -13,16 +14,58 @@ from .helpers import (
     print_warning,
     print_header,
     run_gh_api,
-    read_file_lines,
-    append_to_file,
+    poll_until,
+    invalidate_repo_cache,
     load_json_file,
+    on_command_start,
     CONFIG_FILE,
-    TOKEN_CACHE_FILE,
-    INVITED_USERS_FILE,
-    ACCEPTED_USERS_FILE,
-    FORKED_REPOS_FILE,
     write_log
 )
+from .executor import run_batch
+from .state import get_state_store
+from .tokens import load_live_token_cache
+
+
+def invite_collaborator(repo_path: str, username: str, token: str) -> Dict[str, Any]:
+    """Mengundang satu user sebagai kolaborator (permission push)."""
+    return run_gh_api(
+        f"api --silent -X PUT repos/{repo_path}/collaborators/{username} -f permission=push",
+        token
+    )
+
+
+def accept_repo_invitation(token: str, target_repo: str) -> Dict[str, Any]:
+    """Mencari dan menerima undangan ke target_repo untuk satu akun.
+
+    Returns:
+        {"status": "accepted" | "not_found" | "error", "error": pesan error atau None}
+    """
+    result = run_gh_api("api user/repository_invitations", token)
+    if not result["success"]:
+        return {"status": "error", "error": "Gagal fetch invitations"}
+
+    try:
+        invitations = json.loads(result["output"])
+        inv_id = next(
+            (inv['id'] for inv in invitations if inv.get('repository', {}).get('full_name', '').lower() == target_repo),
+            None
+        )
+    except (json.JSONDecodeError, KeyError):
+        return {"status": "error", "error": "Gagal parse JSON"}
+
+    if not inv_id:
+        return {"status": "not_found", "error": None}
+
+    accept_result = run_gh_api(f"api --method PATCH /user/repository_invitations/{inv_id} --silent", token)
+    if accept_result["success"]:
+        return {"status": "accepted", "error": None}
+    return {"status": "error", "error": f"Gagal accept: {accept_result['error']}"}
+
+
+def is_collaborator(repo_path: str, username: str, token: str) -> bool:
+    """True jika user sudah menjadi kolaborator repo (GitHub membalas 204)."""
+    result = run_gh_api(f"api --silent repos/{repo_path}/collaborators/{username}", token, max_retries=1)
+    return result["success"]
 
 
 def invoke_auto_invite():
@@ -33,7 +76,7 @@ def invoke_auto_invite():
         print_error("Konfigurasi belum diset.")
         return
 
-    token_cache = load_json_file(TOKEN_CACHE_FILE)
+    token_cache = load_live_token_cache()
     if not token_cache:
         print_error("Token cache kosong.")
         return
@@ -41,7 +84,7 @@ def invoke_auto_invite():
     total_accounts = len(token_cache)
     print_info(f"📊 Memulai proses untuk {total_accounts} akun...")
 
-    invited_users = read_file_lines(INVITED_USERS_FILE)
+    invited_users = get_state_store().users_with("invited")
     main_username = config['main_account_username']
     users_to_invite = [u for u in token_cache.values() if u not in invited_users and u != main_username]
 
@@ -55,23 +98,27 @@ def invoke_auto_invite():
 
     print_info(f"Akan mengundang {len(users_to_invite)} user baru...")
     repo_path = f"{main_username}/{config['main_repo_name']}"
+    main_token = config['main_token']
     success_count = 0
     failed_count = 0
 
-    for i, username in enumerate(users_to_invite, 1):
+    def invite(entry: Tuple[int, str]) -> bool:
+        i, username = entry
         print(f"[{i}/{len(users_to_invite)}] Mengundang @{username}...", end="", flush=True)
-        result = run_gh_api(
-            f"api --silent -X PUT repos/{repo_path}/collaborators/{username} -f permission=push",
-            config['main_token']
-        )
+        result = invite_collaborator(repo_path, username, main_token)
         if result["success"]:
             print_success(" ✅")
-            append_to_file(INVITED_USERS_FILE, username)
+            get_state_store().mark(username, "invited")
+            return True
+        print_error(f" ❌ {result['error']}")
+        return False
+
+    entries = list(enumerate(users_to_invite, 1))
+    for _, ok in run_batch(entries, invite, token_of=lambda _: main_token, delay=1):
+        if ok:
             success_count += 1
         else:
-            print_error(f" ❌ {result['error']}")
             failed_count += 1
-        time.sleep(1)
 
     print_success(f"\n{'='*47}")
     print_success(f"✅ Proses selesai!")
@@ -83,7 +130,7 @@ def invoke_auto_accept():
     """Menerima undangan kolaborasi secara otomatis untuk semua akun."""
     print_header("7. AUTO ACCEPT INVITATIONS")
     config = load_json_file(CONFIG_FILE)
-    token_cache = load_json_file(TOKEN_CACHE_FILE)
+    token_cache = load_live_token_cache()
 
     if not config or not token_cache:
         print_error("Konfigurasi atau token cache tidak ditemukan.")
@@ -93,74 +140,159 @@ def invoke_auto_accept():
     print_info(f"📊 Memulai proses untuk {total_accounts} akun...")
 
     target_repo = f"{config['main_account_username']}/{config['main_repo_name']}".lower()
-    accepted_users = read_file_lines(ACCEPTED_USERS_FILE)
+    accepted_users = get_state_store().users_with("accepted")
     print_info(f"Target: {target_repo}\nMengecek {len(token_cache)} akun...")
 
     accepted_count = 0
     skipped_count = 0
 
-    for i, (token, username) in enumerate(token_cache.items(), 1):
+    def accept(entry: Tuple[int, Tuple[str, str]]) -> bool:
+        i, (token, username) = entry
         if username in accepted_users:
             print(f"[{i}/{len(token_cache)}] @{username} - ✅ Already accepted")
-            skipped_count += 1
-            continue
+            return False
 
         print(f"[{i}/{len(token_cache)}] @{username}...", end="", flush=True)
-        result = run_gh_api("api user/repository_invitations", token)
-
-        if not result["success"]:
-            print_error(f" ❌ Gagal fetch invitations")
-            skipped_count += 1
-            continue
+        outcome = accept_repo_invitation(token, target_repo)
+        if outcome["status"] == "accepted":
+            print_success(" ✅ Accepted")
+            get_state_store().mark(username, "accepted")
+            return True
+        if outcome["status"] == "not_found":
+            print_info(" ℹ️ No invitation found")
+        else:
+            print_error(f" ❌ {outcome['error']}")
+        return False
 
-        try:
-            invitations = json.loads(result["output"])
-            inv_id = next(
-                (inv['id'] for inv in invitations if inv.get('repository', {}).get('full_name', '').lower() == target_repo),
-                None
-            )
-
-            if inv_id:
-                accept_result = run_gh_api(f"api --method PATCH /user/repository_invitations/{inv_id} --silent", token)
-                if accept_result["success"]:
-                    print_success(" ✅ Accepted")
-                    append_to_file(ACCEPTED_USERS_FILE, username)
-                    accepted_count += 1
-                else:
-                    print_error(f" ❌ Gagal accept: {accept_result['error']}")
-                    skipped_count += 1
-            else:
-                print_info(" ℹ️ No invitation found")
-                skipped_count += 1
-        except (json.JSONDecodeError, KeyError):
-            print_error(f" ❌ Gagal parse JSON")
+    entries = list(enumerate(token_cache.items(), 1))
+    for _, ok in run_batch(entries, accept, token_of=lambda entry: entry[1][0], delay=1):
+        if ok:
+            accepted_count += 1
+        else:
             skipped_count += 1
 
-        time.sleep(1)
-
     print_success(f"\n{'='*47}")
     print_success(f"✅ Proses selesai!")
     print_info(f"   Berhasil: {accepted_count}, Dilewati: {skipped_count}, Total: {total_accounts}")
     print_success(f"{'='*47}")
 
 
-def get_user_repos_matching_pattern(token: str, repo_name: str) -> List[str]:
-    """Mendapatkan semua repo yang match pattern."""
-    result = run_gh_api("api user/repos --paginate --jq '.[].name'", token, max_retries=2, timeout=60)
-    
-    if not result["success"] or not result["output"].strip():
-        return []
-    
-    matching_repos_set: Set[str] = set()
-    pattern = re.compile(r'^' + re.escape(repo_name) + r'(-\d+)?$', re.IGNORECASE)
-    
-    for line in result["output"].strip().split('\n'):
-        if line.strip():
-            repo = line.strip().strip('"').strip("'")
-            if pattern.match(repo):
-                matching_repos_set.add(repo)
-    
-    return sorted(matching_repos_set)
+REPO_DISCOVERY_PAGE_SIZE = 100
+REPO_DISCOVERY_TTL = 300
+
+# Polling penghapusan repo dan kesiapan fork (backoff eksponensial, detik).
+POLL_INITIAL_INTERVAL = 1.0
+POLL_MAX_INTERVAL = 10.0
+REPO_DELETE_TIMEOUT = 60
+FORK_READY_TIMEOUT = 300
+
+# Hasil discovery per akun: (token, nama dasar huruf kecil) -> (waktu, nama repo).
+_matching_repos: Dict[Tuple[str, str], Tuple[float, Set[str]]] = {}
+_matching_repos_lock = threading.Lock()
+
+
+def _repo_name_pattern(repo_name: str) -> re.Pattern:
+    return re.compile(r'^' + re.escape(repo_name) + r'(-\d+)?$', re.IGNORECASE)
+
+
+def iter_owned_repo_names(token: str) -> Iterator[str]:
+    """Streaming nama repo milik akun, urut nama (ascending), satu halaman per request."""
+    page = 1
+    while True:
+        result = run_gh_api(
+            f'api "user/repos?type=owner&sort=full_name&direction=asc&per_page={REPO_DISCOVERY_PAGE_SIZE}&page={page}"'
+            " --jq '.[].name'",
+            token, max_retries=2, timeout=60
+        )
+        if not result["success"]:
+            write_log(f"Repo listing failed at page {page}: {result.get('error')}")
+            return
+        names = [line.strip().strip('"') for line in result["output"].split('\n') if line.strip()]
+        yield from names
+        if len(names) < REPO_DISCOVERY_PAGE_SIZE:
+            return
+        page += 1
+
+
+def _scan_matching_repos(token: str, repo_name: str) -> Set[str]:
+    """Memindai daftar repo urut nama dan berhenti begitu melewati prefix `repo_name`."""
+    pattern = _repo_name_pattern(repo_name)
+    prefix = repo_name.lower()
+    matches: Set[str] = set()
+    for name in iter_owned_repo_names(token):
+        lowered = name.lower()
+        if pattern.match(name):
+            matches.add(name)
+        elif lowered > prefix and not lowered.startswith(prefix):
+            break
+    return matches
+
+
+def _search_matching_repos(username: str, token: str, repo_name: str) -> Optional[Set[str]]:
+    """Kandidat lewat search API (filter nama di server); None jika hasil tidak bisa dipakai."""
+    query = f"user:{username} {repo_name} in:name fork:true"
+    result = run_gh_api(
+        f"api -X GET search/repositories -f 'q={query}' -f per_page={REPO_DISCOVERY_PAGE_SIZE}",
+        token, max_retries=1
+    )
+    if not result["success"]:
+        return None
+    try:
+        data = json.loads(result["output"])
+    except json.JSONDecodeError:
+        return None
+    items = data.get("items") or []
+    if data.get("incomplete_results") or data.get("total_count", 0) > len(items):
+        return None
+
+    pattern = _repo_name_pattern(repo_name)
+    matches = {
+        item["name"] for item in items
+        if (item.get("owner") or {}).get("login", "").lower() == username.lower() and pattern.match(item.get("name", ""))
+    }
+    # Index search bisa tertinggal beberapa menit; nama persis dicek langsung.
+    if not any(is_exact_repo_name(name, repo_name) for name in matches):
+        exact = run_gh_api(f"api repos/{username}/{repo_name} --jq '.name'", token, max_retries=1)
+        if exact["success"] and exact["output"].strip():
+            matches.add(exact["output"].strip().strip('"'))
+    return matches
+
+
+def get_user_repos_matching_pattern(token: str, repo_name: str, username: Optional[str] = None) -> List[str]:
+    """Mendapatkan semua repo yang match pattern `<repo_name>` / `<repo_name>-N`.
+
+    Jika username diketahui, dipakai search API yang memfilter nama di server.
+    Jika tidak (atau hasil search tidak lengkap), daftar repo di-stream per
+    halaman urut nama dan berhenti begitu melewati prefix nama, sehingga
+    biaya tidak bergantung pada jumlah repo akun. Hasil di-cache per akun
+    selama REPO_DISCOVERY_TTL detik dan diperbarui saat repo dihapus/dibuat.
+    """
+    key = (token, repo_name.lower())
+    with _matching_repos_lock:
+        cached = _matching_repos.get(key)
+        if cached and time.time() - cached[0] < REPO_DISCOVERY_TTL:
+            return sorted(cached[1])
+
+    matches = _search_matching_repos(username, token, repo_name) if username else None
+    if matches is None:
+        matches = _scan_matching_repos(token, repo_name)
+
+    with _matching_repos_lock:
+        _matching_repos[key] = (time.time(), set(matches))
+    return sorted(matches)
+
+
+def _update_matching_repos(token: str, repo_path: str, exists: bool):
+    """Menyesuaikan cache discovery setelah repo dihapus/dibuat oleh orchestrator."""
+    name = repo_path.split("/", 1)[-1]
+    with _matching_repos_lock:
+        for (cached_token, base_name), (_, names) in _matching_repos.items():
+            if cached_token != token or not _repo_name_pattern(base_name).match(name):
+                continue
+            if exists:
+                names.add(name)
+            else:
+                names.difference_update({n for n in names if n.lower() == name.lower()})
 
 
 def is_exact_repo_name(repo: str, base_name: str) -> bool:
@@ -168,18 +300,114 @@ def is_exact_repo_name(repo: str, base_name: str) -> bool:
     return repo.lower() == base_name.lower()
 
 
+REPO_METADATA_BATCH_SIZE = 50
+
+_REPO_METADATA_FRAGMENT = (
+    "fragment RepoMeta on Repository { nameWithOwner isPrivate isArchived "
+    "parent { nameWithOwner } defaultBranchRef { name target { oid } } }"
+)
+
+# Metadata repo hasil prefetch GraphQL, key: "owner/repo" huruf kecil.
+_repo_metadata: Dict[str, Dict[str, Any]] = {}
+_repo_metadata_lock = threading.Lock()
+
+
+def fetch_repo_metadata_batch(repo_paths: List[str], token: str) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Mengambil parent, default branch, visibility, archived dan HEAD SHA banyak repo sekaligus.
+
+    Memakai query GraphQL beralias (REPO_METADATA_BATCH_SIZE repo per query).
+    Repo yang tidak ditemukan / tidak bisa diakses token bernilai None.
+    """
+    metadata: Dict[str, Optional[Dict[str, Any]]] = {}
+    for start in range(0, len(repo_paths), REPO_METADATA_BATCH_SIZE):
+        chunk = repo_paths[start:start + REPO_METADATA_BATCH_SIZE]
+        aliases = []
+        for idx, repo_path in enumerate(chunk):
+            owner, name = repo_path.split("/", 1)
+            aliases.append(f"r{idx}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ ...RepoMeta }}")
+        query = "query { " + " ".join(aliases) + " } " + _REPO_METADATA_FRAGMENT
+
+        result = run_gh_api("api graphql", token, max_retries=2, timeout=60, input_data={"query": query})
+        data: Dict[str, Any] = {}
+        if result["success"]:
+            try:
+                data = json.loads(result["output"]).get("data") or {}
+            except (json.JSONDecodeError, AttributeError):
+                write_log(f"Failed to parse GraphQL repo metadata: {result['output'][:200]}")
+        else:
+            write_log(f"GraphQL repo metadata failed: {result.get('error')}")
+
+        for idx, repo_path in enumerate(chunk):
+            repo = data.get(f"r{idx}")
+            if not repo:
+                metadata[repo_path] = None
+                continue
+            branch_ref = repo.get("defaultBranchRef") or {}
+            metadata[repo_path] = {
+                "full_name": repo.get("nameWithOwner", repo_path),
+                "parent": (repo.get("parent") or {}).get("nameWithOwner"),
+                "default_branch": branch_ref.get("name"),
+                "head_sha": (branch_ref.get("target") or {}).get("oid"),
+                "private": bool(repo.get("isPrivate")),
+                "archived": bool(repo.get("isArchived")),
+            }
+    return metadata
+
+
+def prefetch_repo_metadata(repo_paths: List[str], token: str) -> int:
+    """Mengisi cache metadata repo via GraphQL. Mengembalikan jumlah repo yang ter-resolve."""
+    metadata = fetch_repo_metadata_batch(repo_paths, token)
+    with _repo_metadata_lock:
+        # Entri lama selalu dibuang: repo yang kini terhapus/privat/berganti
+        # parent tidak boleh tetap terbaca dari hasil prefetch sebelumnya.
+        for repo_path in repo_paths:
+            _repo_metadata.pop(repo_path.lower(), None)
+        for repo_path, meta in metadata.items():
+            # Repo yang tidak terlihat oleh token ini tidak di-cache agar
+            # fallback REST dengan token pemilik tetap berjalan.
+            if meta is not None:
+                _repo_metadata[repo_path.lower()] = meta
+    return sum(1 for meta in metadata.values() if meta is not None)
+
+
+def get_cached_repo_metadata(repo_path: str) -> Optional[Dict[str, Any]]:
+    return _repo_metadata.get(repo_path.lower())
+
+
+def forget_repo_metadata(repo_path: str):
+    with _repo_metadata_lock:
+        _repo_metadata.pop(repo_path.lower(), None)
+
+
+def clear_repo_metadata():
+    """Membuang seluruh cache metadata; dipanggil di awal setiap aksi menu."""
+    with _repo_metadata_lock:
+        _repo_metadata.clear()
+
+
+on_command_start(clear_repo_metadata)
+
+
 def check_if_correct_fork(repo_path: str, token: str, expected_parent: str) -> bool:
     """Cek apakah repo adalah fork valid dari expected parent."""
+    meta = get_cached_repo_metadata(repo_path)
+    if meta is not None:
+        return (meta["parent"] or "").lower() == expected_parent.lower()
+
     result = run_gh_api(f"api repos/{repo_path} --jq '.parent.full_name'", token, max_retries=1)
     if not result["success"]:
         return False
     
     parent = result["output"].strip().strip('"')
-    return parent == expected_parent
+    return parent.lower() == expected_parent.lower()
 
 
 def get_default_branch(repo_path: str, token: str) -> str:
     """Mendapatkan nama branch default."""
+    meta = get_cached_repo_metadata(repo_path)
+    if meta is not None and meta["default_branch"]:
+        return meta["default_branch"]
+
     result = run_gh_api(f"api repos/{repo_path} --jq '.default_branch'", token, max_retries=1)
     if result["success"] and result["output"].strip():
         return result["output"].strip().strip('"')
@@ -189,8 +417,12 @@ def get_default_branch(repo_path: str, token: str) -> str:
 def delete_repository(repo_path: str, token: str) -> bool:
     """Menghapus repository."""
     result = run_gh_api(f"api -X DELETE repos/{repo_path}", token, max_retries=2, timeout=30)
-    if not result["success"]:
-        write_log(f"Failed to delete {repo_path}: {result.get('error')}")
+    forget_repo_metadata(repo_path)
+    if result["success"]:
+        _update_matching_repos(token, repo_path, exists=False)
+    else:
+        write_log(f"Failed to delete {repo_path}: {result.get('error')}", level="error",
+                  repo=repo_path, operation="delete")
     return result["success"]
 
 
@@ -201,6 +433,9 @@ def sync_fork_with_upstream(fork_repo: str, token: str) -> bool:
     sync_result = run_gh_api(f"api -X POST repos/{fork_repo}/merge-upstream -f branch={default_branch}", token, max_retries=2)
     
     if sync_result["success"]:
+        meta = get_cached_repo_metadata(fork_repo)
+        if meta is not None:
+            meta["head_sha"] = None
         return True
     
     error_msg = sync_result.get('error', '').lower()
@@ -212,16 +447,40 @@ def sync_fork_with_upstream(fork_repo: str, token: str) -> bool:
 
 def set_repo_public(repo_path: str, token: str) -> bool:
     """Set repository visibility menjadi public."""
+    meta = get_cached_repo_metadata(repo_path)
+    if meta is not None and not meta["private"]:
+        return True
+
     result = run_gh_api(f"api -X PATCH repos/{repo_path} -f private=false", token, max_retries=1)
+    if result["success"] and meta is not None:
+        meta["private"] = False
     return result["success"] or "unprocessable" in result.get("error", "").lower()
 
 
+def is_repo_deleted(repo_path: str, token: str) -> bool:
+    """True jika repo sudah tidak ada (404)."""
+    invalidate_repo_cache(repo_path)
+    result = run_gh_api(f"api repos/{repo_path} --jq '.id'", token, max_retries=1)
+    return not result["success"] and "404" in (result.get("error") or "")
+
+
+def wait_for_repos_deleted(repo_paths: List[str], token: str, timeout: float = REPO_DELETE_TIMEOUT) -> bool:
+    """Menunggu sampai semua repo benar-benar terhapus (polling dengan backoff)."""
+    pending = set(repo_paths)
+
+    def check() -> bool:
+        pending.difference_update({path for path in list(pending) if is_repo_deleted(path, token)})
+        return not pending
+
+    return poll_until(check, timeout, POLL_INITIAL_INTERVAL, POLL_MAX_INTERVAL)
+
+
 def cleanup_repos(username: str, token: str, matching_repos: List[str], source_repo: str, repo_name: str, force_delete_all: bool) -> Tuple[int, List[str]]:
-    """Delete repos sesuai mode."""
+    """Delete repos sesuai mode, lalu menunggu sampai semua penghapusan selesai."""
     if not matching_repos:
         return 0, []
     
-    deleted_count = 0
+    deleted_paths: List[str] = []
     kept_repos: List[str] = []
     
     for repo in matching_repos:
@@ -231,8 +490,7 @@ def cleanup_repos(username: str, token: str, matching_repos: List[str], source_r
             print_warning(f"    🗑️  Force deleting: {repo}")
             if delete_repository(repo_path, token):
                 print_success(f"    ✅ Deleted: {repo}")
-                deleted_count += 1
-                time.sleep(2)
+                deleted_paths.append(repo_path)
             else:
                 print_error(f"    ❌ Failed to delete: {repo}")
         else:
@@ -247,31 +505,171 @@ def cleanup_repos(username: str, token: str, matching_repos: List[str], source_r
             print_warning(f"    🗑️  Deleting: {repo}")
             if delete_repository(repo_path, token):
                 print_success(f"    ✅ Deleted: {repo}")
-                deleted_count += 1
-                time.sleep(2)
+                deleted_paths.append(repo_path)
             else:
                 print_error(f"    ❌ Failed to delete: {repo}")
+
+    if deleted_paths and not wait_for_repos_deleted(deleted_paths, token):
+        print_warning(f"    ⚠️  Penghapusan belum selesai setelah {REPO_DELETE_TIMEOUT}s")
     
-    return deleted_count, kept_repos
+    return len(deleted_paths), kept_repos
 
 
-def create_new_fork(username: str, token: str, source_repo: str, fork_repo: str) -> bool:
-    """Create fork baru."""
-    result = run_gh_api(f"api -X POST repos/{source_repo}/forks", token, max_retries=2)
+def create_new_fork(username: str, token: str, source_repo: str, fork_repo: str) -> Optional[str]:
+    """Meminta GitHub membuat fork (asinkron) dan mengembalikan path fork tanpa menunggu siap."""
+    result = run_gh_api(f"api -X POST repos/{source_repo}/forks --jq '.full_name'", token, max_retries=2)
     
+    forget_repo_metadata(fork_repo)
     if result["success"]:
-        print_success("    ✅ Fork created")
-        time.sleep(5)
-        
-        if set_repo_public(fork_repo, token):
-            print_info("    🔓 Set public")
-        
-        append_to_file(FORKED_REPOS_FILE, username)
-        return True
+        created = result["output"].strip().strip('"') or fork_repo
+        forget_repo_metadata(created)
+        _update_matching_repos(token, created, exists=True)
+        print_success(f"    ✅ Fork requested: {created}")
+        return created
     else:
         print_error(f"    ❌ Failed: {result.get('error')}")
-        write_log(f"Fork failed for @{username}: {result.get('error')}")
-        return False
+        write_log(f"Fork failed for @{username}: {result.get('error')}", level="error",
+                  account=username, operation="fork")
+        return None
+
+
+def is_fork_ready(fork_repo: str, token: str) -> bool:
+    """Fork siap jika repo bisa diakses dan isi git-nya sudah tersalin (ada commit)."""
+    result = run_gh_api(f'api "repos/{fork_repo}/commits?per_page=1" --jq \'.[].sha\'', token, max_retries=1)
+    return result["success"] and bool(result["output"].strip())
+
+
+def finalize_fork(username: str, token: str, fork_repo: str) -> bool:
+    """Tahap terakhir setelah fork siap: set public lalu catat di state."""
+    if set_repo_public(fork_repo, token):
+        print_info(f"🔓 {fork_repo}: set public")
+    get_state_store().mark(username, "forked")
+    return True
+
+
+def await_forks(pending_forks: List[Dict[str, str]], timeout: float = FORK_READY_TIMEOUT) -> Set[str]:
+    """Tahap readiness untuk banyak fork yang sedang dibuat sekaligus.
+
+    Setiap fork ({"username", "token", "repo"}) di-poll dengan backoff
+    sendiri; fork yang siap langsung diteruskan ke finalize_fork (visibility
+    dan pencatatan). Mengembalikan username yang fork-nya selesai.
+    """
+    states = [{**fork, "interval": POLL_INITIAL_INTERVAL, "next_check": 0.0} for fork in pending_forks]
+    finished: Set[str] = set()
+    deadline = time.time() + timeout
+    if states:
+        print_info(f"⏳ Menunggu {len(states)} fork siap...")
+
+    def advance(state: Dict[str, Any]) -> bool:
+        if not is_fork_ready(state["repo"], state["token"]):
+            return False
+        print_success(f"✅ {state['repo']}: fork siap")
+        return finalize_fork(state["username"], state["token"], state["repo"])
+
+    while states:
+        now = time.time()
+        if now >= deadline:
+            for state in states:
+                print_error(f"❌ {state['repo']}: fork belum siap setelah {int(timeout)}s")
+                write_log(f"Fork not ready for @{state['username']}: {state['repo']}", level="warning",
+                          account=state["username"], repo=state["repo"], operation="fork")
+            break
+
+        due = [state for state in states if state["next_check"] <= now]
+        for state, done in run_batch(due, advance, token_of=lambda state: state["token"]):
+            if done:
+                finished.add(state["username"])
+                states.remove(state)
+            else:
+                state["next_check"] = time.time() + state["interval"]
+                state["interval"] = min(state["interval"] * 2, POLL_MAX_INTERVAL)
+
+        if states:
+            time.sleep(max(0.0, min(min(s["next_check"] for s in states), deadline) - time.time()))
+
+    return finished
+
+
+def process_fork_for_user(username: str, token: str, source_repo: str, repo_name: str, action: str, forked_users: Set[str]) -> Dict[str, Any]:
+    """Membuat atau sync fork untuk satu akun sesuai mode (y = force recreate, n = sync).
+
+    Fork baru hanya diminta (outcome["fork"]); kesiapan, visibility dan
+    pencatatan diselesaikan bersama untuk semua akun oleh await_forks.
+    """
+    outcome: Dict[str, Any] = {"success": False, "synced": False, "created": False, "fork": None}
+    fork_repo = f"{username}/{repo_name}"
+
+    def request_fork():
+        print_info("🍴 Creating new fork...")
+        created = create_new_fork(username, token, source_repo, fork_repo)
+        if created:
+            outcome["created"] = True
+            outcome["fork"] = created
+
+    is_valid_fork = check_if_correct_fork(fork_repo, token, source_repo)
+
+    if is_valid_fork:
+        print_success("✅ Valid fork detected")
+
+        if action == 'y':
+            print_warning("⚠️  Force deleting valid fork...")
+            matching = get_user_repos_matching_pattern(token, repo_name, username)
+            if matching:
+                deleted, _ = cleanup_repos(username, token, matching, source_repo, repo_name, force_delete_all=True)
+                if deleted > 0:
+                    print_success(f"✅ Deleted {deleted} repo(s)")
+
+            request_fork()
+        else:
+            print_info("🔄 Syncing...")
+            if sync_fork_with_upstream(fork_repo, token):
+                print_success("✅ Synced")
+                outcome["synced"] = True
+            else:
+                print_warning("⚠️  Sync failed")
+
+            set_repo_public(fork_repo, token)
+
+            if username not in forked_users:
+                get_state_store().mark(username, "forked")
+
+            outcome["success"] = True
+    else:
+        matching_repos = get_user_repos_matching_pattern(token, repo_name, username)
+
+        if action == 'y':
+            if matching_repos:
+                print_warning(f"⚠️  Force deleting ALL {len(matching_repos)} repo(s)...")
+                deleted, _ = cleanup_repos(username, token, matching_repos, source_repo, repo_name, force_delete_all=True)
+                if deleted > 0:
+                    print_success(f"✅ Deleted {deleted} repo(s)")
+
+            request_fork()
+        else:
+            if matching_repos:
+                print_info("🔍 Checking repos...")
+                deleted, kept = cleanup_repos(username, token, matching_repos, source_repo, repo_name, force_delete_all=False)
+
+                if deleted > 0:
+                    print_success(f"✅ Cleaned {deleted} invalid repo(s)")
+
+                if kept:
+                    first_valid = f"{username}/{kept[0]}"
+                    print_info(f"🔄 Syncing: {kept[0]}...")
+
+                    if sync_fork_with_upstream(first_valid, token):
+                        print_success("✅ Synced")
+                        set_repo_public(first_valid, token)
+                        outcome["synced"] = True
+                        outcome["success"] = True
+                    else:
+                        print_warning("⚠️  Sync failed")
+                else:
+                    request_fork()
+            else:
+                request_fork()
+
+    return outcome
 
 
 def invoke_auto_create_or_sync_fork():
@@ -283,7 +681,7 @@ def invoke_auto_create_or_sync_fork():
         print_error("Konfigurasi belum diset.")
         return
 
-    token_cache = load_json_file(TOKEN_CACHE_FILE)
+    token_cache = load_live_token_cache()
     if not token_cache:
         print_error("Token cache kosong.")
         return
@@ -291,7 +689,7 @@ def invoke_auto_create_or_sync_fork():
     total_accounts = len(token_cache)
     print_info(f"📊 Memulai proses untuk {total_accounts} akun...")
 
-    forked_users = read_file_lines(FORKED_REPOS_FILE)
+    forked_users = get_state_store().users_with("forked")
     main_username = config['main_account_username']
     source_repo = f"{main_username}/{config['main_repo_name']}"
     repo_name = config['main_repo_name']
@@ -327,105 +725,42 @@ def invoke_auto_create_or_sync_fork():
     print(f"\n{'='*50}")
     print_info("PROCESSING...")
     print('='*50)
+
+    fork_paths = [f"{u}/{repo_name}" for u in users_to_process]
+    resolved = prefetch_repo_metadata(fork_paths, config['main_token'])
+    print_info(f"🔎 Metadata {resolved}/{len(fork_paths)} fork di-resolve via GraphQL")
     
     success_count = 0
     sync_count = 0
     create_count = 0
     skip_count = 0
     
-    for i, (username, token) in enumerate(users_to_process.items(), 1):
+    def process(entry: Tuple[int, Tuple[str, str]]) -> Dict[str, Any]:
+        i, (username, token) = entry
         print(f"\n[{i}/{len(users_to_process)}] @{username}")
         print('-'*50)
-        
-        fork_repo = f"{username}/{repo_name}"
-        is_valid_fork = check_if_correct_fork(fork_repo, token, source_repo)
-        
-        if is_valid_fork:
-            print_success("✅ Valid fork detected")
-            
-            if action == 'y':
-                print_warning("⚠️  Force deleting valid fork...")
-                matching = get_user_repos_matching_pattern(token, repo_name)
-                if matching:
-                    deleted, _ = cleanup_repos(username, token, matching, source_repo, repo_name, force_delete_all=True)
-                    if deleted > 0:
-                        print_success(f"✅ Deleted {deleted} repo(s)")
-                        time.sleep(3)
-                
-                print_info("🍴 Creating new fork...")
-                if create_new_fork(username, token, source_repo, fork_repo):
-                    create_count += 1
-                    success_count += 1
-                else:
-                    skip_count += 1
-            else:
-                print_info("🔄 Syncing...")
-                if sync_fork_with_upstream(fork_repo, token):
-                    print_success("✅ Synced")
-                    sync_count += 1
-                else:
-                    print_warning("⚠️  Sync failed")
-                
-                set_repo_public(fork_repo, token)
-                
-                if username not in forked_users:
-                    append_to_file(FORKED_REPOS_FILE, username)
-                
-                success_count += 1
+        return process_fork_for_user(username, token, source_repo, repo_name, action, forked_users)
+
+    entries = list(enumerate(users_to_process.items(), 1))
+    pending_forks = []
+    for (_, (username, token)), outcome in run_batch(entries, process, token_of=lambda entry: entry[1][1], delay=2):
+        outcome = outcome or {}
+        if outcome.get("fork"):
+            pending_forks.append({"username": username, "token": token, "repo": outcome["fork"]})
+            continue
+        if outcome.get("success"):
+            success_count += 1
         else:
-            matching_repos = get_user_repos_matching_pattern(token, repo_name)
-            
-            if action == 'y':
-                if matching_repos:
-                    print_warning(f"⚠️  Force deleting ALL {len(matching_repos)} repo(s)...")
-                    deleted, _ = cleanup_repos(username, token, matching_repos, source_repo, repo_name, force_delete_all=True)
-                    if deleted > 0:
-                        print_success(f"✅ Deleted {deleted} repo(s)")
-                        time.sleep(3)
-                
-                print_info("🍴 Creating new fork...")
-                if create_new_fork(username, token, source_repo, fork_repo):
-                    create_count += 1
-                    success_count += 1
-                else:
-                    skip_count += 1
-            else:
-                if matching_repos:
-                    print_info("🔍 Checking repos...")
-                    deleted, kept = cleanup_repos(username, token, matching_repos, source_repo, repo_name, force_delete_all=False)
-                    
-                    if deleted > 0:
-                        print_success(f"✅ Cleaned {deleted} invalid repo(s)")
-                        time.sleep(3)
-                    
-                    if kept:
-                        first_valid = f"{username}/{kept[0]}"
-                        print_info(f"🔄 Syncing: {kept[0]}...")
-                        
-                        if sync_fork_with_upstream(first_valid, token):
-                            print_success("✅ Synced")
-                            set_repo_public(first_valid, token)
-                            sync_count += 1
-                            success_count += 1
-                        else:
-                            print_warning("⚠️  Sync failed")
-                            skip_count += 1
-                    else:
-                        print_info("🍴 Creating new fork...")
-                        if create_new_fork(username, token, source_repo, fork_repo):
-                            create_count += 1
-                            success_count += 1
-                        else:
-                            skip_count += 1
-                else:
-                    print_info("🍴 Creating new fork...")
-                    if create_new_fork(username, token, source_repo, fork_repo):
-                        create_count += 1
-                        success_count += 1
-                    else:
-                        skip_count += 1
-        
-        time.sleep(2)
+            skip_count += 1
+        if outcome.get("synced"):
+            sync_count += 1
+
+    if pending_forks:
+        print(f"\n{'='*50}")
+        finished = await_forks(pending_forks)
+        create_count = len(finished)
+        success_count += len(finished)
+        skip_count += len(pending_forks) - len(finished)
     
     print(f"\n{'='*50}")
     print_success("✅ Proses selesai!")
@@ -2,8 +2,13 @@
 
 import json
 import time
+import base64
+import hashlib
 import tempfile
+import threading
+import uuid
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
 from .helpers import (
     print_success,
@@ -12,46 +17,46 @@ from .helpers import (
     print_warning,
     print_header,
     run_gh_api,
-    read_file_lines,
     append_to_file,
     load_json_file,
     run_command,
     enable_workflow,
     disable_workflow,
+    invalidate_repo_cache,
+    forget_workflow_id,
+    get_setting,
+    write_log,
+    BASE_DIR,
     CONFIG_FILE,
-    TOKEN_CACHE_FILE,
-    FORKED_REPOS_FILE,
-    WORKFLOWS_ENABLED_FILE
+    WORKFLOWS_ENABLED_FILE,
+    DEPLOY_MIRROR_DIR
 )
-from .collaboration import sync_fork_with_upstream
-from .utils import check_actions_usage
+from .collaboration import (
+    sync_fork_with_upstream,
+    prefetch_repo_metadata,
+    get_default_branch,
+    get_cached_repo_metadata
+)
+from .billing import get_billing_snapshot
+from .scheduler import get_plan_targets
+from .executor import run_batch
+from .state import get_state_store
+from .tokens import load_live_token_cache
+from .monitor import RunMonitor
 
 
 def enable_actions_on_repo(repo_path: str, token: str) -> bool:
-    """Mengaktifkan GitHub Actions pada repositori menggunakan metode file input."""
+    """Mengaktifkan GitHub Actions pada repositori (payload dikirim dari memori)."""
     print_info("🔧 Enabling GitHub Actions on repository...")
     
     payload = {
         "enabled": True,
         "allowed_actions": "all"
     }
-    
-    temp_file_path = None
-    try:
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(payload, f)
-            temp_file_path = f.name
-
-        cmd = f'api -X PUT repos/{repo_path}/actions/permissions --input "{temp_file_path}"'
-        result = run_gh_api(cmd, token, timeout=30)
-        
-    finally:
-        if temp_file_path and Path(temp_file_path).exists():
-            Path(temp_file_path).unlink()
+    result = run_gh_api(f"api -X PUT repos/{repo_path}/actions/permissions", token, timeout=30, input_data=payload)
 
     if result["success"]:
         print_success("✅ Actions enabled on repository")
-        time.sleep(2)
         return True
     else:
         error_msg = result.get('error', '').lower()
@@ -65,12 +70,323 @@ def enable_actions_on_repo(repo_path: str, token: str) -> bool:
         return False
 
 
+DEPLOY_COMMIT_MESSAGE = "Deploy/Update Datagram workflow"
+
+
+def git_blob_sha(content: bytes) -> str:
+    """Hash blob git (sama dengan `git hash-object`)."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def load_deploy_bundle() -> Dict[str, bytes]:
+    """Membaca file yang di-deploy (setting `deploy_files`, path relatif root repo)."""
+    bundle: Dict[str, bytes] = {}
+    for rel_path in get_setting("deploy_files"):
+        source = BASE_DIR / rel_path
+        if not source.exists():
+            raise FileNotFoundError(str(source))
+        bundle[rel_path] = source.read_bytes()
+    return bundle
+
+
+def get_remote_blob_sha(repo_path: str, token: str, file_path: str, ref: str) -> Dict[str, Any]:
+    """SHA blob file di remote lewat Contents API ({"sha": None} jika belum ada)."""
+    result = run_gh_api(f"api repos/{repo_path}/contents/{file_path}?ref={ref}", token, max_retries=2)
+    if result["success"]:
+        try:
+            return {"sha": json.loads(result["output"]).get("sha"), "error": None}
+        except json.JSONDecodeError:
+            return {"sha": None, "error": "invalid contents response"}
+    if "404" in (result.get("error") or "") or "not found" in (result.get("error") or "").lower():
+        return {"sha": None, "error": None}
+    return {"sha": None, "error": result.get("error")}
+
+
+def _get_json(command: str, token: str) -> Optional[Dict[str, Any]]:
+    result = run_gh_api(command, token, max_retries=2)
+    if not result["success"]:
+        write_log(f"{command} failed: {result.get('error')}")
+        return None
+    try:
+        return json.loads(result["output"])
+    except json.JSONDecodeError:
+        return None
+
+
+def _commit_bundle(repo_path: str, token: str, branch: str, files: Dict[str, bytes]) -> Dict[str, Any]:
+    """Membuat tree + commit dari file bundle lalu memajukan ref branch."""
+    ref = _get_json(f"api repos/{repo_path}/git/ref/heads/{branch}", token)
+    if not ref:
+        return {"success": False, "error": f"branch {branch} tidak ditemukan"}
+    parent_sha = ref["object"]["sha"]
+
+    parent = _get_json(f"api repos/{repo_path}/git/commits/{parent_sha}", token)
+    if not parent:
+        return {"success": False, "error": "gagal membaca commit terakhir"}
+
+    tree_payload = {
+        "base_tree": parent["tree"]["sha"],
+        "tree": [
+            {"path": path, "mode": "100644", "type": "blob", "content": content.decode("utf-8")}
+            for path, content in files.items()
+        ]
+    }
+    result = run_gh_api(f"api -X POST repos/{repo_path}/git/trees", token, input_data=tree_payload)
+    if not result["success"]:
+        return {"success": False, "error": result.get("error")}
+    tree_sha = json.loads(result["output"])["sha"]
+
+    commit_payload = {"message": DEPLOY_COMMIT_MESSAGE, "tree": tree_sha, "parents": [parent_sha]}
+    result = run_gh_api(f"api -X POST repos/{repo_path}/git/commits", token, input_data=commit_payload)
+    if not result["success"]:
+        return {"success": False, "error": result.get("error")}
+    commit_sha = json.loads(result["output"])["sha"]
+
+    result = run_gh_api(
+        f"api -X PATCH repos/{repo_path}/git/refs/heads/{branch}", token,
+        max_retries=1, input_data={"sha": commit_sha, "force": False}
+    )
+    if not result["success"]:
+        return {"success": False, "error": result.get("error"), "conflict": "422" in (result.get("error") or "")}
+    return {"success": True, "sha": commit_sha}
+
+
+def deploy_via_api(repo_path: str, token: str, bundle: Dict[str, bytes]) -> Dict[str, Any]:
+    """Deploy tanpa clone: bandingkan SHA blob, commit lewat Git Data API bila berbeda.
+
+    Returns:
+        {"status": "unchanged" | "committed" | "error", "error": ...}
+    """
+    branch = get_default_branch(repo_path, token)
+    changed: Dict[str, bytes] = {}
+    for file_path, content in bundle.items():
+        remote = get_remote_blob_sha(repo_path, token, file_path, branch)
+        if remote["error"]:
+            return {"status": "error", "error": remote["error"]}
+        if remote["sha"] != git_blob_sha(content):
+            changed[file_path] = content
+
+    if not changed:
+        return {"status": "unchanged", "error": None}
+
+    print_info(f"📤 Membuat commit via API ({len(changed)} file)...")
+    result = _commit_bundle(repo_path, token, branch, changed)
+    if not result["success"] and result.get("conflict"):
+        # Branch bergerak di antara baca ref dan update ref; ulangi sekali.
+        result = _commit_bundle(repo_path, token, branch, changed)
+    if not result["success"]:
+        return {"status": "error", "error": result.get("error")}
+
+    meta = get_cached_repo_metadata(repo_path)
+    if meta is not None:
+        meta["head_sha"] = result["sha"]
+    return {"status": "committed", "error": None}
+
+
+def deploy_via_clone(repo_path: str, token: str, bundle: Dict[str, bytes]) -> Dict[str, Any]:
+    """Deploy lewat git clone --depth 1, commit, push."""
+    with tempfile.TemporaryDirectory() as temp_dir_str:
+        temp_dir = Path(temp_dir_str)
+        print_info("📥 Cloning repository...")
+        clone_cmd = f"git clone --depth 1 https://{token}@github.com/{repo_path}.git ."
+        clone_result = run_command(clone_cmd, cwd=temp_dir, timeout=120)
+        if clone_result.returncode != 0:
+            return {"status": "error", "error": f"Clone failed: {clone_result.stderr}"}
+
+        changed = []
+        for file_path, content in bundle.items():
+            target_path = temp_dir / file_path
+            if target_path.exists() and target_path.read_bytes() == content:
+                continue
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            target_path.write_bytes(content)
+            changed.append(file_path)
+
+        if not changed:
+            return {"status": "unchanged", "error": None}
+        print_success(f"✅ {len(changed)} file written.")
+
+        print_info("📤 Committing and pushing...")
+        run_command("git config user.name 'Datagram Bot'", cwd=temp_dir)
+        run_command("git config user.email 'bot@datagram.local'", cwd=temp_dir)
+        run_command("git add " + " ".join(changed), cwd=temp_dir)
+
+        commit_result = run_command(f'git commit -m "{DEPLOY_COMMIT_MESSAGE}"', cwd=temp_dir)
+        if "nothing to commit" in commit_result.stdout.lower() or "no changes" in commit_result.stdout.lower():
+            return {"status": "unchanged", "error": None}
+
+        push_result = run_command("git push", cwd=temp_dir, timeout=120)
+        if push_result.returncode != 0:
+            return {"status": "error", "error": f"Push failed: {push_result.stderr}"}
+        return {"status": "committed", "error": None}
+
+
+def _git_auth_env(token: str) -> Dict[str, str]:
+    """Header auth git lewat env (token tidak muncul di command line maupun config mirror)."""
+    basic = base64.b64encode(f"x-access-token:{token}".encode("utf-8")).decode("ascii")
+    return {
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.https://github.com/.extraheader",
+        "GIT_CONFIG_VALUE_0": f"AUTHORIZATION: basic {basic}",
+        "GIT_TERMINAL_PROMPT": "0",
+    }
+
+
+def _mirror_git(args: str, env: Optional[Dict[str, str]] = None, timeout: int = 120):
+    return run_command(f'git --git-dir="{DEPLOY_MIRROR_DIR}" {args}', env=env, timeout=timeout)
+
+
+def prepare_mirror_commit(main_repo: str, token: str, bundle: Dict[str, bytes]) -> Dict[str, Any]:
+    """Memperbarui mirror bare lokal (partial clone) dan membangun commit deploy sekali.
+
+    Returns:
+        {"sha": commit yang di-push ke semua target, "base": head branch yang menjadi
+         parent commit tersebut, "branch": ..., "error": ...}
+    """
+    auth_env = _git_auth_env(token)
+    branch = get_default_branch(main_repo, token)
+    remote_url = f"https://github.com/{main_repo}.git"
+
+    if not (DEPLOY_MIRROR_DIR / "HEAD").exists():
+        print_info("📥 Membuat mirror lokal (partial clone, tanpa blob)...")
+        DEPLOY_MIRROR_DIR.parent.mkdir(parents=True, exist_ok=True)
+        result = run_command(
+            f'git clone --bare --filter=blob:none "{remote_url}" "{DEPLOY_MIRROR_DIR}"',
+            env=auth_env, timeout=300
+        )
+    else:
+        _mirror_git(f'remote set-url origin "{remote_url}"')
+        result = _mirror_git(
+            f"fetch --filter=blob:none origin +refs/heads/{branch}:refs/heads/{branch}", env=auth_env
+        )
+    if result.returncode != 0:
+        return {"sha": None, "base": None, "branch": branch, "error": f"Mirror update failed: {result.stderr.strip()}"}
+
+    head = _mirror_git(f"rev-parse refs/heads/{branch}").stdout.strip()
+    head_tree = _mirror_git(f"rev-parse {head}^{{tree}}").stdout.strip()
+    if not head or not head_tree:
+        return {"sha": None, "base": None, "branch": branch, "error": f"Branch {branch} tidak ada di mirror"}
+
+    with tempfile.TemporaryDirectory() as temp_dir_str:
+        temp_dir = Path(temp_dir_str)
+        index_env = {"GIT_INDEX_FILE": str(temp_dir / "index")}
+        if _mirror_git(f"read-tree {head}", env=index_env).returncode != 0:
+            return {"sha": None, "base": head, "branch": branch, "error": "read-tree failed"}
+
+        for i, (file_path, content) in enumerate(bundle.items()):
+            blob_file = temp_dir / f"blob{i}"
+            blob_file.write_bytes(content)
+            blob_sha = _mirror_git(f'hash-object -w --no-filters "{blob_file}"').stdout.strip()
+            result = _mirror_git(f'update-index --add --cacheinfo "100644,{blob_sha},{file_path}"', env=index_env)
+            if not blob_sha or result.returncode != 0:
+                return {"sha": None, "base": head, "branch": branch, "error": f"Gagal menambahkan {file_path} ke index"}
+
+        tree = _mirror_git("write-tree", env=index_env).stdout.strip()
+
+    if tree == head_tree:
+        return {"sha": head, "base": head, "branch": branch, "error": None}
+
+    commit_env = {
+        "GIT_AUTHOR_NAME": "Datagram Bot", "GIT_AUTHOR_EMAIL": "bot@datagram.local",
+        "GIT_COMMITTER_NAME": "Datagram Bot", "GIT_COMMITTER_EMAIL": "bot@datagram.local",
+    }
+    result = _mirror_git(f'commit-tree {tree} -p {head} -m "{DEPLOY_COMMIT_MESSAGE}"', env=commit_env)
+    if result.returncode != 0:
+        return {"sha": None, "base": head, "branch": branch, "error": f"commit-tree failed: {result.stderr.strip()}"}
+    return {"sha": result.stdout.strip(), "base": head, "branch": branch, "error": None}
+
+
+def deploy_via_mirror(repo_path: str, token: str, deploy_commit: Dict[str, Any]) -> Dict[str, Any]:
+    """Push commit deploy yang sudah dibangun dari mirror ke satu repo target.
+
+    Status "non-fast-forward" berarti branch target tidak berada di base mirror
+    (fork belum sinkron atau punya commit sendiri) sehingga push ditolak.
+    """
+    result = _mirror_git(
+        f'push --porcelain "https://github.com/{repo_path}.git" '
+        f'{deploy_commit["sha"]}:refs/heads/{deploy_commit["branch"]}',
+        env=_git_auth_env(token), timeout=180
+    )
+    if result.returncode != 0:
+        output = f"{result.stdout}\n{result.stderr}"
+        if any(line.startswith("!\t") for line in result.stdout.splitlines()) and (
+                "non-fast-forward" in output or "fetch first" in output):
+            return {"status": "non-fast-forward",
+                    "error": f"Push ditolak (non-fast-forward): {repo_path} tidak berada di {deploy_commit['base'][:7]}"}
+        return {"status": "error", "error": f"Push failed: {(result.stderr or result.stdout).strip()[:200]}"}
+    for line in result.stdout.splitlines():
+        if line.startswith("=\t"):
+            return {"status": "unchanged", "error": None}
+    return {"status": "committed", "error": None}
+
+
+def deploy_single(repo_path: str, token: str, bundle: Dict[str, bytes], deploy_mode: str) -> Dict[str, Any]:
+    """Deploy bundle ke satu repo lewat Git Data API, fallback ke git clone."""
+    outcome = {"status": "error", "error": None}
+    if deploy_mode != "clone":
+        try:
+            outcome = deploy_via_api(repo_path, token, bundle)
+        except (KeyError, TypeError, AttributeError, ValueError, UnicodeDecodeError) as e:
+            outcome = {"status": "error", "error": str(e)}
+        if outcome["status"] == "error":
+            print_warning(f"⚠️ Deploy via API gagal ({outcome['error']}), fallback ke git clone...")
+    if outcome["status"] == "error":
+        try:
+            outcome = deploy_via_clone(repo_path, token, bundle)
+        except Exception as e:
+            outcome = {"status": "error", "error": f"Error during deployment: {str(e)}"}
+    return outcome
+
+
+def deploy_repo(repo_path: str, token: str, bundle: Dict[str, bytes], deploy_mode: str,
+                deploy_commit: Optional[Dict[str, Any]] = None,
+                push_slots: Optional[threading.BoundedSemaphore] = None) -> Dict[str, Any]:
+    """Deploy ke satu repo: push commit mirror jika tersedia, selain itu deploy_single."""
+    if deploy_commit is None:
+        return deploy_single(repo_path, token, bundle, deploy_mode)
+
+    meta = get_cached_repo_metadata(repo_path)
+    head_sha = meta.get("head_sha") if meta is not None else None
+    if head_sha and head_sha != deploy_commit["base"]:
+        # Push commit mirror pasti ditolak sebagai non-fast-forward; langsung lewat API.
+        print_info(f"ℹ️  Head {head_sha[:7]} berbeda dari base mirror, deploy via API...")
+        return deploy_single(repo_path, token, bundle, "api")
+
+    if push_slots is not None:
+        with push_slots:
+            outcome = deploy_via_mirror(repo_path, token, deploy_commit)
+    else:
+        outcome = deploy_via_mirror(repo_path, token, deploy_commit)
+    if outcome["status"] == "non-fast-forward":
+        print_warning(f"⚠️ {outcome['error']}, deploy via API...")
+        outcome = deploy_single(repo_path, token, bundle, "api")
+    elif outcome["status"] == "error":
+        print_warning(f"⚠️ {outcome['error']}, fallback per repo...")
+        outcome = deploy_single(repo_path, token, bundle, deploy_mode)
+    return outcome
+
+
+def report_deploy(repo_path: str, token: str, outcome: Dict[str, Any], workflow_file: str) -> bool:
+    """Mencetak hasil deploy dan menyegarkan cache workflow repo; True jika berhasil."""
+    if outcome["status"] == "unchanged":
+        print_info("ℹ️  Workflow file is already up to date.")
+        enable_workflow(repo_path, token, workflow_file)
+        return True
+    if outcome["status"] == "committed":
+        print_success("✅ Push successful")
+        invalidate_repo_cache(repo_path)
+        forget_workflow_id(repo_path, workflow_file)
+        return True
+    print_error(f"❌ {outcome['error']}")
+    return False
+
+
 def deploy_to_github():
     """Men-deploy file workflow ke repositori target."""
     print_header("10. DEPLOY TO GITHUB")
     config = load_json_file(CONFIG_FILE)
-    token_cache = load_json_file(TOKEN_CACHE_FILE)
-    forked_users = read_file_lines(FORKED_REPOS_FILE)
+    token_cache = load_live_token_cache()
+    forked_users = get_state_store().users_with("forked")
 
     if not config or not token_cache:
         print_error("Konfigurasi atau cache token tidak lengkap.")
@@ -80,9 +396,10 @@ def deploy_to_github():
     print_info(f"📊 Memulai proses untuk {total_accounts} akun...")
 
     workflow_file = "datagram-runner.yml"
-    workflow_source = Path(__file__).parent.parent / ".github" / "workflows" / workflow_file
-    if not workflow_source.exists():
-        print_error(f"File workflow tidak ditemukan: {workflow_source}")
+    try:
+        bundle = load_deploy_bundle()
+    except FileNotFoundError as e:
+        print_error(f"File deploy tidak ditemukan: {e}")
         return
 
     print("Pilih target deployment:\n 1. Main repo saja\n 2. Semua forked repos\n 3. Main + semua forks")
@@ -101,12 +418,29 @@ def deploy_to_github():
         print_warning("Operasi dibatalkan.")
         return
 
-    workflow_content = workflow_source.read_text(encoding='utf-8')
     success_count = 0
     failed_count = 0
     main_username = config['main_account_username']
+    deploy_mode = get_setting("deploy_mode")
+
+    fork_paths = [t['repo'] for t in targets if t['username'] != main_username]
+    if fork_paths:
+        prefetch_repo_metadata(fork_paths, config['main_token'])
+
+    deploy_commit: Optional[Dict[str, Any]] = None
+    if deploy_mode == "mirror":
+        main_repo = f"{main_username}/{config['main_repo_name']}"
+        deploy_commit = prepare_mirror_commit(main_repo, config['main_token'], bundle)
+        if deploy_commit["error"]:
+            print_warning(f"⚠️ Mirror tidak tersedia ({deploy_commit['error']}), memakai mode API...")
+            deploy_mode, deploy_commit = "api", None
+        else:
+            print_success(f"✅ Commit deploy dibangun sekali: {deploy_commit['sha'][:7]}")
 
-    for i, target in enumerate(targets, 1):
+    push_slots = threading.BoundedSemaphore(max(1, int(get_setting("deploy_push_concurrency"))))
+
+    def deploy_target(entry: Tuple[int, Dict[str, str]]) -> bool:
+        i, target = entry
         repo_path, token, username = target['repo'], target['token'], target['username']
         print(f"\n{'='*47}\n[{i}/{len(targets)}] Deploying to: {repo_path}\n{'='*47}")
 
@@ -116,58 +450,19 @@ def deploy_to_github():
                 print_success("✅ Fork berhasil disinkronkan")
             else:
                 print_warning("⚠️ Sinkronisasi fork gagal, melanjutkan deployment...")
-            time.sleep(2)
 
         enable_actions_on_repo(repo_path, token)
-
-        with tempfile.TemporaryDirectory() as temp_dir_str:
-            temp_dir = Path(temp_dir_str)
-            try:
-                print_info("📥 Cloning repository...")
-                clone_cmd = f"git clone --depth 1 https://{token}@github.com/{repo_path}.git ."
-                clone_result = run_command(clone_cmd, cwd=temp_dir, timeout=120)
-                if clone_result.returncode != 0:
-                    print_error(f"❌ Clone failed: {clone_result.stderr}")
-                    failed_count += 1
-                    continue
-
-                workflow_dir = temp_dir / ".github" / "workflows"
-                workflow_dir.mkdir(parents=True, exist_ok=True)
-                
-                workflow_target_path = workflow_dir / workflow_file
-                if workflow_target_path.exists() and workflow_target_path.read_text(encoding='utf-8') == workflow_content:
-                    print_info("ℹ️  Workflow file is already up to date.")
-                    success_count += 1
-                    enable_workflow(repo_path, token, workflow_file)
-                    continue
-
-                workflow_target_path.write_text(workflow_content, encoding='utf-8')
-                print_success(f"✅ Workflow file written.")
-
-                print_info("📤 Committing and pushing...")
-                run_command("git config user.name 'Datagram Bot'", cwd=temp_dir)
-                run_command("git config user.email 'bot@datagram.local'", cwd=temp_dir)
-                run_command(f"git add .github/workflows/{workflow_file}", cwd=temp_dir)
-                
-                commit_result = run_command('git commit -m "Deploy/Update Datagram workflow"', cwd=temp_dir)
-                if "nothing to commit" in commit_result.stdout.lower() or "no changes" in commit_result.stdout.lower():
-                     print_info("ℹ️ No changes to commit.")
-                     success_count += 1
-                     enable_workflow(repo_path, token, workflow_file)
-                     continue
-
-                push_result = run_command(f"git push", cwd=temp_dir, timeout=120)
-                if push_result.returncode == 0:
-                    print_success("✅ Push successful")
-                    success_count += 1
-                else:
-                    print_error(f"❌ Push failed: {push_result.stderr}")
-                    failed_count += 1
-
-            except Exception as e:
-                print_error(f"❌ Error during deployment: {str(e)}")
-                failed_count += 1
-            time.sleep(2)
+        outcome = deploy_repo(repo_path, token, bundle, deploy_mode, deploy_commit, push_slots)
+        return report_deploy(repo_path, token, outcome, workflow_file)
+
+    entries = list(enumerate(targets, 1))
+    workers = int(get_setting("deploy_concurrency"))
+    for _, ok in run_batch(entries, deploy_target, token_of=lambda entry: entry[1]['token'],
+                           delay=2, max_workers=workers):
+        if ok:
+            success_count += 1
+        else:
+            failed_count += 1
 
     print_success(f"\n{'='*47}")
     print_success(f"✅ Deployment selesai!")
@@ -176,54 +471,18 @@ def deploy_to_github():
 
 
 def wait_for_workflow_completion(repo_path: str, token: str, run_id: int, timeout: int = 21600) -> bool:
-    """Menunggu hingga workflow run selesai (completed)."""
-    start_time = time.time()
-    poll_interval = 30
-    
-    print_info(f"⏳ Menunggu workflow run #{run_id} selesai...")
-    
-    while (time.time() - start_time) < timeout:
-        result = run_gh_api(
-            f"api repos/{repo_path}/actions/runs/{run_id}",
-            token,
-            timeout=30
-        )
-        
-        if not result["success"]:
-            print_warning(f"⚠️ Gagal mengecek status: {result.get('error')}")
-            time.sleep(poll_interval)
-            continue
-        
-        try:
-            run_data = json.loads(result["output"])
-            status = run_data.get("status", "")
-            conclusion = run_data.get("conclusion", "")
-            
-            if status == "completed":
-                if conclusion == "success":
-                    print_success(f"✅ Workflow selesai dengan status: {conclusion}")
-                else:
-                    print_warning(f"⚠️ Workflow selesai dengan status: {conclusion}")
-                return True
-            
-            elapsed = int(time.time() - start_time)
-            print_info(f"   Status: {status} | Elapsed: {elapsed//60}m {elapsed%60}s")
-            
-        except (json.JSONDecodeError, KeyError) as e:
-            print_warning(f"⚠️ Error parsing workflow status: {str(e)}")
-        
-        time.sleep(poll_interval)
-    
-    print_error(f"❌ Timeout: Workflow tidak selesai dalam {timeout//60} menit")
-    return False
+    """Menunggu hingga satu workflow run (run_id diketahui) selesai; False jika timeout."""
+    monitor = RunMonitor(timeout=timeout)
+    monitor.track(repo_path, token, time.time(), run_id=run_id)
+    return all(run["done"] for run in monitor.run())
 
 
 def invoke_workflow_trigger():
-    """Memicu workflow di repositori target secara berurutan per akun."""
-    print_header("11. TRIGGER WORKFLOW (SEQUENTIAL)")
+    """Memicu workflow di semua repositori target lalu memantau semua run bersamaan."""
+    print_header("11. TRIGGER WORKFLOW")
     config = load_json_file(CONFIG_FILE)
-    token_cache = load_json_file(TOKEN_CACHE_FILE)
-    forked_users = read_file_lines(FORKED_REPOS_FILE)
+    token_cache = load_live_token_cache()
+    forked_users = get_state_store().users_with("forked")
     
     if not config or not token_cache:
         print_error("Konfigurasi atau cache token tidak lengkap.")
@@ -232,10 +491,15 @@ def invoke_workflow_trigger():
     total_accounts = len(token_cache)
     print_info(f"📊 Memulai proses untuk {total_accounts} akun...")
 
-    print("Pilih target:\n 1. Main repo saja\n 2. Semua forked repos\n 3. Main + semua forks")
-    choice = input("\nPilihan (1/2/3): ").strip()
+    print("Pilih target:\n 1. Main repo saja\n 2. Semua forked repos\n 3. Main + semua forks\n 4. Sesuai rencana scheduler (tanpa konfirmasi billing)")
+    choice = input("\nPilihan (1/2/3/4): ").strip()
     
     targets = []
+    if choice == '4':
+        targets = get_plan_targets(config, token_cache)
+        if not targets:
+            print_warning("Rencana scheduler belum dibuat atau kosong.")
+            return
     if choice in ['1', '3']:
         targets.append({
             'repo': f"{config['main_account_username']}/{config['main_repo_name']}", 
@@ -261,104 +525,85 @@ def invoke_workflow_trigger():
     success_count = 0
     failed_count = 0
     
-    print_info(f"\n🚀 Akan memicu workflow untuk {len(targets)} akun secara BERURUTAN")
-    print_warning(f"⚠️ Ambang batas billing: {billing_threshold} menit")
-    
-    if input("\nLanjutkan? (y/n): ").lower() != 'y':
-        print_warning("Operasi dibatalkan.")
-        return
+    print_info(f"\n🚀 Akan memicu workflow untuk {len(targets)} akun lalu memantau semua run bersamaan")
+    if choice != '4':
+        print_warning(f"⚠️ Ambang batas billing: {billing_threshold} menit")
+        if input("\nLanjutkan? (y/n): ").lower() != 'y':
+            print_warning("Operasi dibatalkan.")
+            return
+
+    if choice == '4':
+        # Rencana scheduler sudah memperhitungkan sisa menit tiap akun.
+        approved = list(targets)
+    else:
+        print_info("📊 Mengambil data billing semua akun...")
+        billing = get_billing_snapshot({t['username']: t['token'] for t in targets})
+
+        approved = []
+        for target in targets:
+            username = target['username']
+            usage_minutes = billing.get(username, {}).get("minutes", 0)
+            print_info(f"📊 {username}: {usage_minutes}/{billing_threshold} menit terpakai")
+            if usage_minutes >= billing_threshold:
+                print_warning(f"⚠️ PERINGATAN: Penggunaan Actions ({usage_minutes} menit) melebihi threshold!")
+                if input(f"   Tetap lanjutkan untuk {username}? (y/n): ").lower() != 'y':
+                    print_warning(f"⏭️ Melewati {username}")
+                    failed_count += 1
+                    continue
+            approved.append(target)
+
+    def dispatch(entry: Tuple[int, Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        i, target = entry
+        repo_path, token = target['repo'], target['token']
+        print(f"\n[{i}/{len(approved)}] {target['username']}")
 
-    for i, target in enumerate(targets, 1):
-        repo_path = target['repo']
-        token = target['token']
-        username = target['username']
-        
-        print(f"\n{'='*50}")
-        print(f"[{i}/{len(targets)}] Processing: {username}")
-        print('='*50)
-        
-        print_info("📊 Mengecek penggunaan Actions...")
-        usage_minutes = check_actions_usage(username, token)
-        print_info(f"   Total menit terpakai: {usage_minutes}/{billing_threshold}")
-        
-        if usage_minutes >= billing_threshold:
-            print_warning(f"⚠️ PERINGATAN: Penggunaan Actions ({usage_minutes} menit) melebihi threshold!")
-            if input(f"   Tetap lanjutkan untuk {username}? (y/n): ").lower() != 'y':
-                print_warning(f"⏭️ Melewati {username}")
-                failed_count += 1
-                continue
-        
         print_info("🔓 Enabling workflow...")
         if not enable_workflow(repo_path, token, workflow_file):
             print_error("❌ Gagal enable workflow")
-            failed_count += 1
-            continue
-        
-        time.sleep(3)
-        
+            return None
+        get_state_store().set_workflow_enabled(repo_path, True)
+
         print_info(f"🚀 Memicu workflow untuk {repo_path}...")
-        trigger_result = run_gh_api(
-            f"api -X POST repos/{repo_path}/actions/workflows/{workflow_file}/dispatches -f ref=main",
-            token,
-            timeout=30
-        )
-        
+        dispatch_cmd = f"api -X POST repos/{repo_path}/actions/workflows/{workflow_file}/dispatches -f ref=main"
+        correlation_id: Optional[str] = uuid.uuid4().hex[:12]
+        dispatched_at = time.time()
+        trigger_result = run_gh_api(f'{dispatch_cmd} -f "inputs[correlation_id]={correlation_id}"', token, timeout=30)
+        if not trigger_result["success"] and "unexpected inputs" in (trigger_result.get("error") or "").lower():
+            # Workflow di repo ini belum punya input correlation_id (belum di-deploy ulang).
+            correlation_id = None
+            dispatched_at = time.time()
+            trigger_result = run_gh_api(dispatch_cmd, token, timeout=30)
         if not trigger_result["success"]:
             print_error(f"❌ Gagal memicu workflow: {trigger_result.get('error')}")
+            return None
+
+        print_success(f"✅ Workflow berhasil dipicu{f' (ID: {correlation_id})' if correlation_id else ''}")
+        return {"dispatched_at": dispatched_at, "correlation_id": correlation_id}
+
+    def on_complete(run: Dict[str, Any]):
+        if disable_workflow(run["repo"], run["token"], workflow_file):
+            get_state_store().set_workflow_enabled(run["repo"], False)
+        print_info(f"🔒 {run['label']}: workflow di-disable setelah selesai")
+
+    monitor = RunMonitor()
+    dispatched = 0
+    entries = list(enumerate(approved, 1))
+    for (_, target), dispatch_info in run_batch(entries, dispatch, token_of=lambda entry: entry[1]['token'], delay=1):
+        if dispatch_info is None:
             failed_count += 1
             continue
-        
-        print_success("✅ Workflow berhasil dipicu")
-        
-        time.sleep(10)
-        
-        print_info("🔍 Mencari workflow run yang baru saja dipicu...")
-        runs_result = run_gh_api(
-            f"api repos/{repo_path}/actions/runs?per_page=1",
-            token,
-            timeout=30
-        )
-        
-        if not runs_result["success"]:
-            print_error(f"❌ Gagal mengambil workflow runs: {runs_result.get('error')}")
-            failed_count += 1
-            continue
-        
-        try:
-            runs_data = json.loads(runs_result["output"])
-            workflow_runs = runs_data.get("workflow_runs", [])
-            
-            if not workflow_runs:
-                print_error("❌ Tidak ada workflow run ditemukan")
-                failed_count += 1
-                continue
-            
-            run_id = workflow_runs[0].get("id")
-            if not run_id:
-                print_error("❌ Run ID tidak valid")
-                failed_count += 1
-                continue
-            
-            print_info(f"🎯 Monitoring workflow run ID: {run_id}")
-            
-            if wait_for_workflow_completion(repo_path, token, run_id):
-                print_info("🔒 Disabling workflow after completion...")
-                disable_workflow(repo_path, token, workflow_file)
-                
+        dispatched += 1
+        monitor.track(target['repo'], target['token'], dispatch_info["dispatched_at"],
+                      on_complete=on_complete, label=target['username'],
+                      correlation_id=dispatch_info["correlation_id"])
+
+    if dispatched:
+        print()
+        for run in monitor.run():
+            if run["done"]:
                 success_count += 1
-                print_success(f"✅ Akun {username} selesai\n")
             else:
-                print_error(f"❌ Akun {username} gagal atau timeout\n")
                 failed_count += 1
-            
-        except (json.JSONDecodeError, KeyError, IndexError) as e:
-            print_error(f"❌ Error parsing workflow runs: {str(e)}")
-            failed_count += 1
-            continue
-        
-        if i < len(targets):
-            print_info("⏸️ Delay 5 detik sebelum akun berikutnya...")
-            time.sleep(5)
 
     print_success(f"\n{'='*50}")
     print_success(f"✅ Proses selesai!")
@@ -370,8 +615,8 @@ def show_workflow_status():
     """Menampilkan status 3 workflow run terakhir."""
     print_header("12. SHOW WORKFLOW STATUS")
     config = load_json_file(CONFIG_FILE)
-    token_cache = load_json_file(TOKEN_CACHE_FILE)
-    forked_users = read_file_lines(FORKED_REPOS_FILE)
+    token_cache = load_live_token_cache()
+    forked_users = get_state_store().users_with("forked")
     
     if not config or not token_cache:
         print_error("Konfigurasi atau cache token tidak lengkap.")
@@ -404,29 +649,38 @@ def show_workflow_status():
     success_count = 0
     failed_count = 0
 
-    for i, target in enumerate(targets, 1):
+    def fetch_status(entry: Tuple[int, Dict[str, str]]) -> bool:
+        i, target = entry
         repo_path = target['repo']
-        token = target['token']
-        
         print(f"{'='*47}\n[{i}/{len(targets)}] {repo_path}\n{'='*47}")
-        result = run_gh_api(
-            f"api repos/{repo_path}/actions/runs --jq '.workflow_runs[:3] | .[] | \"\\(.status) | \\(.conclusion // \"running\") | \\(.created_at)\"'",
-            token, 
-            timeout=30
-        )
+        result = run_gh_api(f"api repos/{repo_path}/actions/runs?per_page=3", target['token'], timeout=30)
         
-        if result["success"] and result["output"]:
-            for run in result["output"].strip().split("\n"):
-                print(f"  {run}")
-            success_count += 1
-        elif not result["output"]:
-             print("  ℹ️ No workflow runs found")
-             success_count += 1
+        ok = False
+        if result["success"]:
+            try:
+                runs = json.loads(result["output"] or "{}").get("workflow_runs", [])[:3]
+            except json.JSONDecodeError:
+                runs = None
+            if runs is None:
+                print_error("  ❌ Failed to parse workflow runs")
+            elif runs:
+                for run in runs:
+                    print(f"  {run.get('status')} | {run.get('conclusion') or 'running'} | {run.get('created_at')}")
+                ok = True
+            else:
+                print("  ℹ️ No workflow runs found")
+                ok = True
         else:
             print_error(f"  ❌ Failed to fetch status: {result.get('error')}")
-            failed_count += 1
         print()
-        time.sleep(1)
+        return ok
+
+    entries = list(enumerate(targets, 1))
+    for _, ok in run_batch(entries, fetch_status, token_of=lambda entry: entry[1]['token'], delay=1):
+        if ok:
+            success_count += 1
+        else:
+            failed_count += 1
 
     print_success(f"\n{'='*47}")
     print_success(f"✅ Proses selesai!")
@@ -0,0 +1,228 @@
+# orchestrator/eventlog.py
+
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Field terstruktur yang dikenal; field lain tetap ditulis apa adanya.
+LOG_FIELDS = ("account", "repo", "operation", "status", "latency_ms")
+
+_TAIL_BLOCK_SIZE = 8192
+
+
+def _timestamp(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch).isoformat(timespec="milliseconds")
+
+
+def tail_lines(path: Path, count: int) -> List[str]:
+    """`count` baris terakhir file dengan membaca blok dari belakang (tidak bergantung ukuran file)."""
+    if count <= 0:
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        # +1 karena baris terakhir biasanya diakhiri newline.
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(_TAIL_BLOCK_SIZE, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return lines[-count:]
+
+
+class EventLog:
+    """Logger JSONL dengan buffer di thread writer tunggal.
+
+    write() hanya memasukkan record ke antrean, sehingga worker paralel
+    tidak menunggu disk dan baris tidak pernah saling menimpa. Thread
+    writer menulis per batch, merotasi file bila melebihi `max_bytes` atau
+    umur segmen `rotate_seconds`, lalu mengompres segmen lama dengan gzip
+    dan menyimpan `backup_count` segmen terbaru.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, rotate_seconds: float, backup_count: int,
+                 flush_interval: float = 0.5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._segment_started: Optional[float] = None
+
+    def write(self, message: str, level: str = "info", **fields: Any):
+        record: Dict[str, Any] = {"ts": _timestamp(time.time()), "level": level, "message": message}
+        record.update({key: value for key, value in fields.items() if value is not None})
+        self._ensure_started()
+        self._queue.put(record)
+
+    def flush(self, timeout: float = 5.0):
+        """Menunggu semua record yang sudah diantrekan tertulis ke disk."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.flush_interval
+            while True:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.time())))
+                except queue.Empty:
+                    break
+                if isinstance(batch[-1], threading.Event):
+                    break
+
+            records = [item for item in batch if not isinstance(item, threading.Event)]
+            if records:
+                try:
+                    self._write_batch(records)
+                except Exception as e:
+                    os.write(2, f"Error writing log: {e}\n".encode("utf-8", "replace"))
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _write_batch(self, records: List[Dict[str, Any]]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._should_rotate():
+            self._rotate()
+        lines = [(json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8") for record in records]
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        # Batch besar dipecah agar segmen tidak jauh melewati max_bytes.
+        chunk: List[bytes] = []
+        for line in lines:
+            if self.max_bytes > 0 and size > 0 and size + len(line) > self.max_bytes:
+                self._append(chunk)
+                chunk, size = [], 0
+                self._rotate()
+            chunk.append(line)
+            size += len(line)
+        self._append(chunk)
+
+    def _append(self, lines: List[bytes]):
+        if not lines:
+            return
+        with open(self.path, "ab") as f:
+            f.write(b"".join(lines))
+        if self._segment_started is None:
+            self._segment_started = time.time()
+
+    def _read_segment_start(self) -> Optional[float]:
+        """Waktu record pertama segmen aktif; 0 untuk log teks lama (langsung dirotasi)."""
+        try:
+            with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                first = f.readline()
+        except FileNotFoundError:
+            return None
+        if not first:
+            return None
+        try:
+            return datetime.fromisoformat(json.loads(first)["ts"]).timestamp()
+        except (ValueError, KeyError, TypeError):
+            return 0.0
+
+    def _should_rotate(self) -> bool:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            self._segment_started = None
+            return False
+        if size == 0:
+            return False
+        if self._segment_started is None:
+            self._segment_started = self._read_segment_start()
+        if self.max_bytes > 0 and size >= self.max_bytes:
+            return True
+        return (self.rotate_seconds > 0 and self._segment_started is not None
+                and time.time() - self._segment_started >= self.rotate_seconds)
+
+    def _rotate(self):
+        segment = self.path.with_name(f"{self.path.name}.{time.strftime('%Y%m%d-%H%M%S')}")
+        suffix = 1
+        while segment.exists() or segment.with_name(segment.name + ".gz").exists():
+            segment = self.path.with_name(f"{self.path.name}.{time.strftime('%Y%m%d-%H%M%S')}-{suffix}")
+            suffix += 1
+        self.path.replace(segment)
+        self._segment_started = None
+        self._compress(segment)
+        self._prune()
+
+    @staticmethod
+    def _compress(segment: Path):
+        import gzip
+        import shutil
+        target = segment.with_name(segment.name + ".gz")
+        with open(segment, "rb") as source, gzip.open(target, "wb") as destination:
+            shutil.copyfileobj(source, destination)
+        segment.unlink()
+
+    def rotated_segments(self) -> List[Path]:
+        """Segmen terkompresi, terbaru lebih dulu."""
+        def modified(segment: Path) -> int:
+            try:
+                return segment.stat().st_mtime_ns
+            except OSError:
+                return 0
+        return sorted(self.path.parent.glob(f"{self.path.name}.*.gz"), key=modified, reverse=True)
+
+    def _prune(self):
+        for old in self.rotated_segments()[max(0, self.backup_count):]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+def format_log_line(line: str) -> str:
+    """Satu baris JSONL menjadi teks yang mudah dibaca; baris teks lama dikembalikan apa adanya."""
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        return line.rstrip()
+    if not isinstance(record, dict):
+        return line.rstrip()
+
+    parts = [f"[{str(record.get('ts', '')).replace('T', ' ')}]"]
+    if record.get("level") not in (None, "info"):
+        parts.append(str(record["level"]).upper())
+    if record.get("operation"):
+        parts.append(str(record["operation"]))
+    if record.get("account"):
+        parts.append(f"@{record['account']}")
+    if record.get("repo"):
+        parts.append(str(record["repo"]))
+    if record.get("status") is not None:
+        parts.append(f"HTTP {record['status']}")
+    if record.get("latency_ms") is not None:
+        parts.append(f"{record['latency_ms']}ms")
+    extra = {k: v for k, v in record.items() if k not in ("ts", "level", "message") + LOG_FIELDS}
+    parts.append(str(record.get("message", "")))
+    if extra:
+        parts.append(json.dumps(extra, ensure_ascii=False, default=str))
+    return " ".join(parts)
@@ -0,0 +1,305 @@
+# orchestrator/executor.py
+
+import io
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .helpers import get_setting, get_metrics, print_error, write_log
+
+
+class _ThreadOutputRouter(io.TextIOBase):
+    """Mengalihkan print() dari worker thread ke buffer per thread.
+
+    Dipasang sekali sebagai sys.stdout (lihat _install_router) dan tidak
+    pernah dilepas, sehingga batch bersarang atau bersamaan tidak saling
+    memulihkan stdout. Setiap thread punya tumpukan buffer: capture()
+    menambah, release() mengambil yang teratas. Thread tanpa capture
+    menulis langsung ke stdout asli.
+    """
+
+    def __init__(self, target):
+        self._target = target
+        self._buffers: Dict[int, List[io.StringIO]] = {}
+        self._lock = threading.Lock()
+
+    def capture(self):
+        with self._lock:
+            self._buffers.setdefault(threading.get_ident(), []).append(io.StringIO())
+
+    def release(self) -> str:
+        ident = threading.get_ident()
+        with self._lock:
+            stack = self._buffers.get(ident)
+            buffer = stack.pop() if stack else None
+            if not stack:
+                self._buffers.pop(ident, None)
+        return buffer.getvalue() if buffer else ""
+
+    def sink(self) -> Any:
+        """Tujuan output thread ini saat ini (buffer capture teratas atau stdout asli)."""
+        stack = self._buffers.get(threading.get_ident())
+        return stack[-1] if stack else self._target
+
+    def write(self, text: str) -> int:
+        return self.sink().write(text)
+
+    def flush(self):
+        if threading.get_ident() not in self._buffers:
+            self._target.flush()
+
+    @property
+    def encoding(self):
+        return getattr(self._target, "encoding", "utf-8")
+
+    def isatty(self) -> bool:
+        return self._target.isatty()
+
+
+_router: Optional[_ThreadOutputRouter] = None
+_router_lock = threading.Lock()
+
+
+def _install_router() -> _ThreadOutputRouter:
+    """Memasang router sebagai sys.stdout (sekali); stdout pengganti lain dijadikan target."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = _ThreadOutputRouter(sys.stdout)
+        if sys.stdout is not _router:
+            _router._target = sys.stdout
+            sys.stdout = _router
+        return _router
+
+
+class _TokenLimiter:
+    """Membatasi jumlah request paralel per token."""
+
+    def __init__(self, per_token: int):
+        self._per_token = max(1, per_token)
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: Optional[str]) -> Optional[threading.BoundedSemaphore]:
+        if not token:
+            return None
+        with self._lock:
+            if token not in self._semaphores:
+                self._semaphores[token] = threading.BoundedSemaphore(self._per_token)
+            return self._semaphores[token]
+
+
+def is_parallel_mode() -> bool:
+    return get_setting("execution_mode") != "sequential"
+
+
+def _stage_name(worker: Callable[[Any], Any]) -> str:
+    """Label tahap untuk metrik, mis. `invoke_auto_invite.invite`."""
+    return getattr(worker, "__qualname__", type(worker).__name__).replace(".<locals>", "")
+
+
+def _call_worker(worker: Callable[[Any], Any], item: Any, stage: Optional[str] = None) -> Any:
+    started = time.time()
+    outcome = "error"
+    try:
+        result = worker(item)
+        outcome = "ok" if result else "failed"
+        return result
+    except Exception as e:
+        write_log(f"Worker error: {str(e)}", level="error")
+        print_error(f" ❌ Error: {str(e)}")
+        return None
+    finally:
+        metrics = get_metrics()
+        stage = stage or _stage_name(worker)
+        metrics.inc("stage_items_total", stage=stage, outcome=outcome)
+        metrics.observe("stage_item_duration_seconds", time.time() - started, stage=stage)
+
+
+def run_batch(items: List[Any], worker: Callable[[Any], Any],
+              token_of: Callable[[Any], Optional[str]] = lambda item: None,
+              delay: float = 0, max_workers: Optional[int] = None) -> Iterator[Tuple[Any, Any]]:
+    """Menjalankan worker untuk setiap item dan menghasilkan (item, hasil) berurutan.
+
+    Mode paralel memakai thread pool dengan batas global (`max_workers`) dan
+    batas per token (`per_token_concurrency`); output tiap item dicetak utuh
+    sesuai urutan akun. Mode sequential (`execution_mode`) menjalankan item
+    satu per satu dengan jeda `delay` detik seperti perilaku lama. Exception
+    di worker dicatat ke log dan menghasilkan None. Durasi dan hasil tiap
+    item dicatat ke metrik `stage_items_total` dengan nama worker sebagai tahap.
+    """
+    if not items:
+        return
+
+    if not is_parallel_mode():
+        for i, item in enumerate(items):
+            yield item, _call_worker(worker, item)
+            if delay and i < len(items) - 1:
+                time.sleep(delay)
+        return
+
+    workers = max_workers or int(get_setting("max_workers"))
+    limiter = _TokenLimiter(int(get_setting("per_token_concurrency")))
+    router = _install_router()
+
+    def run_captured(item: Any) -> Tuple[Any, str]:
+        router.capture()
+        try:
+            semaphore = limiter.get(token_of(item))
+            if semaphore is None:
+                result = _call_worker(worker, item)
+            else:
+                with semaphore:
+                    result = _call_worker(worker, item)
+        finally:
+            output = router.release()
+        return result, output
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as pool:
+        futures = [pool.submit(run_captured, item) for item in items]
+        for item, future in zip(items, futures):
+            result, output = future.result()
+            if output:
+                # Ditulis dari thread pemanggil: masuk ke buffer capture-nya jika batch ini bersarang.
+                router.write(output)
+                router.flush()
+            yield item, result
+
+
+class Stage:
+    """Satu tahap pipeline: worker(item) -> bool, dijalankan setelah semua `depends_on` sukses."""
+
+    def __init__(self, name: str, worker: Callable[[Any], Any], depends_on: Sequence[str] = (),
+                 concurrency: int = 4, token_of: Callable[[Any], Optional[str]] = lambda item: None):
+        self.name = name
+        self.worker = worker
+        self.depends_on = tuple(depends_on)
+        self.concurrency = max(1, concurrency)
+        self.token_of = token_of
+
+
+def run_pipeline(items: List[Any], stages: List[Stage]) -> List[Dict[str, Optional[bool]]]:
+    """Menjalankan graf tahap (DAG) untuk setiap item secara independen.
+
+    Tahap suatu item dijalankan begitu semua dependensinya untuk item itu
+    sukses, tanpa menunggu item lain. Setiap tahap punya thread pool sendiri
+    (`Stage.concurrency`) dan tetap tunduk pada `per_token_concurrency`.
+    Output tiap tugas dicetak utuh setelah selesai. Mode sequential
+    menjalankan item satu per satu sesuai urutan tahap.
+
+    Returns:
+        Per item {nama tahap: True (sukses) / False (gagal) / None (terblokir)}.
+    """
+    results: List[Dict[str, Optional[bool]]] = [{} for _ in items]
+    if not items:
+        return results
+
+    dependents: Dict[str, List[Stage]] = {stage.name: [] for stage in stages}
+    for stage in stages:
+        for dep in stage.depends_on:
+            dependents[dep].append(stage)
+
+    def ready_or_blocked(index: int, stage: Stage) -> Optional[bool]:
+        """True = siap dijalankan, False = terblokir, None = masih menunggu dependensi."""
+        outcome = results[index]
+        if any(dep in outcome and outcome[dep] is not True for dep in stage.depends_on):
+            return False
+        if all(outcome.get(dep) is True for dep in stage.depends_on):
+            return True
+        return None
+
+    if not is_parallel_mode():
+        for index, item in enumerate(items):
+            for stage in stages:
+                state = ready_or_blocked(index, stage)
+                if state:
+                    results[index][stage.name] = bool(_call_worker(stage.worker, item, stage.name))
+                else:
+                    results[index][stage.name] = None
+                    get_metrics().inc("stage_items_total", stage=stage.name, outcome="blocked")
+        return results
+
+    limiter = _TokenLimiter(int(get_setting("per_token_concurrency")))
+    router = _install_router()
+    sink = router.sink()
+    pools = {stage.name: ThreadPoolExecutor(max_workers=stage.concurrency, thread_name_prefix=f"stage-{stage.name}")
+             for stage in stages}
+    lock = threading.Lock()
+    output_lock = threading.Lock()
+    remaining = [len(items) * len(stages)]
+    finished = threading.Event()
+
+    def settle(index: int, stage_name: str, ok: Optional[bool]) -> List[Stage]:
+        """Mencatat hasil (dengan lock) dan mengembalikan tahap dependen yang siap."""
+        if stage_name in results[index]:
+            return []
+        results[index][stage_name] = ok
+        remaining[0] -= 1
+        if ok is None:
+            get_metrics().inc("stage_items_total", stage=stage_name, outcome="blocked")
+        runnable = []
+        for dependent in dependents[stage_name]:
+            if dependent.name in results[index]:
+                continue
+            state = ready_or_blocked(index, dependent)
+            if state is True:
+                runnable.append(dependent)
+            elif state is False:
+                runnable.extend(settle(index, dependent.name, None))
+        return runnable
+
+    def submit(index: int, stage: Stage):
+        pools[stage.name].submit(run_task, index, stage)
+
+    def run_task(index: int, stage: Stage):
+        """Tugas satu (item, tahap); apa pun yang gagal, item tetap di-settle agar loop selesai."""
+        ok = False
+        try:
+            item = items[index]
+            router.capture()
+            try:
+                semaphore = limiter.get(stage.token_of(item))
+                if semaphore is None:
+                    ok = bool(_call_worker(stage.worker, item, stage.name))
+                else:
+                    with semaphore:
+                        ok = bool(_call_worker(stage.worker, item, stage.name))
+            finally:
+                output = router.release()
+            if output:
+                with output_lock:
+                    sink.write(output)
+                    sink.flush()
+        except Exception as e:
+            write_log(f"Pipeline task error ({stage.name}): {str(e)}", level="error")
+            ok = False
+        with lock:
+            try:
+                runnable = settle(index, stage.name, ok)
+            except Exception as e:
+                write_log(f"Pipeline settle error ({stage.name}): {str(e)}", level="error")
+                runnable = []
+                for other in stages:
+                    if other.name not in results[index]:
+                        results[index][other.name] = False if other is stage else None
+                        remaining[0] -= 1
+            done = remaining[0] == 0
+        for next_stage in runnable:
+            submit(index, next_stage)
+        if done:
+            finished.set()
+
+    try:
+        roots = [stage for stage in stages if not stage.depends_on]
+        for index in range(len(items)):
+            for stage in roots:
+                submit(index, stage)
+        while not finished.wait(0.5):
+            pass
+    finally:
+        for pool in pools.values():
+            pool.shutdown(wait=True, cancel_futures=not finished.is_set())
+    return results
+
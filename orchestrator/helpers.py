@@ -7,8 +7,21 @@ import subprocess
 import time
 import shutil
 import re
+import shlex
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Any, Optional
+
+from .ratelimit import RateLimitGovernor, classify_failure, detect_method, THROTTLED
+from .eventlog import EventLog, tail_lines, format_log_line
+from .metrics import MetricsRegistry, endpoint_template
+
+if TYPE_CHECKING:
+    # http_client (ssl, http.client) dan response_cache (sqlite3) baru di-import
+    # saat request pertama agar start menu tetap cepat.
+    from .http_client import GitHubHTTPClient
+    from .response_cache import ResponseCache
 
 BASE_DIR = Path(__file__).parent.parent
 CONFIG_DIR = BASE_DIR / "config"
@@ -18,12 +31,70 @@ LOGS_DIR = BASE_DIR / "logs"
 API_KEYS_FILE = CONFIG_DIR / "api_keys.txt"
 TOKENS_FILE = CONFIG_DIR / "tokens.txt"
 CONFIG_FILE = CONFIG_DIR / "config.json"
+SETTINGS_FILE = CONFIG_DIR / "settings.json"
 TOKEN_CACHE_FILE = CACHE_DIR / "token_cache.json"
 INVITED_USERS_FILE = CACHE_DIR / "invited_users.txt"
 ACCEPTED_USERS_FILE = CACHE_DIR / "accepted_users.txt"
 FORKED_REPOS_FILE = CACHE_DIR / "forked_repos.txt"
 SECRETS_SET_FILE = CACHE_DIR / "secrets_set.txt"
+SECRETS_STATE_FILE = CACHE_DIR / "secrets_state.json"
 WORKFLOWS_ENABLED_FILE = CACHE_DIR / "workflows_enabled.txt"
+RESPONSE_CACHE_FILE = CACHE_DIR / "http_cache.sqlite3"
+WORKFLOW_IDS_FILE = CACHE_DIR / "workflow_ids.json"
+PUBLIC_KEYS_FILE = CACHE_DIR / "public_keys.json"
+DEPLOY_MIRROR_DIR = CACHE_DIR / "deploy_mirror.git"
+BILLING_CACHE_FILE = CACHE_DIR / "billing_usage.json"
+SCHEDULE_PLAN_FILE = CACHE_DIR / "schedule_plan.json"
+TOOL_PROBE_FILE = CACHE_DIR / "tool_probe.json"
+LOG_FILE = LOGS_DIR / "setup.log"
+STATE_DB_FILE = CACHE_DIR / "state.sqlite3"
+
+# Nilai default untuk config/settings.json (opsional, semua key boleh dihilangkan).
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "api_backend": "http",          # "http" (native, pooled) atau "gh" (GitHub CLI)
+    "api_base_url": None,           # None = https://api.github.com (http_client.DEFAULT_API_URL)
+    "execution_mode": "parallel",   # "parallel" atau "sequential" (perilaku lama, satu per satu)
+    "max_workers": 8,               # batas global worker paralel
+    "per_token_concurrency": 2,     # batas request paralel per token
+    "min_write_interval": 1.0,      # jeda minimum (detik) antar request tulis per token (secondary rate limit)
+    "rate_limit_reserve": 50,       # di bawah sisa kuota ini request disebar merata sampai reset
+    "rate_limit_max_wait": 3600,    # batas tunggu throttled (detik) sebelum request dianggap gagal
+    "response_cache": True,         # cache ETag untuk GET status/metadata (backend http)
+    "response_cache_max_mb": 50,    # ukuran maksimum cache respons sebelum eviksi LRU
+    "public_key_ttl": 86400,        # masa berlaku cache public key secrets per repo (detik)
+    "secret_verify_skew": 120,      # toleransi selisih jam lokal vs GitHub saat verifikasi secret (detik)
+    "deploy_mode": "api",           # "api" (Git Data API), "mirror" (satu mirror lokal, push ke banyak fork) atau "clone"
+    "deploy_push_concurrency": 4,   # jumlah proses git push paralel pada mode mirror
+    "deploy_concurrency": 8,        # jumlah target yang diproses bersamaan saat Deploy
+    "monitor_fast_interval": 15,    # interval polling run selama masih queued / belum ditemukan (detik)
+    "monitor_slow_interval": 60,    # interval polling run yang sedang in_progress (detik)
+    "billing_cache_ttl": 900,       # masa berlaku snapshot menit Actions per akun (detik)
+    "actions_minutes_limit": 2000,  # kuota menit Actions per akun per bulan (dipakai scheduler)
+    "max_keys_per_account": 20,     # batas job (API key) paralel per akun pada rencana scheduler
+    "token_validation_ttl": 21600,  # masa berlaku hasil validasi token sebelum dicek ulang (detik, 0 = tanpa background)
+    "token_validation_concurrency": 32,  # jumlah token yang divalidasi bersamaan
+    "pipeline_concurrency": {"invite": 2, "accept": 8, "fork": 8, "secrets": 8, "deploy": 4},  # worker per tahap Onboarding Pipeline
+    "log_max_mb": 10,               # rotasi log JSONL saat ukurannya melebihi ini (MB, 0 = tanpa batas ukuran)
+    "log_rotate_hours": 24,         # rotasi log JSONL setelah umur segmen ini (jam, 0 = tanpa rotasi waktu)
+    "log_backup_count": 10,         # jumlah segmen log lama (.gz) yang disimpan
+    "log_api_requests": False,      # catat setiap request API (operation, status, latency), bukan hanya yang gagal
+    "metrics_textfile": "logs/metrics.prom",  # snapshot metrik Prometheus setelah setiap aksi (relatif ke root project, None = mati)
+    "metrics_port": 0,              # port endpoint HTTP /metrics di 127.0.0.1 (0 = mati)
+    "deploy_files": [".github/workflows/datagram-runner.yml"],  # file yang di-deploy dalam satu commit
+}
+
+_settings: Optional[Dict[str, Any]] = None
+_api_client: Optional["GitHubHTTPClient"] = None
+_rate_governor: Optional[RateLimitGovernor] = None
+_response_cache: Optional["ResponseCache"] = None
+_event_log: Optional[EventLog] = None
+_event_log_lock = threading.Lock()
+_metrics = MetricsRegistry()
+_workflow_ids: Optional[Dict[str, int]] = None
+_workflow_ids_lock = threading.Lock()
+_file_lock = threading.Lock()
+# Menyerialkan baca-ubah-tulis tokens.txt / token cache antara menu dan thread revalidasi background.
+token_files_lock = threading.RLock()
 
 def find_gh_executable():
     """Find gh executable with better Windows support"""
@@ -40,7 +111,23 @@ def find_gh_executable():
                 return path
     return gh_path
 
-GH_EXECUTABLE = find_gh_executable()
+_gh_executable: Optional[str] = None
+_gh_resolved = False
+
+def get_gh_executable() -> Optional[str]:
+    """Path gh, di-resolve saat pertama dibutuhkan (atau diisi check_dependencies dari cache)."""
+    global _gh_executable, _gh_resolved
+    if not _gh_resolved:
+        _gh_executable = find_gh_executable()
+        _gh_resolved = True
+    return _gh_executable
+
+# Tool wajib: nama -> (label, URL install, fungsi pencari path).
+_TOOLS = {
+    "gh": ("GitHub CLI", "https://cli.github.com/", find_gh_executable),
+    "git": ("Git", "https://git-scm.com/downloads", lambda: shutil.which("git")),
+}
+_tool_probe_thread: Optional[threading.Thread] = None
 
 class Style:
     HEADER = '\033[95m'
@@ -70,74 +157,255 @@ def print_header(msg: str):
     print(f"{Style.HEADER} {msg}{Style.ENDC}")
     print(f"{Style.HEADER}{'═' * 47}{Style.ENDC}\n")
 
+def get_setting(key: str) -> Any:
+    global _settings
+    if _settings is None:
+        _settings = {**DEFAULT_SETTINGS, **load_json_file(SETTINGS_FILE)}
+    return _settings.get(key, DEFAULT_SETTINGS.get(key))
+
+def get_rate_governor() -> RateLimitGovernor:
+    global _rate_governor
+    if _rate_governor is None:
+        _rate_governor = RateLimitGovernor(
+            min_write_interval=float(get_setting("min_write_interval")),
+            reserve=int(get_setting("rate_limit_reserve"))
+        )
+    return _rate_governor
+
+def get_rate_limit_status(token: str) -> Dict[str, Any]:
+    """Snapshot state rate limit untuk token: limit, remaining, reset_in, blocked_for, dll."""
+    return get_rate_governor().snapshot(token)
+
+def get_response_cache() -> Optional["ResponseCache"]:
+    global _response_cache
+    if not get_setting("response_cache"):
+        return None
+    if _response_cache is None:
+        from .response_cache import ResponseCache
+        _response_cache = ResponseCache(RESPONSE_CACHE_FILE, int(float(get_setting("response_cache_max_mb")) * 1024 * 1024))
+    return _response_cache
+
+def invalidate_repo_cache(repo_path: str):
+    """Membuang cache respons untuk repo setelah perubahan di luar API (mis. git push)."""
+    cache = get_response_cache()
+    if cache is not None:
+        cache.invalidate_prefix(f"repos/{repo_path}")
+
+def clear_response_cache():
+    """Mengosongkan cache respons HTTP (aman walau koneksi SQLite sedang terbuka)."""
+    if not RESPONSE_CACHE_FILE.exists():
+        return
+    from .response_cache import ResponseCache
+    cache = _response_cache or ResponseCache(RESPONSE_CACHE_FILE)
+    cache.clear()
+
+def get_api_client() -> "GitHubHTTPClient":
+    global _api_client
+    if _api_client is None:
+        from .http_client import GitHubHTTPClient, DEFAULT_API_URL
+        _api_client = GitHubHTTPClient(get_setting("api_base_url") or DEFAULT_API_URL)
+        governor = get_rate_governor()
+        _api_client.response_hook = lambda token, resp: governor.record_headers(token, resp.headers, resp.status)
+    return _api_client
+
 def initialize_directories():
     for dir_path in [CONFIG_DIR, CACHE_DIR, LOGS_DIR]:
         dir_path.mkdir(parents=True, exist_ok=True)
 
-def write_log(message: str):
-    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+def parse_github_time(value: Optional[str]) -> Optional[float]:
+    """Timestamp ISO GitHub ("2024-01-01T00:00:00Z") ke epoch; None jika tidak valid."""
     try:
-        with open(LOGS_DIR / "setup.log", "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] {message}\n")
-    except Exception as e:
-        print_error(f"Error writing log: {str(e)}")
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def format_github_time(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def get_event_log() -> EventLog:
+    global _event_log
+    with _event_log_lock:
+        if _event_log is None:
+            _event_log = EventLog(
+                LOG_FILE,
+                max_bytes=int(float(get_setting("log_max_mb")) * 1024 * 1024),
+                rotate_seconds=float(get_setting("log_rotate_hours")) * 3600,
+                backup_count=int(get_setting("log_backup_count"))
+            )
+        return _event_log
+
+def write_log(message: str, level: str = "info", **fields: Any):
+    """Mencatat satu event JSONL (ditulis di background, lihat EventLog).
+
+    Field terstruktur opsional: account, repo, operation, status, latency_ms.
+    """
+    get_event_log().write(message, level=level, **fields)
+
+def get_metrics() -> MetricsRegistry:
+    return _metrics
+
+def get_metrics_textfile() -> Optional[Path]:
+    configured = get_setting("metrics_textfile")
+    if not configured:
+        return None
+    path = Path(configured)
+    return path if path.is_absolute() else BASE_DIR / path
+
+def export_metrics():
+    """Menulis snapshot metrik ke `metrics_textfile` (jika diaktifkan)."""
+    path = get_metrics_textfile()
+    if path is None:
+        return
+    try:
+        _metrics.write_textfile(path)
+    except OSError as e:
+        write_log(f"Failed to write metrics textfile {path}: {str(e)}", level="warning")
+
+def start_metrics_server():
+    """Menjalankan endpoint /metrics bila `metrics_port` diisi; None jika mati atau gagal."""
+    port = int(get_setting("metrics_port") or 0)
+    if port <= 0:
+        return None
+    try:
+        return _metrics.serve(port)
+    except OSError as e:
+        print_warning(f"⚠️ Endpoint metrics di port {port} gagal dijalankan: {e}")
+        write_log(f"Metrics server failed on port {port}: {str(e)}", level="warning")
+        return None
+
+_command_start_hooks: List[Callable[[], None]] = []
+
+def on_command_start(hook: Callable[[], None]):
+    """Mendaftarkan fungsi yang dipanggil sebelum setiap aksi menu (mis. membuang cache per proses)."""
+    if hook not in _command_start_hooks:
+        _command_start_hooks.append(hook)
+
+def track_command(name: str, action: Callable[[], Any]):
+    """Menjalankan aksi menu sambil mencatat durasi dan hasilnya, lalu mengekspor metrik."""
+    started = time.time()
+    outcome = "error"
+    try:
+        for hook in list(_command_start_hooks):
+            hook()
+        action()
+        outcome = "ok"
+    except (EOFError, KeyboardInterrupt):
+        outcome = "cancelled"
+        raise
+    finally:
+        _metrics.inc("command_runs_total", command=name, outcome=outcome)
+        _metrics.observe("command_duration_seconds", time.time() - started, command=name)
+        export_metrics()
 
 def press_enter_to_continue():
     input("\nTekan Enter untuk melanjutkan...")
 
+def _executable_mtime(path: Optional[str]) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except OSError:
+        return None
+
+def resolve_tools() -> Dict[str, Dict[str, Any]]:
+    """Path tool dari cache probe selama PATH dan mtime executable tidak berubah.
+
+    Entry tanpa key "ok" berarti tool baru/berubah dan belum diprobe.
+    """
+    cache = load_json_file(TOOL_PROBE_FILE)
+    cached = cache.get("tools", {}) if cache.get("path_env") == os.environ.get("PATH", "") else {}
+    tools = {}
+    for name, (_, _, locate) in _TOOLS.items():
+        entry = cached.get(name)
+        if entry and entry.get("path") and _executable_mtime(entry["path"]) == entry.get("mtime"):
+            tools[name] = entry
+            continue
+        path = locate()
+        tools[name] = {"path": path, "mtime": _executable_mtime(path)}
+    return tools
+
+def probe_tool(path: str) -> Dict[str, Any]:
+    """Menjalankan `<tool> --version`; {"ok", "version", "error"}."""
+    try:
+        result = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=15)
+    except Exception as e:
+        return {"ok": False, "version": None, "error": str(e)}
+    if result.returncode != 0:
+        return {"ok": False, "version": None, "error": (result.stderr or "").strip() or f"exit code {result.returncode}"}
+    lines = result.stdout.strip().splitlines()
+    return {"ok": True, "version": lines[0] if lines else "", "error": None}
+
+def save_tool_probe(tools: Dict[str, Dict[str, Any]]):
+    save_json_file(TOOL_PROBE_FILE, {"path_env": os.environ.get("PATH", ""), "tools": tools})
+
+def wait_for_tool_probe(timeout: Optional[float] = None):
+    """Menunggu probe tool di background (jika ada) selesai."""
+    if _tool_probe_thread is not None:
+        _tool_probe_thread.join(timeout)
+
 def check_dependencies():
+    """Mengecek gh dan git tanpa menahan start.
+
+    Path dan versi di-cache di TOOL_PROBE_FILE per mtime executable. Tool
+    yang baru/berubah diprobe (`--version`) di background; jika probe gagal,
+    hasilnya dilaporkan pada start berikutnya.
+    """
+    global _gh_executable, _gh_resolved, _tool_probe_thread
     print_header("CHECKING DEPENDENCIES")
+    tools = resolve_tools()
     missing = False
-    if not GH_EXECUTABLE:
-        print_error("❌ GitHub CLI (gh) tidak ditemukan di PATH sistem.")
-        print_warning("Install dari: https://cli.github.com/")
-        missing = True
-    else:
-        try:
-            result = subprocess.run([GH_EXECUTABLE, "--version"], capture_output=True, text=True, timeout=15)
-            if result.returncode == 0:
-                print_success(f"✅ GitHub CLI: {result.stdout.strip().splitlines()[0]}")
-            else:
-                print_error("❌ GitHub CLI ditemukan tapi gagal dieksekusi.")
-                missing = True
-        except Exception as e:
-            print_error(f"❌ Error mengecek GitHub CLI: {str(e)}")
+    pending = []
+    for name, (label, url, _) in _TOOLS.items():
+        entry = tools[name]
+        if not entry["path"]:
+            print_error(f"❌ {label} tidak ditemukan di PATH sistem.")
+            print_warning(f"Install dari: {url}")
             missing = True
-    
-    git_executable = shutil.which("git")
-    if not git_executable:
-        print_error("❌ Git tidak ditemukan di PATH sistem.")
-        print_warning("Install dari: https://git-scm.com/downloads")
-        missing = True
-    else:
-        try:
-            result = subprocess.run([git_executable, "--version"], capture_output=True, text=True, timeout=15)
-            if result.returncode == 0:
-                print_success(f"✅ Git: {result.stdout.strip()}")
-            else:
-                print_error("❌ Git ditemukan tapi gagal dieksekusi.")
-                missing = True
-        except Exception as e:
-            print_error(f"❌ Error mengecek Git: {str(e)}")
+        elif "ok" not in entry:
+            print_success(f"✅ {label}: {entry['path']} (versi dicek di background)")
+            pending.append(name)
+        elif entry["ok"]:
+            print_success(f"✅ {label}: {entry['version']}")
+        else:
+            print_error(f"❌ {label} ditemukan tapi gagal dieksekusi: {entry.get('error')}")
             missing = True
-    
+
     if missing:
+        # Entry gagal dibuang agar start berikutnya memprobe ulang.
+        save_tool_probe({name: entry for name, entry in tools.items() if entry.get("ok")})
         print_error("\n❌ Ada dependensi yang tidak terpenuhi. Install terlebih dahulu.")
         sys.exit(1)
+
+    _gh_executable, _gh_resolved = tools["gh"]["path"], True
+    if pending:
+        def probe_pending():
+            for name in pending:
+                tools[name].update(probe_tool(tools[name]["path"]))
+                if not tools[name]["ok"]:
+                    write_log(f"Dependency probe failed for {name}: {tools[name]['error']}")
+            save_tool_probe(tools)
+
+        _tool_probe_thread = threading.Thread(target=probe_pending, name="tool-probe", daemon=True)
+        _tool_probe_thread.start()
     print_success("\n✅ Semua dependensi terpenuhi!\n")
 
-def run_command(command: str, env: Optional[Dict[str, str]] = None, timeout: int = 30, cwd: Optional[Path] = None) -> subprocess.CompletedProcess:
+def run_command(command: str, env: Optional[Dict[str, str]] = None, timeout: int = 30, cwd: Optional[Path] = None, input_data: Optional[str] = None) -> subprocess.CompletedProcess:
     if command.strip().startswith("gh "):
-        if not GH_EXECUTABLE:
+        gh_executable = get_gh_executable()
+        if not gh_executable:
             raise FileNotFoundError("GitHub CLI (gh) tidak ditemukan di PATH sistem atau lokasi standar.")
-        command = command.replace("gh ", f'"{GH_EXECUTABLE}" ', 1)
+        command = command.replace("gh ", f'"{gh_executable}" ', 1)
+    program = Path(command.split()[0].strip('"\'')).stem if command.strip() else "?"
     
     full_env = os.environ.copy()
     if env:
         full_env.update(env)
     
+    started = time.time()
+    outcome = "error"
     try:
-        return subprocess.run(
+        result = subprocess.run(
             command, 
             shell=True, 
             capture_output=True, 
@@ -145,45 +413,158 @@ def run_command(command: str, env: Optional[Dict[str, str]] = None, timeout: int
             encoding='utf-8', 
             env=full_env, 
             timeout=timeout,
-            cwd=str(cwd) if cwd else None
+            cwd=str(cwd) if cwd else None,
+            input=input_data
         )
+        outcome = "ok" if result.returncode == 0 else "failed"
+        return result
     except subprocess.TimeoutExpired:
+        outcome = "timeout"
         write_log(f"Command timeout: {command}")
         raise TimeoutError(f"Command timeout setelah {timeout}s")
     except Exception as e:
         write_log(f"Command error: {command} - {str(e)}")
         raise
+    finally:
+        _metrics.inc("subprocess_spawns_total", program=program, outcome=outcome)
+        _metrics.observe("subprocess_duration_seconds", time.time() - started, program=program)
+
+def run_gh_api(command: str, token: str, max_retries: int = 3, timeout: int = 30, input_data: Optional[Any] = None) -> Dict[str, Any]:
+    """Menjalankan `gh api ...` lewat backend native (default) atau binary gh.
 
-def run_gh_api(command: str, token: str, max_retries: int = 3, timeout: int = 30) -> Dict[str, Any]:
+    input_data (dict/list) dikirim sebagai body JSON langsung dari memori,
+    tanpa file sementara. Respons throttled ditunggu sesuai header rate limit
+    (Retry-After / X-RateLimit-Reset); 403 karena izin langsung gagal tanpa retry.
+    """
+    stdin_payload = None
+    if input_data is not None:
+        stdin_payload = json.dumps(input_data)
+        command += " --input -"
     full_command = f"gh {command}"
+
+    native_request = None
+    if get_setting("api_backend") == "http":
+        from .http_client import parse_gh_api_command, execute_gh_api_request
+        try:
+            native_request = parse_gh_api_command(command)
+        except ValueError:
+            native_request = None
     
+    governor = get_rate_governor()
+    method = native_request["method"] if native_request else detect_method(command)
+    max_wait = float(get_setting("rate_limit_max_wait"))
+    endpoint = native_request["endpoint"] if native_request else _api_endpoint(command)
+    operation = f"{method} {endpoint}"
+    template = endpoint_template(endpoint)
+    log_requests = get_setting("log_api_requests")
+    started = time.time()
+
+    def record_result(result_status: Optional[int], error: Optional[str] = None, outcome: Optional[str] = None) -> None:
+        elapsed = time.time() - started
+        _metrics.inc("api_requests_total", method=method, endpoint=template,
+                     outcome=outcome or ("error" if error else "success"))
+        _metrics.observe("api_request_duration_seconds", elapsed, method=method, endpoint=template)
+        if error is None and not log_requests:
+            return
+        write_log(error or "ok", level="error" if error else "info", operation=operation,
+                  repo=_repo_of(operation), status=result_status, latency_ms=int(elapsed * 1000))
+
+    def record_retry(reason: str) -> None:
+        _metrics.inc("api_retries_total", method=method, endpoint=template, reason=reason)
+
     for attempt in range(max_retries):
         try:
-            result = run_command(full_command, env={"GH_TOKEN": token}, timeout=timeout)
+            wait_started = time.time()
+            if not governor.acquire(token, method, max_wait=max_wait):
+                snapshot = governor.snapshot(token)
+                error = f"Rate limit (throttled): kuota habis, reset dalam {snapshot['reset_in'] or snapshot['blocked_for']}s"
+                record_result(None, error, outcome="rate_limited")
+                return {"success": False, "output": None, "error": error}
+            waited = time.time() - wait_started
+            if waited >= 0.01:
+                _metrics.inc("rate_limit_waits_total", method=method)
+                _metrics.inc("rate_limit_wait_seconds_total", waited, method=method)
+
+            if native_request is not None:
+                result = execute_gh_api_request(get_api_client(), native_request, token, timeout=timeout, input_data=input_data, cache=get_response_cache())
+            else:
+                result = run_command(full_command, env={"GH_TOKEN": token}, timeout=timeout, input_data=stdin_payload)
             
             if result.returncode == 0:
+                record_result(None)
                 return {"success": True, "output": result.stdout.strip(), "error": None}
             
             stderr = result.stderr.lower()
             if any(k in stderr for k in ["timeout", "connection", "network"]) and attempt < max_retries - 1:
+                record_retry("network")
                 time.sleep((attempt + 1) * 2)
                 continue
             
-            if ("rate limit" in stderr or "403" in stderr) and attempt < max_retries - 1:
-                time.sleep(60)
+            failure = classify_failure(stderr, governor.take_failure_headers(token))
+            if failure == THROTTLED and attempt < max_retries - 1:
+                wait = governor.throttle_wait(token, attempt)
+                record_retry("throttled")
+                write_log(f"Rate limited, menunggu {int(wait)}s sebelum retry", level="warning",
+                          operation=operation, status=_http_status(result.stderr))
                 continue
             
+            record_result(_http_status(result.stderr), result.stderr.strip())
             return {"success": False, "output": None, "error": result.stderr.strip()}
         except TimeoutError as e:
             if attempt < max_retries - 1:
+                record_retry("timeout")
                 time.sleep(5)
                 continue
+            record_result(None, str(e))
             return {"success": False, "output": None, "error": str(e)}
         except Exception as e:
+            record_result(None, str(e))
             return {"success": False, "output": None, "error": str(e)}
     
+    record_result(None, f"Max retries ({max_retries}) exceeded")
     return {"success": False, "output": None, "error": f"Max retries ({max_retries}) exceeded"}
 
+# Flag `gh api` yang diikuti nilai (bukan endpoint).
+_VALUE_FLAGS = {"-X", "--method", "-f", "-F", "--field", "--raw-field", "-H", "--header",
+                "--jq", "-q", "--input", "-t", "--template", "--cache", "--hostname", "-p", "--preview"}
+_HTTP_STATUS = re.compile(r"HTTP (\d{3})")
+_REPO_PATH = re.compile(r"^/?repos/([^/?\s]+/[^/?\s]+)")
+
+def _http_status(error: Optional[str]) -> Optional[int]:
+    """Status HTTP dari pesan error gh / native ("... (HTTP 404)")."""
+    match = _HTTP_STATUS.search(error or "")
+    return int(match.group(1)) if match else None
+
+def _api_endpoint(command: str) -> str:
+    """Endpoint dari perintah `api ...` (argumen pertama yang bukan flag) untuk field log."""
+    try:
+        parts = shlex.split(command)[1:]
+    except ValueError:
+        return command
+    previous = ""
+    for part in parts:
+        if not part.startswith("-") and previous not in _VALUE_FLAGS:
+            return part
+        previous = part
+    return command
+
+def _repo_of(operation: str) -> Optional[str]:
+    match = _REPO_PATH.search(operation.split(" ", 1)[-1])
+    return match.group(1) if match else None
+
+def poll_until(check: Callable[[], bool], timeout: float, initial_interval: float = 1.0, max_interval: float = 10.0) -> bool:
+    """Memanggil check() dengan backoff eksponensial sampai True atau timeout habis."""
+    deadline = time.time() + timeout
+    interval = initial_interval
+    while True:
+        if check():
+            return True
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, max_interval)
+
 def read_file_lines(file_path: Path) -> List[str]:
     if not file_path.exists():
         return []
@@ -197,7 +578,7 @@ def read_file_lines(file_path: Path) -> List[str]:
 def append_to_file(file_path: Path, content: str):
     file_path.parent.mkdir(parents=True, exist_ok=True)
     try:
-        with open(file_path, "a", encoding="utf-8") as f:
+        with _file_lock, open(file_path, "a", encoding="utf-8") as f:
             f.write(content + "\n")
     except Exception as e:
         write_log(f"Error appending to {file_path}: {str(e)}")
@@ -230,7 +611,36 @@ def save_json_file(file_path: Path, data: Dict):
 def validate_api_key_format(key: str) -> bool:
     return bool(key and len(key) > 10 and not key.isspace())
 
-def get_workflow_id(repo_path: str, token: str, workflow_file: str) -> Optional[int]:
+def _workflow_index_key(repo_path: str, workflow_file: str) -> str:
+    return f"{repo_path.lower()}::{workflow_file}"
+
+def _load_workflow_index() -> Dict[str, int]:
+    global _workflow_ids
+    if _workflow_ids is None:
+        _workflow_ids = load_json_file(WORKFLOW_IDS_FILE)
+    return _workflow_ids
+
+def forget_workflow_id(repo_path: str, workflow_file: Optional[str] = None):
+    """Menghapus entri index workflow ID untuk repo (atau satu file workflow)."""
+    with _workflow_ids_lock:
+        index = _load_workflow_index()
+        prefix = f"{repo_path.lower()}::"
+        keys = [k for k in index if k.startswith(prefix) and (workflow_file is None or k == prefix + workflow_file)]
+        for key in keys:
+            del index[key]
+        if keys:
+            save_json_file(WORKFLOW_IDS_FILE, index)
+
+def get_workflow_id(repo_path: str, token: str, workflow_file: str, use_cache: bool = True) -> Optional[int]:
+    """Resolusi (repo, file workflow) -> workflow ID lewat index persisten, fallback list workflows."""
+    key = _workflow_index_key(repo_path, workflow_file)
+    if use_cache:
+        cached_id = _load_workflow_index().get(key)
+        if cached_id:
+            return cached_id
+    else:
+        invalidate_repo_cache(repo_path)
+
     result = run_gh_api(f"api repos/{repo_path}/actions/workflows", token, timeout=60)
     if not result["success"]:
         write_log(f"Failed to list workflows for {repo_path}: {result.get('error')}")
@@ -238,14 +648,44 @@ def get_workflow_id(repo_path: str, token: str, workflow_file: str) -> Optional[
     
     try:
         workflows = json.loads(result["output"]).get("workflows", [])
-        for workflow in workflows:
-            if workflow_file in workflow.get("path", ""):
-                return workflow.get("id")
-        return None
-    except (json.JSONDecodeError, KeyError):
+    except (json.JSONDecodeError, KeyError, AttributeError):
         write_log(f"Failed to parse workflows JSON for {repo_path}")
         return None
 
+    workflow_id = None
+    with _workflow_ids_lock:
+        index = _load_workflow_index()
+        for workflow in workflows:
+            path = workflow.get("path", "")
+            if workflow.get("id") and path:
+                index[_workflow_index_key(repo_path, path.rsplit("/", 1)[-1])] = workflow["id"]
+            if workflow_id is None and workflow_file in path:
+                workflow_id = workflow.get("id")
+        if workflow_id is None:
+            index.pop(key, None)
+        save_json_file(WORKFLOW_IDS_FILE, index)
+    return workflow_id
+
+def _put_workflow_state(repo_path: str, token: str, workflow_file: str, workflow_id: int, action: str) -> Dict[str, Any]:
+    """PUT enable/disable; jika 404 (ID basi) index di-refresh dan dicoba sekali lagi."""
+    result = run_gh_api(
+        f"api -X PUT repos/{repo_path}/actions/workflows/{workflow_id}/{action}",
+        token,
+        timeout=30
+    )
+    if result["success"] or "http 404" not in (result.get("error") or "").lower():
+        return result
+
+    forget_workflow_id(repo_path, workflow_file)
+    fresh_id = get_workflow_id(repo_path, token, workflow_file, use_cache=False)
+    if not fresh_id or fresh_id == workflow_id:
+        return result
+    return run_gh_api(
+        f"api -X PUT repos/{repo_path}/actions/workflows/{fresh_id}/{action}",
+        token,
+        timeout=30
+    )
+
 def disable_workflow(repo_path: str, token: str, workflow_file: str) -> bool:
     workflow_id = get_workflow_id(repo_path, token, workflow_file)
     if not workflow_id:
@@ -253,11 +693,7 @@ def disable_workflow(repo_path: str, token: str, workflow_file: str) -> bool:
         write_log(f"Workflow '{workflow_file}' not found in {repo_path}, cannot disable.")
         return True # Mengembalikan True agar proses tidak berhenti
     
-    result = run_gh_api(
-        f"api -X PUT repos/{repo_path}/actions/workflows/{workflow_id}/disable",
-        token,
-        timeout=30
-    )
+    result = _put_workflow_state(repo_path, token, workflow_file, workflow_id, "disable")
     
     if result["success"]:
         write_log(f"Workflow disabled: {repo_path}/{workflow_file}")
@@ -277,11 +713,7 @@ def enable_workflow(repo_path: str, token: str, workflow_file: str) -> bool:
         write_log(f"Workflow '{workflow_file}' not found in {repo_path}, cannot enable.")
         return False
     
-    result = run_gh_api(
-        f"api -X PUT repos/{repo_path}/actions/workflows/{workflow_id}/enable",
-        token,
-        timeout=30
-    )
+    result = _put_workflow_state(repo_path, token, workflow_file, workflow_id, "enable")
     
     if result["success"]:
         write_log(f"Workflow enabled: {repo_path}/{workflow_file}")
@@ -0,0 +1,485 @@
+# orchestrator/http_client.py
+
+import gzip
+import json
+import re
+import shlex
+import socket
+import subprocess
+import threading
+import http.client
+from pathlib import Path
+from urllib.parse import urlsplit, urlencode
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+DEFAULT_API_URL = "https://api.github.com"
+USER_AGENT = "datagram-orchestrator/3.2"
+API_VERSION = "2022-11-28"
+
+# Error jaringan yang aman di-retry sekali dengan koneksi baru (keep-alive basi).
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class GitHubResponse:
+    """Respons HTTP yang sudah dibaca penuh dan didekompresi."""
+
+    def __init__(self, status: int, reason: str, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else None
+
+    def header(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.headers.get(name.lower(), default)
+
+
+class GitHubHTTPClient:
+    """Klien REST GitHub dengan connection pool keep-alive per token."""
+
+    def __init__(self, base_url: str = DEFAULT_API_URL, max_idle_per_token: int = 4):
+        parts = urlsplit(base_url.rstrip("/"))
+        self.scheme = parts.scheme or "https"
+        self.host = parts.hostname or "api.github.com"
+        self.port = parts.port
+        self.base_path = parts.path
+        self.max_idle_per_token = max_idle_per_token
+        self._pools: Dict[str, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        # Dipanggil dengan (token, GitHubResponse) setelah setiap respons, mis. oleh rate limit governor.
+        self.response_hook: Optional[Callable[[str, "GitHubResponse"], None]] = None
+
+    def _new_connection(self, timeout: int) -> http.client.HTTPConnection:
+        if self.scheme == "http":
+            return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        return http.client.HTTPSConnection(self.host, self.port, timeout=timeout)
+
+    def _acquire(self, token: str, timeout: int) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            pool = self._pools.get(token)
+            if pool:
+                conn = pool.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return self._new_connection(timeout), False
+
+    def _release(self, token: str, conn: http.client.HTTPConnection):
+        with self._lock:
+            pool = self._pools.setdefault(token, [])
+            if len(pool) < self.max_idle_per_token:
+                pool.append(conn)
+                return
+        conn.close()
+
+    def resolve_path(self, path: str) -> str:
+        """Mengubah endpoint relatif atau URL absolut menjadi path request."""
+        if path.startswith(("http://", "https://")):
+            parts = urlsplit(path)
+            return parts.path + (f"?{parts.query}" if parts.query else "")
+        return f"{self.base_path}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, token: str, body: Any = None,
+                headers: Optional[Dict[str, str]] = None, timeout: int = 30) -> GitHubResponse:
+        request_headers = {
+            "Accept": "application/vnd.github+json",
+            "Accept-Encoding": "gzip",
+            "Authorization": f"Bearer {token}",
+            "User-Agent": USER_AGENT,
+            "X-GitHub-Api-Version": API_VERSION,
+        }
+        payload = None
+        if body is not None:
+            payload = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+            request_headers["Content-Type"] = "application/json"
+        if headers:
+            request_headers.update(headers)
+
+        url = self.resolve_path(path)
+        for attempt in range(2):
+            conn, reused = self._acquire(token, timeout)
+            try:
+                conn.request(method, url, body=payload, headers=request_headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except socket.timeout:
+                conn.close()
+                raise TimeoutError(f"Request timeout setelah {timeout}s")
+            except Exception:
+                conn.close()
+                raise
+
+            response_headers = {k.lower(): v for k, v in resp.getheaders()}
+            if response_headers.get("content-encoding") == "gzip" and raw:
+                raw = gzip.decompress(raw)
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(token, conn)
+            response = GitHubResponse(resp.status, resp.reason, response_headers, raw)
+            if self.response_hook is not None:
+                self.response_hook(token, response)
+            return response
+
+        raise ConnectionError("Gagal membuat koneksi ke GitHub API")
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            for conn in pool:
+                conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Penerjemah perintah `gh api ...` ke request native
+# ---------------------------------------------------------------------------
+
+_FIELD_KEY_PATTERN = re.compile(r"^([^\[\]]+)((?:\[[^\[\]]*\])*)$")
+_JQ_TOKEN_PATTERN = re.compile(r"\.\[\]|\[\]|\.[A-Za-z_][A-Za-z0-9_]*")
+
+
+def _typed_field_value(value: str) -> Any:
+    """Meniru konversi nilai untuk flag -F/--field milik gh."""
+    if value in ("true", "false"):
+        return value == "true"
+    if value == "null":
+        return None
+    if re.fullmatch(r"-?\d+", value):
+        return int(value)
+    if value.startswith("@"):
+        return Path(value[1:]).read_text(encoding="utf-8")
+    return value
+
+
+def _assign_field(target: Dict[str, Any], key: str, value: Any):
+    """Mendukung sintaks bersarang gh: `inputs[name]=x` dan `labels[]=x`."""
+    match = _FIELD_KEY_PATTERN.match(key)
+    if not match:
+        raise ValueError(f"Field tidak didukung: {key}")
+    parts = [match.group(1)] + re.findall(r"\[([^\[\]]*)\]", match.group(2))
+    node = target
+    for i, part in enumerate(parts):
+        last = i == len(parts) - 1
+        next_is_list = not last and parts[i + 1] == ""
+        if part == "":
+            if not isinstance(node, list):
+                raise ValueError(f"Field tidak didukung: {key}")
+            if last:
+                node.append(value)
+                return
+            child: Any = {}
+            node.append(child)
+            node = child
+            continue
+        if last:
+            node[part] = value
+            return
+        node = node.setdefault(part, [] if next_is_list else {})
+
+
+def parse_gh_api_command(command: str) -> Dict[str, Any]:
+    """Mem-parsing argumen `api ...` gaya gh menjadi deskripsi request.
+
+    Melempar ValueError untuk flag yang tidak didukung sehingga pemanggil
+    dapat kembali memakai binary gh.
+    """
+    args = shlex.split(command)
+    if not args or args[0] != "api":
+        raise ValueError("Bukan perintah gh api")
+
+    request: Dict[str, Any] = {
+        "method": None,
+        "endpoint": None,
+        "fields": [],
+        "headers": {},
+        "jq": None,
+        "paginate": False,
+        "silent": False,
+        "include": False,
+        "input": None,
+    }
+    value_flags = {
+        "-X": "method", "--method": "method",
+        "-f": "raw", "--raw-field": "raw",
+        "-F": "typed", "--field": "typed",
+        "-H": "header", "--header": "header",
+        "-q": "jq", "--jq": "jq",
+        "--input": "input",
+    }
+
+    i = 1
+    while i < len(args):
+        arg = args[i]
+        flag, inline_value = arg, None
+        if arg.startswith("--") and "=" in arg:
+            flag, inline_value = arg.split("=", 1)
+
+        if flag in value_flags:
+            if inline_value is None:
+                i += 1
+                if i >= len(args):
+                    raise ValueError(f"Flag {flag} membutuhkan nilai")
+                inline_value = args[i]
+            kind = value_flags[flag]
+            if kind == "method":
+                request["method"] = inline_value.upper()
+            elif kind in ("raw", "typed"):
+                if "=" not in inline_value:
+                    raise ValueError(f"Format field tidak valid: {inline_value}")
+                key, value = inline_value.split("=", 1)
+                request["fields"].append((key, value if kind == "raw" else _typed_field_value(value)))
+            elif kind == "header":
+                name, _, value = inline_value.partition(":")
+                request["headers"][name.strip()] = value.strip()
+            elif kind == "jq":
+                request["jq"] = inline_value
+            elif kind == "input":
+                request["input"] = inline_value
+        elif arg == "--paginate":
+            request["paginate"] = True
+        elif arg == "--silent":
+            request["silent"] = True
+        elif arg in ("-i", "--include"):
+            request["include"] = True
+        elif arg.startswith("-"):
+            raise ValueError(f"Flag tidak didukung: {arg}")
+        elif request["endpoint"] is None:
+            request["endpoint"] = arg
+        else:
+            raise ValueError(f"Argumen tidak dikenal: {arg}")
+        i += 1
+
+    if not request["endpoint"]:
+        raise ValueError("Endpoint tidak ditemukan")
+    if request["jq"] is not None:
+        compile_jq_path(request["jq"])
+    if request["method"] is None:
+        has_body = request["fields"] or request["input"] is not None
+        request["method"] = "POST" if has_body else "GET"
+    return request
+
+
+def compile_jq_path(expression: str) -> List[str]:
+    """Mengompilasi subset jq berupa path sederhana (`.a.b`, `.[]`, `.[].name`)."""
+    expr = expression.strip()
+    if expr == ".":
+        return []
+    tokens = _JQ_TOKEN_PATTERN.findall(expr)
+    if not expr.startswith(".") or "".join(tokens) != expr:
+        raise ValueError(f"Ekspresi jq tidak didukung: {expression}")
+    return [t.lstrip(".") for t in tokens]
+
+
+def evaluate_jq_path(data: Any, expression: str) -> List[Any]:
+    results = [data]
+    for token in compile_jq_path(expression):
+        next_results = []
+        for item in results:
+            if token == "[]":
+                if isinstance(item, list):
+                    next_results.extend(item)
+                elif isinstance(item, dict):
+                    next_results.extend(item.values())
+                elif item is not None:
+                    raise ValueError(f"Tidak bisa iterasi nilai {type(item).__name__}")
+            elif item is None:
+                next_results.append(None)
+            elif isinstance(item, dict):
+                next_results.append(item.get(token))
+            else:
+                raise ValueError(f"Tidak bisa mengakses .{token} pada {type(item).__name__}")
+        results = next_results
+    return results
+
+
+def format_jq_output(values: List[Any]) -> str:
+    """Format output seperti `gh --jq` tanpa TTY: string mentah, sisanya JSON ringkas (key terurut)."""
+    lines = []
+    for value in values:
+        if isinstance(value, str):
+            lines.append(value)
+        else:
+            lines.append(json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True))
+    return "\n".join(lines)
+
+
+def _build_body_and_query(request: Dict[str, Any], input_data: Any) -> Tuple[Any, Dict[str, Any]]:
+    params: Dict[str, Any] = {}
+    for key, value in request["fields"]:
+        _assign_field(params, key, value)
+
+    if input_data is not None:
+        return input_data, params
+    if request["input"] is not None:
+        source = request["input"]
+        if source == "-":
+            raise ValueError("--input - membutuhkan input_data")
+        return json.loads(Path(source).read_text(encoding="utf-8")), params
+    if request["method"] == "GET":
+        return None, params
+    if request["endpoint"].lstrip("/") == "graphql":
+        body = {k: params.pop(k) for k in ("query", "operationName") if k in params}
+        if params:
+            body["variables"] = params
+        return body, {}
+    return (params or None), {}
+
+
+def _next_page_url(link_header: Optional[str]) -> Optional[str]:
+    if not link_header:
+        return None
+    for part in link_header.split(","):
+        section = part.split(";")
+        if len(section) > 1 and 'rel="next"' in section[1]:
+            return section[0].strip().strip("<>")
+    return None
+
+
+def format_api_error(response: GitHubResponse) -> str:
+    """Menyusun pesan error mirip stderr gh: `<message> (HTTP <status>)`."""
+    message = response.reason or "HTTP error"
+    details: List[str] = []
+    try:
+        data = response.json()
+        if isinstance(data, dict):
+            message = data.get("message") or message
+            for err in data.get("errors") or []:
+                if isinstance(err, dict) and err.get("message"):
+                    details.append(err["message"])
+                elif isinstance(err, str):
+                    details.append(err)
+    except ValueError:
+        pass
+    return "\n".join([f"{message} (HTTP {response.status})"] + details)
+
+
+def format_included_headers(response: GitHubResponse) -> str:
+    """Status line dan header respons seperti output `gh api --include`."""
+    lines = [f"HTTP/1.1 {response.status} {response.reason}"]
+    lines.extend(f"{name}: {value}" for name, value in response.headers.items())
+    return "\r\n".join(lines) + "\r\n\r\n"
+
+
+def parse_included_response(text: str) -> Tuple[Optional[int], Dict[str, str], str]:
+    """Memisahkan output `--include` menjadi (status, header lowercase, body)."""
+    normalized = text.replace("\r\n", "\n")
+    head, _, body = normalized.partition("\n\n")
+    lines = head.split("\n")
+    status = None
+    if lines and lines[0].startswith("HTTP/"):
+        parts = lines[0].split()
+        status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+        lines = lines[1:]
+    headers = {}
+    for line in lines:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return status, headers, body
+
+
+def _cached_get(client: GitHubHTTPClient, cache: Any, url: str, token: str,
+                headers: Dict[str, str], timeout: int) -> GitHubResponse:
+    """GET dengan cache ETag: pakai entri segar, atau kirim request kondisional."""
+    cached = cache.lookup(token, url)
+    if cached and cached["fresh"]:
+        return GitHubResponse(200, "OK", {}, cached["body"])
+
+    request_headers = dict(headers)
+    if cached:
+        if cached["etag"]:
+            request_headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            request_headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = client.request("GET", url, token, headers=request_headers, timeout=timeout)
+    if response.status == 304 and cached:
+        cache.refresh(token, url)
+        return GitHubResponse(200, "OK", response.headers, cached["body"])
+    if response.status == 200:
+        cache.store(token, url, response.body, response.header("etag"), response.header("last-modified"))
+    return response
+
+
+def execute_gh_api_request(client: GitHubHTTPClient, request: Dict[str, Any], token: str,
+                           timeout: int = 30, input_data: Any = None, cache: Any = None) -> subprocess.CompletedProcess:
+    """Menjalankan request hasil parse_gh_api_command lewat HTTP native.
+
+    Hasilnya berbentuk CompletedProcess agar logika retry di run_gh_api
+    sama persis untuk backend gh maupun native. Jika `cache` (ResponseCache)
+    diberikan, GET non-paginate dilayani lewat cache ETag dan request tulis
+    menginvalidasi entri repo terkait.
+    """
+    body, params = _build_body_and_query(request, input_data)
+    endpoint = request["endpoint"]
+    if params:
+        flat = {k: v if isinstance(v, str) else json.dumps(v) for k, v in params.items()}
+        endpoint += ("&" if "?" in endpoint else "?") + urlencode(flat)
+
+    try:
+        pages: List[Any] = []
+        url: Optional[str] = endpoint
+        response = None
+        use_cache = (cache is not None and request["method"] == "GET"
+                     and not request["paginate"] and not request["include"])
+        while url:
+            if use_cache:
+                response = _cached_get(client, cache, url, token, request["headers"], timeout)
+            else:
+                response = client.request(request["method"], url, token, body=body,
+                                          headers=request["headers"], timeout=timeout)
+            if response.status >= 400:
+                return subprocess.CompletedProcess(endpoint, 1, response.text, format_api_error(response))
+            if not request["paginate"]:
+                break
+            pages.append(response.json())
+            url = _next_page_url(response.header("link"))
+    except (OSError, http.client.HTTPException) as e:
+        if isinstance(e, TimeoutError):
+            raise
+        return subprocess.CompletedProcess(endpoint, 1, "", f"connection error: {e}")
+
+    if cache is not None and request["method"] != "GET":
+        cache.invalidate_for_write(endpoint)
+
+    if request["silent"]:
+        return subprocess.CompletedProcess(endpoint, 0, "", "")
+
+    if request["paginate"]:
+        merged = all(isinstance(p, list) for p in pages)
+        data: Any = [item for page in pages for item in page] if merged else pages
+        text = json.dumps(data, ensure_ascii=False)
+    else:
+        pages = [response.json() if request["jq"] is not None else None]
+        text = response.text
+
+    if request["jq"] is not None:
+        try:
+            values = [v for page in pages for v in evaluate_jq_path(page, request["jq"])]
+            text = format_jq_output(values)
+        except ValueError as e:
+            return subprocess.CompletedProcess(endpoint, 1, "", f"jq error: {e}")
+
+    if request["include"]:
+        text = format_included_headers(response) + text
+
+    return subprocess.CompletedProcess(endpoint, 0, text, "")
@@ -0,0 +1,190 @@
+# orchestrator/metrics.py
+
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Batas bucket histogram durasi (detik).
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# nama: (tipe, keterangan)
+METRIC_DEFINITIONS: Dict[str, Tuple[str, str]] = {
+    "api_requests_total": ("counter", "Request API per method, endpoint template dan hasil"),
+    "api_request_duration_seconds": ("histogram", "Durasi run_gh_api per endpoint template, termasuk retry"),
+    "api_retries_total": ("counter", "Retry request API per alasan (network, timeout, throttled)"),
+    "rate_limit_waits_total": ("counter", "Jumlah request yang ditahan rate limit governor"),
+    "rate_limit_wait_seconds_total": ("counter", "Total waktu tunggu rate limit governor (detik)"),
+    "subprocess_spawns_total": ("counter", "Proses anak yang dijalankan per program dan hasil"),
+    "subprocess_duration_seconds": ("histogram", "Durasi proses anak per program"),
+    "stage_items_total": ("counter", "Item yang selesai per tahap batch/pipeline dan hasil"),
+    "stage_item_duration_seconds": ("histogram", "Durasi worker per item per tahap"),
+    "command_runs_total": ("counter", "Aksi menu yang dijalankan per nama dan hasil"),
+    "command_duration_seconds": ("histogram", "Durasi aksi menu"),
+}
+
+_HEX_SHA = re.compile(r"^[0-9a-f]{40}$")
+# Segmen yang diikuti satu parameter bebas: pengganti segmen berikutnya.
+_PARAM_AFTER = {
+    "users": "{user}",
+    "orgs": "{org}",
+    "collaborators": "{user}",
+    "branches": "{branch}",
+}
+# Segmen yang diikuti path bebas sampai akhir endpoint.
+_PATH_AFTER = {"contents": "{path}", "refs": "{ref}", "ref": "{ref}"}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def endpoint_template(endpoint: str) -> str:
+    """Endpoint API tanpa bagian variabel, mis. `repos/a/b/actions/runs/5` → `repos/{owner}/{repo}/actions/runs/{id}`.
+
+    Menjaga jumlah label tetap kecil walau ada ratusan akun/repo.
+    """
+    path = endpoint.split("?", 1)[0].strip("/")
+    segments = path.split("/") if path else []
+    template: List[str] = []
+    i = 0
+    while i < len(segments):
+        segment = segments[i]
+        if segment == "repos" and i + 2 < len(segments):
+            template += ["repos", "{owner}", "{repo}"]
+            i += 3
+            continue
+        if segment in _PATH_AFTER and i + 1 < len(segments):
+            template += [segment, _PATH_AFTER[segment]]
+            break
+        if segment in _PARAM_AFTER and i + 1 < len(segments):
+            template += [segment, _PARAM_AFTER[segment]]
+            i += 2
+            continue
+        if segment.isdigit():
+            template.append("{id}")
+        elif _HEX_SHA.match(segment):
+            template.append("{sha}")
+        else:
+            template.append(segment)
+        i += 1
+    return "/".join(template) or endpoint
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """Counter dan histogram in-process, dirender dalam format teks Prometheus.
+
+    Nilai berlaku untuk satu proses (direset saat orchestrator dimulai
+    ulang), seperti counter Prometheus pada umumnya.
+    """
+
+    def __init__(self, prefix: str = "datagram_", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels: Dict[str, object]) -> LabelKey:
+        return tuple((key, str(value)) for key, value in labels.items())
+
+    def inc(self, name: str, value: float = 1.0, **labels: object):
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: object):
+        """Menambah satu observasi; disimpan sebagai [count per bucket..., sum, count]."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def value(self, name: str, **labels: object) -> float:
+        """Nilai counter (atau jumlah observasi histogram) untuk label tertentu."""
+        key = self._key(labels)
+        with self._lock:
+            if name in self._counters:
+                return self._counters[name].get(key, 0.0)
+            state = self._histograms.get(name, {}).get(key)
+            return state[-1] if state else 0.0
+
+    def render(self) -> str:
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: list(state) for key, state in series.items()}
+                          for name, series in self._histograms.items()}
+
+        lines: List[str] = []
+        for name in sorted(set(counters) | set(histograms)):
+            kind, description = METRIC_DEFINITIONS.get(name, ("counter" if name in counters else "histogram", name))
+            full_name = self.prefix + name
+            lines.append(f"# HELP {full_name} {description}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for key, total in sorted(counters.get(name, {}).items()):
+                lines.append(f"{full_name}{_format_labels(key)} {_format_value(round(total, 6))}")
+            for key, state in sorted(histograms.get(name, {}).items()):
+                for index, bound in enumerate(self.buckets):
+                    lines.append(f"{full_name}_bucket{_format_labels(key, ('le', _format_value(bound)))} "
+                                 f"{_format_value(state[index])}")
+                lines.append(f"{full_name}_bucket{_format_labels(key, ('le', '+Inf'))} {_format_value(state[-1])}")
+                lines.append(f"{full_name}_sum{_format_labels(key)} {_format_value(round(state[-2], 6))}")
+                lines.append(f"{full_name}_count{_format_labels(key)} {_format_value(state[-1])}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write_textfile(self, path: Path):
+        """Menulis snapshot secara atomik (untuk textfile collector node_exporter)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(temp, "w", encoding="utf-8", newline="\n") as f:
+            f.write(self.render())
+        os.replace(temp, path)
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """Menjalankan endpoint `/metrics` di thread daemon; mengembalikan server-nya."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
@@ -0,0 +1,181 @@
+# orchestrator/monitor.py
+
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .helpers import (
+    print_info,
+    print_success,
+    print_warning,
+    print_error,
+    run_gh_api,
+    get_setting,
+    write_log,
+    parse_github_time,
+    format_github_time
+)
+
+# Toleransi selisih jam lokal vs GitHub saat mencocokkan run dengan dispatch.
+DISPATCH_CLOCK_SKEW = 60
+# Backoff awal pencarian run baru (detik); berlipat dua sampai fast_interval.
+DISCOVERY_BACKOFF = 1.0
+
+
+class RunMonitor:
+    """Memantau banyak workflow run sekaligus dalam satu loop polling.
+
+    Setiap repo di-poll dengan satu request `actions/runs` (difilter event dan
+    waktu dibuat) yang mencakup semua run yang dilacak di repo tersebut. Run
+    dicocokkan lewat correlation ID di nama run (input `correlation_id`
+    workflow); tanpa ID dipakai run pertama setelah waktu dispatch. Run yang
+    belum ditemukan dicari dengan backoff eksponensial pendek, run queued
+    di-poll dengan interval cepat, run in_progress dengan interval lambat.
+    Hook `on_complete` dipanggil sekali saat run selesai. Run yang di-track
+    dengan run_id dari pemanggil di-poll langsung lewat `actions/runs/{id}`,
+    karena belum tentu muncul di daftar (event/waktu dibuat berbeda).
+    """
+
+    def __init__(self, fast_interval: Optional[float] = None, slow_interval: Optional[float] = None,
+                 timeout: float = 21600):
+        self.fast_interval = fast_interval if fast_interval is not None else float(get_setting("monitor_fast_interval"))
+        self.slow_interval = slow_interval if slow_interval is not None else float(get_setting("monitor_slow_interval"))
+        self.timeout = timeout
+        self._repos: Dict[str, Dict[str, Any]] = {}
+
+    def track(self, repo_path: str, token: str, dispatched_at: float, run_id: Optional[int] = None,
+              on_complete: Optional[Callable[[Dict[str, Any]], None]] = None, label: Optional[str] = None,
+              correlation_id: Optional[str] = None):
+        """Menambahkan run yang dipantau; run_id boleh None (dicari dari correlation ID / waktu dispatch)."""
+        repo = self._repos.setdefault(repo_path, {"token": token, "runs": [], "next_poll": 0.0,
+                                                  "backoff": DISCOVERY_BACKOFF})
+        repo["runs"].append({
+            "repo": repo_path,
+            "token": token,
+            "label": label or repo_path,
+            "run_id": run_id,
+            "direct": run_id is not None,
+            "correlation_id": correlation_id,
+            "dispatched_at": dispatched_at,
+            "status": None,
+            "conclusion": None,
+            "on_complete": on_complete,
+            "done": False,
+        })
+
+    def _pending(self) -> List[Dict[str, Any]]:
+        return [run for repo in self._repos.values() for run in repo["runs"] if not run["done"]]
+
+    def _poll_repo(self, repo_path: str, repo: Dict[str, Any]):
+        for run in repo["runs"]:
+            if run["direct"] and not run["done"]:
+                self._poll_run(repo_path, repo, run)
+        runs = [run for run in repo["runs"] if not run["done"] and not run["direct"]]
+        if not runs:
+            return
+        since = format_github_time(min(run["dispatched_at"] for run in runs) - DISPATCH_CLOCK_SKEW)
+        result = run_gh_api(
+            f'api "repos/{repo_path}/actions/runs?event=workflow_dispatch&created=%3E%3D{since}&per_page=100"',
+            repo["token"], max_retries=2
+        )
+        if not result["success"]:
+            print_warning(f"⚠️ {repo_path}: gagal mengecek status: {result.get('error')}")
+            return
+        try:
+            listed = json.loads(result["output"]).get("workflow_runs", [])
+        except json.JSONDecodeError:
+            return
+
+        by_id = {item.get("id"): item for item in listed}
+        claimed = {run["run_id"] for run in repo["runs"] if run["run_id"]}
+        for run in sorted(runs, key=lambda r: r["dispatched_at"]):
+            if run["run_id"] is None:
+                candidates = sorted(
+                    (item for item in listed
+                     if item.get("id") not in claimed and self._matches(run, item)),
+                    key=lambda item: item.get("created_at") or ""
+                )
+                if not candidates:
+                    continue
+                run["run_id"] = candidates[0]["id"]
+                claimed.add(run["run_id"])
+                print_info(f"🎯 {run['label']}: run ID {run['run_id']}")
+
+            item = by_id.get(run["run_id"])
+            if item is not None:
+                self._update(run, item)
+
+    def _poll_run(self, repo_path: str, repo: Dict[str, Any], run: Dict[str, Any]):
+        result = run_gh_api(f"api repos/{repo_path}/actions/runs/{run['run_id']}", repo["token"], max_retries=2)
+        if not result["success"]:
+            print_warning(f"⚠️ {run['label']}: gagal mengecek status run {run['run_id']}: {result.get('error')}")
+            return
+        try:
+            self._update(run, json.loads(result["output"]))
+        except json.JSONDecodeError:
+            return
+
+    def _update(self, run: Dict[str, Any], item: Dict[str, Any]):
+        status = item.get("status")
+        if status != run["status"]:
+            run["status"] = status
+            if status != "completed":
+                print_info(f"   {run['label']}: {status}")
+        if status == "completed":
+            self._complete(run, item.get("conclusion"))
+
+    @staticmethod
+    def _matches(run: Dict[str, Any], item: Dict[str, Any]) -> bool:
+        if run["correlation_id"]:
+            title = f"{item.get('display_title') or ''} {item.get('name') or ''}"
+            return f"[{run['correlation_id']}]" in title
+        created_at = parse_github_time(item.get("created_at")) or 0
+        return created_at >= run["dispatched_at"] - DISPATCH_CLOCK_SKEW
+
+    def _complete(self, run: Dict[str, Any], conclusion: Optional[str]):
+        run["done"] = True
+        run["conclusion"] = conclusion
+        if conclusion == "success":
+            print_success(f"✅ {run['label']}: workflow selesai dengan status: {conclusion}")
+        else:
+            print_warning(f"⚠️ {run['label']}: workflow selesai dengan status: {conclusion}")
+        if run["on_complete"]:
+            try:
+                run["on_complete"](run)
+            except Exception as e:
+                write_log(f"Run completion hook error ({run['repo']}): {str(e)}")
+
+    def _next_interval(self, repo: Dict[str, Any]) -> float:
+        if any(not run["done"] and run["run_id"] is None for run in repo["runs"]):
+            interval = min(repo["backoff"], self.fast_interval)
+            repo["backoff"] *= 2
+            return interval
+        repo["backoff"] = DISCOVERY_BACKOFF
+        waiting = any(not run["done"] and run["status"] in (None, "queued", "waiting", "pending", "requested")
+                      for run in repo["runs"])
+        return self.fast_interval if waiting else self.slow_interval
+
+    def run(self) -> List[Dict[str, Any]]:
+        """Loop sampai semua run selesai atau timeout; mengembalikan semua run."""
+        start_time = time.time()
+        print_info(f"⏳ Memantau {len(self._pending())} workflow run di {len(self._repos)} repo...")
+
+        while self._pending():
+            now = time.time()
+            if now - start_time >= self.timeout:
+                for run in self._pending():
+                    print_error(f"❌ {run['label']}: timeout, workflow tidak selesai dalam {int(self.timeout)//60} menit")
+                break
+
+            for repo_path, repo in self._repos.items():
+                if repo["next_poll"] > now or all(run["done"] for run in repo["runs"]):
+                    continue
+                self._poll_repo(repo_path, repo)
+                repo["next_poll"] = time.time() + self._next_interval(repo)
+
+            active = [repo["next_poll"] for repo in self._repos.values()
+                      if not all(run["done"] for run in repo["runs"])]
+            if active:
+                time.sleep(max(0.0, min(min(active), start_time + self.timeout) - time.time()))
+
+        return [run for repo in self._repos.values() for run in repo["runs"]]
@@ -0,0 +1,258 @@
+# orchestrator/pipeline.py
+
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+from .helpers import (
+    print_success,
+    print_error,
+    print_info,
+    print_warning,
+    print_header,
+    poll_until,
+    get_response_cache,
+    get_setting,
+    read_file_lines,
+    load_json_file,
+    write_log,
+    DEFAULT_SETTINGS,
+    API_KEYS_FILE,
+    CONFIG_FILE
+)
+from .collaboration import (
+    invite_collaborator,
+    accept_repo_invitation,
+    is_collaborator,
+    process_fork_for_user,
+    is_fork_ready,
+    finalize_fork,
+    prefetch_repo_metadata,
+    POLL_INITIAL_INTERVAL,
+    POLL_MAX_INTERVAL,
+    FORK_READY_TIMEOUT
+)
+from .secrets import set_secret_via_api, verify_secret, secret_fingerprint
+from .deployment import (
+    enable_actions_on_repo,
+    load_deploy_bundle,
+    prepare_mirror_commit,
+    deploy_repo,
+    report_deploy
+)
+from .executor import Stage, run_pipeline
+from .scheduler import load_schedule_plan
+from .state import get_state_store
+from .tokens import load_live_token_cache
+
+PIPELINE_STAGES = ("invite", "accept", "fork", "secrets", "deploy")
+# Batas tunggu undangan muncul di akun setelah invite (detik).
+ACCEPT_TIMEOUT = 60
+SECRET_NAME = "DATAGRAM_API_KEYS"
+WORKFLOW_FILE = "datagram-runner.yml"
+
+
+def get_stage_concurrency() -> Dict[str, int]:
+    """Batas worker per tahap; settings boleh hanya mengisi sebagian tahap."""
+    configured = get_setting("pipeline_concurrency") or {}
+    merged = {**DEFAULT_SETTINGS["pipeline_concurrency"], **configured}
+    return {stage: max(1, int(merged[stage])) for stage in PIPELINE_STAGES}
+
+
+def invoke_onboarding_pipeline():
+    """Invite → accept → fork → secrets + deploy untuk semua akun dalam satu proses.
+
+    Setiap akun maju ke tahap berikutnya begitu tahap sebelumnya sukses,
+    tanpa menunggu akun lain. Akun yang gagal di satu tahap tidak
+    melanjutkan tahap yang bergantung padanya.
+    """
+    print_header("ONBOARDING PIPELINE (INVITE → DEPLOY)")
+    config = load_json_file(CONFIG_FILE)
+    if not config:
+        print_error("Konfigurasi belum diset.")
+        return
+
+    token_cache = load_live_token_cache()
+    if not token_cache:
+        print_error("Token cache kosong.")
+        return
+
+    api_keys = read_file_lines(API_KEYS_FILE)
+    if not api_keys:
+        print_error("File API keys kosong.")
+        return
+
+    try:
+        bundle = load_deploy_bundle()
+    except FileNotFoundError as e:
+        print_error(f"File deploy tidak ditemukan: {e}")
+        return
+
+    main_username = config['main_account_username']
+    main_token = config['main_token']
+    repo_name = config['main_repo_name']
+    source_repo = f"{main_username}/{repo_name}"
+
+    plan_accounts = load_schedule_plan().get("accounts", {})
+    accounts: List[Dict[str, Any]] = []
+    for token, username in token_cache.items():
+        if username == main_username:
+            continue
+        keys = plan_accounts[username]["keys"] if username in plan_accounts else api_keys
+        value = json.dumps(keys)
+        accounts.append({
+            "username": username,
+            "token": token,
+            "repo": f"{username}/{repo_name}",
+            "value": value,
+            "fingerprint": secret_fingerprint(value)
+        })
+
+    if not accounts:
+        print_success("✅ Tidak ada akun untuk diproses.")
+        return
+
+    concurrency = get_stage_concurrency()
+    state_store = get_state_store()
+    print_info(f"Source: {source_repo}")
+    print_info(f"📊 {len(accounts)} akun, tahap: {' → '.join(PIPELINE_STAGES[:3])} → secrets + deploy")
+    print_info("⚙️  Worker per tahap: " + ", ".join(f"{stage}={n}" for stage, n in concurrency.items()))
+    if plan_accounts:
+        print_info(f"📅 {sum(1 for a in accounts if a['username'] in plan_accounts)} akun memakai key dari rencana scheduler")
+    print_warning("Fork yang sudah ada akan di-sync (mode 'n'), tidak dihapus.")
+
+    if input(f"\n🎯 Jalankan pipeline untuk {len(accounts)} akun? (y/n): ").lower() != 'y':
+        print_warning("Operasi dibatalkan.")
+        return
+
+    prefetch_repo_metadata([a["repo"] for a in accounts], main_token)
+    invited_users = state_store.users_with("invited")
+    accepted_users = state_store.users_with("accepted")
+    forked_users = state_store.users_with("forked")
+    known_fingerprints = state_store.secret_fingerprints(SECRET_NAME)
+
+    deploy_mode = get_setting("deploy_mode")
+    deploy_commit: Optional[Dict[str, Any]] = None
+    if deploy_mode == "mirror":
+        deploy_commit = prepare_mirror_commit(source_repo, main_token, bundle)
+        if deploy_commit["error"]:
+            print_warning(f"⚠️ Mirror tidak tersedia ({deploy_commit['error']}), memakai mode API...")
+            deploy_mode, deploy_commit = "api", None
+    push_slots = threading.BoundedSemaphore(max(1, int(get_setting("deploy_push_concurrency"))))
+
+    def invite(account: Dict[str, Any]) -> bool:
+        username = account["username"]
+        if username in invited_users:
+            print(f"[invite] @{username} - ✅ Already invited")
+            return True
+        result = invite_collaborator(source_repo, username, main_token)
+        if not result["success"]:
+            print_error(f"[invite] @{username} - ❌ {result['error']}")
+            return False
+        state_store.mark(username, "invited")
+        print_success(f"[invite] @{username} - ✅ Invited")
+        return True
+
+    def accept(account: Dict[str, Any]) -> bool:
+        username, token = account["username"], account["token"]
+        if username in accepted_users:
+            print(f"[accept] @{username} - ✅ Already accepted")
+            return True
+
+        errors: List[str] = []
+
+        def try_accept() -> bool:
+            # Undangan baru belum tentu ada di respons yang masih tersimpan di cache.
+            cache = get_response_cache()
+            if cache is not None:
+                cache.invalidate_prefix("user/repository_invitations")
+            outcome = accept_repo_invitation(token, source_repo.lower())
+            if outcome["status"] == "error":
+                errors.append(outcome["error"])
+            return outcome["status"] == "accepted"
+
+        if try_accept() or is_collaborator(source_repo, username, token) or poll_until(
+                try_accept, ACCEPT_TIMEOUT, POLL_INITIAL_INTERVAL, POLL_MAX_INTERVAL):
+            state_store.mark(username, "accepted")
+            print_success(f"[accept] @{username} - ✅ Accepted")
+            return True
+        print_error(f"[accept] @{username} - ❌ {errors[-1] if errors else 'Undangan tidak ditemukan'}")
+        return False
+
+    def fork(account: Dict[str, Any]) -> bool:
+        username, token = account["username"], account["token"]
+        print(f"[fork] @{username}")
+        outcome = process_fork_for_user(username, token, source_repo, repo_name, 'n', forked_users)
+        if outcome["success"]:
+            return True
+        if not outcome["fork"]:
+            return False
+
+        fork_repo = outcome["fork"]
+        if not poll_until(lambda: is_fork_ready(fork_repo, token), FORK_READY_TIMEOUT,
+                          POLL_INITIAL_INTERVAL, POLL_MAX_INTERVAL):
+            print_error(f"❌ {fork_repo}: fork belum siap setelah {FORK_READY_TIMEOUT}s")
+            write_log(f"Fork not ready for @{username}: {fork_repo}", level="warning",
+                      account=username, repo=fork_repo, operation="fork")
+            return False
+        print_success(f"✅ {fork_repo}: fork siap")
+        account["repo"] = fork_repo
+        return finalize_fork(username, token, fork_repo)
+
+    def set_secret(account: Dict[str, Any]) -> bool:
+        username, token, repo_path = account["username"], account["token"], account["repo"]
+        if known_fingerprints.get(repo_path) == account["fingerprint"]:
+            print(f"[secrets] @{username} - ✅ Tidak berubah")
+            return True
+
+        for _ in range(2):
+            written_at = time.time()
+            if not set_secret_via_api(repo_path, token, SECRET_NAME, account["value"]):
+                break
+            verified, updated_at = verify_secret(repo_path, token, SECRET_NAME, written_at)
+            if verified:
+                state_store.record_secrets(SECRET_NAME, {repo_path: {
+                    "sha256": account["fingerprint"],
+                    "updated_at": updated_at if updated_at is not None else time.time()
+                }})
+                print_success(f"[secrets] @{username} - ✅ {SECRET_NAME} terpasang")
+                return True
+        print_error(f"[secrets] @{username} - ❌ Gagal set/verifikasi {SECRET_NAME}")
+        return False
+
+    def deploy(account: Dict[str, Any]) -> bool:
+        repo_path, token = account["repo"], account["token"]
+        print(f"[deploy] {repo_path}")
+        enable_actions_on_repo(repo_path, token)
+        outcome = deploy_repo(repo_path, token, bundle, deploy_mode, deploy_commit, push_slots)
+        return report_deploy(repo_path, token, outcome, WORKFLOW_FILE)
+
+    token_of = lambda account: account["token"]
+    stages = [
+        Stage("invite", invite, concurrency=concurrency["invite"], token_of=lambda _: main_token),
+        Stage("accept", accept, ["invite"], concurrency["accept"], token_of),
+        Stage("fork", fork, ["accept"], concurrency["fork"], token_of),
+        Stage("secrets", set_secret, ["fork"], concurrency["secrets"], token_of),
+        Stage("deploy", deploy, ["fork"], concurrency["deploy"], token_of),
+    ]
+
+    started = time.time()
+    results = run_pipeline(accounts, stages)
+    elapsed = time.time() - started
+
+    print_success(f"\n{'='*47}")
+    print_success(f"✅ Pipeline selesai dalam {elapsed:.0f}s")
+    for stage in PIPELINE_STAGES:
+        outcomes = [result.get(stage) for result in results]
+        print_info(f"   {stage:<8} Berhasil: {outcomes.count(True)}, Gagal: {outcomes.count(False)}, "
+                   f"Terblokir: {outcomes.count(None)}")
+    complete = sum(1 for result in results if all(result.get(stage) for stage in PIPELINE_STAGES))
+    print_info(f"   Akun siap: {complete}/{len(accounts)}")
+    print_success(f"{'='*47}")
+
+    failed = [f"@{account['username']}" for account, result in zip(accounts, results)
+              if not all(result.get(stage) for stage in PIPELINE_STAGES)]
+    if failed:
+        write_log(f"Onboarding pipeline incomplete for: {', '.join(failed)}", level="warning",
+                  operation="pipeline")
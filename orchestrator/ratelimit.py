@@ -0,0 +1,181 @@
+# orchestrator/ratelimit.py
+
+import re
+import time
+import threading
+from typing import Any, Dict, Optional
+
+THROTTLED = "throttled"
+FORBIDDEN = "forbidden"
+
+_WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+_METHOD_PATTERN = re.compile(r"(?:-X|--method)[\s=]+([A-Za-z]+)")
+
+
+def detect_method(command: str) -> str:
+    """Menebak HTTP method dari perintah `api ...` gaya gh."""
+    match = _METHOD_PATTERN.search(command)
+    if match:
+        return match.group(1).upper()
+    if re.search(r"(?:^|\s)(?:-f|-F|--field|--raw-field|--input)\s", command):
+        return "POST"
+    return "GET"
+
+
+def classify_failure(error: str, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+    """Membedakan 403/429 karena rate limit (throttled) dari 403 izin (forbidden).
+
+    `headers` (nama huruf kecil) dari respons yang gagal, bila ada: 403
+    secondary rate limit kadang tanpa teks penanda, tetapi selalu membawa
+    Retry-After atau X-RateLimit-Remaining: 0.
+    """
+    text = (error or "").lower()
+    if "rate limit" in text or "http 429" in text or "abuse detection" in text:
+        return THROTTLED
+    headers = headers or {}
+    if headers.get("retry-after") or headers.get("x-ratelimit-remaining") == "0":
+        return THROTTLED
+    if "http 403" in text or "forbidden" in text or "resource not accessible" in text:
+        return FORBIDDEN
+    return None
+
+
+class RateLimitGovernor:
+    """Pengatur laju request per token berdasarkan header rate limit GitHub.
+
+    Melacak X-RateLimit-Limit/Remaining/Reset dan Retry-After dari setiap
+    respons, menjeda request tulis (POST/PUT/PATCH/DELETE) agar tidak memicu
+    secondary rate limit, dan menghitung waktu tunggu tepat sampai reset.
+    """
+
+    def __init__(self, min_write_interval: float = 1.0, reserve: int = 50,
+                 default_backoff: float = 60.0):
+        self.min_write_interval = min_write_interval
+        self.reserve = reserve
+        self.default_backoff = default_backoff
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, token: str) -> Dict[str, Any]:
+        entry = self._state.get(token)
+        if entry is None:
+            entry = {
+                "limit": None,
+                "remaining": None,
+                "reset": None,
+                "used": None,
+                "resource": None,
+                "blocked_until": 0.0,
+                "next_write_at": 0.0,
+                "throttled_count": 0,
+                "failure_headers": None,
+                "updated_at": None,
+            }
+            self._state[token] = entry
+        return entry
+
+    def reserve_slot(self, token: str, method: str = "GET", max_wait: Optional[float] = None) -> float:
+        """Menghitung jeda sebelum request boleh dikirim dan memesan slot tulisnya.
+
+        Jika jeda melebihi `max_wait`, slot tidak dipesan (request tidak akan
+        dikirim, jadi request tulis berikutnya tidak perlu menunggu slot ini).
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entry(token)
+            wait = max(0.0, entry["blocked_until"] - now)
+
+            remaining, reset = entry["remaining"], entry["reset"]
+            if remaining is not None and reset and reset > now:
+                if remaining <= 0:
+                    wait = max(wait, reset - now)
+                elif remaining < self.reserve:
+                    # Sebar sisa kuota secara merata sampai jendela reset.
+                    wait = max(wait, (reset - now) / remaining)
+
+            if method.upper() in _WRITE_METHODS and self.min_write_interval > 0:
+                slot = max(now + wait, entry["next_write_at"])
+                wait = slot - now
+                if max_wait is None or wait <= max_wait:
+                    entry["next_write_at"] = slot + self.min_write_interval
+            return wait
+
+    def acquire(self, token: str, method: str = "GET", max_wait: Optional[float] = None) -> bool:
+        """Tidur seperlunya sebelum request. False jika jeda melebihi max_wait."""
+        wait = self.reserve_slot(token, method, max_wait)
+        if max_wait is not None and wait > max_wait:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def record_headers(self, token: str, headers: Dict[str, str], status: Optional[int] = None):
+        """Memperbarui state dari header respons (nama header huruf kecil)."""
+        if headers.get("x-ratelimit-resource") == "search":
+            # Kuota search (30/menit) terpisah dari core; jangan menimpa state core.
+            return
+        now = time.time()
+        with self._lock:
+            entry = self._entry(token)
+            if "x-ratelimit-remaining" in headers:
+                try:
+                    entry["limit"] = int(headers.get("x-ratelimit-limit") or 0) or entry["limit"]
+                    entry["remaining"] = int(headers["x-ratelimit-remaining"])
+                    entry["reset"] = float(headers.get("x-ratelimit-reset") or 0) or entry["reset"]
+                    entry["used"] = int(headers.get("x-ratelimit-used") or 0)
+                except ValueError:
+                    pass
+                entry["resource"] = headers.get("x-ratelimit-resource", entry["resource"])
+                entry["updated_at"] = now
+
+            if status in (403, 429):
+                entry["failure_headers"] = {name: headers[name] for name in ("retry-after", "x-ratelimit-remaining")
+                                            if name in headers}
+                retry_after = headers.get("retry-after")
+                if retry_after and retry_after.isdigit():
+                    entry["blocked_until"] = max(entry["blocked_until"], now + int(retry_after))
+                elif entry["remaining"] == 0 and entry["reset"]:
+                    entry["blocked_until"] = max(entry["blocked_until"], entry["reset"])
+
+    def record_core_limits(self, token: str, core: Dict[str, Any]):
+        """Memperbarui state dari body endpoint `rate_limit` (resources.core)."""
+        self.record_headers(token, {
+            "x-ratelimit-limit": str(core.get("limit", "")),
+            "x-ratelimit-remaining": str(core.get("remaining", "")),
+            "x-ratelimit-reset": str(core.get("reset", "")),
+            "x-ratelimit-used": str(core.get("used", "")),
+            "x-ratelimit-resource": "core",
+        })
+
+    def take_failure_headers(self, token: str) -> Dict[str, str]:
+        """Header rate limit dari respons 403/429 terakhir token ini (sekali pakai)."""
+        with self._lock:
+            entry = self._entry(token)
+            headers, entry["failure_headers"] = entry["failure_headers"], None
+        return headers or {}
+
+    def throttle_wait(self, token: str, attempt: int = 0) -> float:
+        """Waktu tunggu setelah respons throttled.
+
+        Memakai Retry-After atau waktu reset bila diketahui; tanpa header
+        (mis. backend gh) memakai backoff eksponensial dari default_backoff.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entry(token)
+            entry["throttled_count"] += 1
+            if entry["blocked_until"] > now:
+                return entry["blocked_until"] - now
+            if entry["remaining"] == 0 and entry["reset"] and entry["reset"] > now:
+                return entry["reset"] - now
+            wait = self.default_backoff * (2 ** attempt)
+            entry["blocked_until"] = now + wait
+            return wait
+
+    def snapshot(self, token: str) -> Dict[str, Any]:
+        with self._lock:
+            entry = dict(self._entry(token))
+        now = time.time()
+        entry["reset_in"] = max(0, int(entry["reset"] - now)) if entry["reset"] else None
+        entry["blocked_for"] = max(0, int(entry["blocked_until"] - now))
+        return entry
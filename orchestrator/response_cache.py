@@ -0,0 +1,150 @@
+# orchestrator/response_cache.py
+
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# (pola endpoint, TTL detik). Dalam TTL respons dipakai langsung tanpa request;
+# setelahnya dikirim request kondisional (If-None-Match / If-Modified-Since)
+# yang dijawab 304 tanpa mengurangi kuota rate limit. TTL 0 = selalu kondisional
+# (status run di-poll RunMonitor dengan interval lebih pendek dari TTL mana pun).
+DEFAULT_TTL_RULES: List[Tuple[str, int]] = [
+    (r"^repos/[^/]+/[^/]+$", 300),
+    (r"^repos/[^/]+/[^/]+/actions/workflows$", 600),
+    (r"^repos/[^/]+/[^/]+/actions/runs(/\d+)?$", 0),
+    (r"^repos/[^/]+/[^/]+/actions/workflows/[^/]+/runs$", 0),
+    (r"^user/repository_invitations$", 30),
+    (r"^users/[^/]+/settings/billing/usage$", 600),
+]
+
+_REPO_PREFIX = re.compile(r"^(repos/[^/]+/[^/?]+)")
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    return endpoint.lstrip("/")
+
+
+def token_identity(token: str) -> str:
+    """ID token yang aman disimpan di disk (bukan token aslinya)."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache:
+    """Cache respons GET GitHub di SQLite dengan ETag, TTL per endpoint dan eviksi LRU."""
+
+    def __init__(self, path: Path, max_bytes: int = 50 * 1024 * 1024,
+                 ttl_rules: Optional[List[Tuple[str, int]]] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._rules = [(re.compile(p), ttl) for p, ttl in (ttl_rules or DEFAULT_TTL_RULES)]
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, token_id TEXT, url TEXT, etag TEXT,"
+                " last_modified TEXT, body BLOB, stored_at REAL, last_used REAL, size INTEGER)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_url ON responses(url)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+            self._conn = conn
+        return self._conn
+
+    def ttl_for(self, endpoint: str) -> Optional[int]:
+        path = normalize_endpoint(endpoint).split("?", 1)[0]
+        for pattern, ttl in self._rules:
+            if pattern.match(path):
+                return ttl
+        return None
+
+    def lookup(self, token: str, endpoint: str) -> Optional[Dict[str, Any]]:
+        ttl = self.ttl_for(endpoint)
+        if ttl is None:
+            return None
+        key = f"{token_identity(token)}:{normalize_endpoint(endpoint)}"
+        with self._lock:
+            row = self._db().execute(
+                "SELECT etag, last_modified, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            self._db().execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._db().commit()
+        etag, last_modified, body, stored_at = row
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": bytes(body),
+            "fresh": (now - stored_at) < ttl,
+        }
+
+    def store(self, token: str, endpoint: str, body: bytes, etag: Optional[str], last_modified: Optional[str]):
+        if self.ttl_for(endpoint) is None or not (etag or last_modified):
+            return
+        url = normalize_endpoint(endpoint)
+        key = f"{token_identity(token)}:{url}"
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, token_identity(token), url, etag, last_modified, body, now, now, len(body)),
+            )
+            self._evict(db)
+            db.commit()
+
+    def refresh(self, token: str, endpoint: str):
+        """Menandai entri segar kembali setelah server menjawab 304."""
+        key = f"{token_identity(token)}:{normalize_endpoint(endpoint)}"
+        with self._lock:
+            now = time.time()
+            self._db().execute("UPDATE responses SET stored_at = ?, last_used = ? WHERE key = ?", (now, now, key))
+            self._db().commit()
+
+    def _evict(self, db: sqlite3.Connection):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_used ASC").fetchall():
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes * 0.9:
+                break
+
+    def invalidate_prefix(self, prefix: str):
+        """Menghapus entri (semua token) yang URL-nya diawali prefix."""
+        prefix = normalize_endpoint(prefix)
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._lock:
+            self._db().execute(
+                "DELETE FROM responses WHERE url = ? OR url LIKE ? ESCAPE '\\'",
+                (prefix, escaped + "/%"),
+            )
+            self._db().execute(
+                "DELETE FROM responses WHERE url LIKE ? ESCAPE '\\'", (escaped + "?%",)
+            )
+            self._db().commit()
+
+    def invalidate_for_write(self, endpoint: str):
+        """Invalidasi entri yang kemungkinan berubah karena request tulis ke endpoint."""
+        path = normalize_endpoint(endpoint)
+        match = _REPO_PREFIX.match(path)
+        if match:
+            self.invalidate_prefix(match.group(1))
+        elif path.startswith("user/repository_invitations"):
+            self.invalidate_prefix("user/repository_invitations")
+
+    def clear(self):
+        with self._lock:
+            self._db().execute("DELETE FROM responses")
+            self._db().commit()
@@ -0,0 +1,167 @@
+# orchestrator/scheduler.py
+
+import heapq
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .helpers import (
+    print_success,
+    print_error,
+    print_info,
+    print_warning,
+    print_header,
+    get_setting,
+    read_file_lines,
+    load_json_file,
+    save_json_file,
+    API_KEYS_FILE,
+    CONFIG_FILE,
+    SCHEDULE_PLAN_FILE
+)
+from .billing import get_billing_snapshot
+from .state import get_state_store
+from .tokens import load_live_token_cache
+
+
+def hours_until_billing_reset(now: Optional[float] = None) -> float:
+    """Jam tersisa sampai kuota menit Actions di-reset (awal bulan berikutnya, UTC)."""
+    current = datetime.fromtimestamp(now if now is not None else time.time(), tz=timezone.utc)
+    if current.month == 12:
+        reset = datetime(current.year + 1, 1, 1, tzinfo=timezone.utc)
+    else:
+        reset = datetime(current.year, current.month + 1, 1, tzinfo=timezone.utc)
+    return max(1.0, (reset - current).total_seconds() / 3600)
+
+
+def node_hours(remaining_minutes: float, key_count: int, horizon_hours: float) -> float:
+    """Node-jam yang dihasilkan akun dengan `key_count` key sampai kuota habis atau horizon."""
+    return min(key_count * horizon_hours, max(0.0, remaining_minutes) / 60)
+
+
+def build_schedule(budgets: Dict[str, float], keys: List[str], horizon_hours: float,
+                   max_keys_per_account: int) -> Dict[str, Any]:
+    """Membagi API key ke akun untuk memaksimalkan total node-jam.
+
+    Setiap key menjalankan satu job (60 menit Actions per jam). Node-jam per
+    akun = min(jumlah_key × horizon, sisa_menit / 60), konkaf terhadap
+    jumlah key, sehingga alokasi greedy berdasarkan marginal gain terbesar
+    menghasilkan total optimal. Key tanpa marginal gain tidak dialokasikan.
+
+    Args:
+        budgets: {username: sisa menit Actions}
+        keys: daftar API key
+        horizon_hours: jam sampai reset kuota
+        max_keys_per_account: batas job paralel per akun
+    """
+    assigned: Dict[str, List[str]] = {username: [] for username in budgets}
+
+    def gain(username: str) -> float:
+        count = len(assigned[username])
+        if count >= max_keys_per_account:
+            return 0.0
+        remaining = budgets[username]
+        return node_hours(remaining, count + 1, horizon_hours) - node_hours(remaining, count, horizon_hours)
+
+    heap = [(-gain(username), -budgets[username], username) for username in budgets]
+    heapq.heapify(heap)
+    unassigned: List[str] = []
+
+    for key in keys:
+        if not heap or -heap[0][0] <= 0:
+            unassigned.append(key)
+            continue
+        _, neg_budget, username = heapq.heappop(heap)
+        assigned[username].append(key)
+        heapq.heappush(heap, (-gain(username), neg_budget, username))
+
+    accounts = {
+        username: {
+            "keys": account_keys,
+            "remaining_minutes": int(budgets[username]),
+            "node_hours": round(node_hours(budgets[username], len(account_keys), horizon_hours), 2)
+        }
+        for username, account_keys in assigned.items() if account_keys
+    }
+    return {
+        "created_at": time.time(),
+        "horizon_hours": round(horizon_hours, 2),
+        "total_node_hours": round(sum(a["node_hours"] for a in accounts.values()), 2),
+        "accounts": accounts,
+        "unassigned_keys": unassigned
+    }
+
+
+def load_schedule_plan() -> Dict[str, Any]:
+    return load_json_file(SCHEDULE_PLAN_FILE)
+
+
+def get_plan_targets(config: Dict[str, Any], token_cache: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Target (repo, token, username, keys) dari rencana scheduler tersimpan."""
+    plan = load_schedule_plan()
+    tokens = {username: token for token, username in token_cache.items()}
+    tokens[config['main_account_username']] = config['main_token']
+
+    targets = []
+    for username, account in plan.get("accounts", {}).items():
+        if username not in tokens:
+            print_warning(f"⚠️ {username} ada di rencana tapi tidak ada di token cache, dilewati")
+            continue
+        targets.append({
+            'repo': f"{username}/{config['main_repo_name']}",
+            'token': tokens[username],
+            'username': username,
+            'keys': account["keys"]
+        })
+    return targets
+
+
+def invoke_schedule_planner():
+    """Membuat rencana pembagian API key per akun berdasarkan sisa menit Actions."""
+    print_header("SCHEDULER: PLAN KEYS PER AKUN")
+    config = load_json_file(CONFIG_FILE)
+    token_cache = load_live_token_cache()
+    forked_users = get_state_store().users_with("forked")
+
+    if not config or not token_cache:
+        print_error("Konfigurasi atau cache token tidak lengkap.")
+        return
+
+    api_keys = read_file_lines(API_KEYS_FILE)
+    if not api_keys:
+        print_error("File API keys kosong.")
+        return
+
+    accounts = {config['main_account_username']: config['main_token']}
+    accounts.update({u: t for t, u in token_cache.items() if u in forked_users})
+
+    print_info(f"📊 Mengambil data billing {len(accounts)} akun...")
+    billing = get_billing_snapshot(accounts)
+    limit = float(get_setting("actions_minutes_limit"))
+    budgets = {
+        username: max(0.0, limit - billing[username]["minutes"])
+        for username in accounts if username in billing
+    }
+    for username in accounts:
+        if username not in billing:
+            print_warning(f"⚠️ {username}: data billing tidak tersedia, tidak dijadwalkan")
+
+    horizon = hours_until_billing_reset()
+    plan = build_schedule(budgets, api_keys, horizon, int(get_setting("max_keys_per_account")))
+
+    print(f"\n{'Akun':<25} {'Sisa menit':>10} {'Key':>5} {'Node-jam':>10}")
+    print('-' * 53)
+    for username, account in sorted(plan["accounts"].items(), key=lambda item: -item[1]["node_hours"]):
+        print(f"{username:<25} {account['remaining_minutes']:>10} {len(account['keys']):>5} {account['node_hours']:>10}")
+    print('-' * 53)
+    print_info(f"⏱️ Horizon sampai reset kuota: {plan['horizon_hours']} jam")
+    print_info(f"📈 Total node-jam: {plan['total_node_hours']} ({len(plan['accounts'])} akun aktif)")
+    if plan["unassigned_keys"]:
+        print_warning(f"⚠️ {len(plan['unassigned_keys'])} key tidak mendapat akun (kuota habis / batas key per akun)")
+
+    if input("\n💾 Simpan rencana ini? (y/n): ").lower() != 'y':
+        print_warning("Rencana tidak disimpan.")
+        return
+
+    save_json_file(SCHEDULE_PLAN_FILE, plan)
+    print_success("✅ Rencana disimpan. Gunakan opsi 'Sesuai rencana scheduler' di Auto Set Secrets dan Trigger Workflow.")
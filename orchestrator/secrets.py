@@ -2,10 +2,10 @@
 
 import json
 import base64
+import hashlib
 import time
-import tempfile
-from pathlib import Path
-from typing import Dict
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
 from .helpers import (
     print_success,
@@ -15,68 +15,201 @@ from .helpers import (
     print_header,
     run_gh_api,
     read_file_lines,
-    append_to_file,
     load_json_file,
-    run_command,
+    save_json_file,
+    get_setting,
+    parse_github_time,
     API_KEYS_FILE,
     CONFIG_FILE,
-    TOKEN_CACHE_FILE,
-    FORKED_REPOS_FILE,
-    SECRETS_SET_FILE
+    PUBLIC_KEYS_FILE
 )
+from .executor import run_batch
+from .scheduler import get_plan_targets
+from .state import get_state_store
+from .tokens import load_live_token_cache
+
+_public_keys: Optional[Dict[str, Dict[str, Any]]] = None
+_public_keys_lock = threading.Lock()
+_sealed_boxes: Dict[str, Any] = {}
+_nacl_modules: Optional[Tuple[Any, Any]] = None
+
+
+def _load_public_keys() -> Dict[str, Dict[str, Any]]:
+    global _public_keys
+    if _public_keys is None:
+        _public_keys = load_json_file(PUBLIC_KEYS_FILE)
+    return _public_keys
+
+
+def forget_repo_public_key(repo_path: str):
+    with _public_keys_lock:
+        if _load_public_keys().pop(repo_path.lower(), None) is not None:
+            save_json_file(PUBLIC_KEYS_FILE, _public_keys)
+
+
+def get_repo_public_key(repo_path: str, token: str, refresh: bool = False) -> Dict[str, str]:
+    """Mengambil public key repositori untuk enkripsi secrets (di-cache dengan TTL)."""
+    ttl = float(get_setting("public_key_ttl"))
+    cached = _load_public_keys().get(repo_path.lower())
+    if cached and not refresh and time.time() - cached.get("fetched_at", 0) < ttl:
+        return {"key": cached["key"], "key_id": cached["key_id"]}
 
-def get_repo_public_key(repo_path: str, token: str) -> Dict[str, str]:
-    """Mengambil public key dari repositori untuk enkripsi secrets."""
     result = run_gh_api(f"api repos/{repo_path}/actions/secrets/public-key", token, timeout=30)
     if result["success"]:
         try:
             data = json.loads(result["output"])
-            return {"key": data.get("key"), "key_id": data.get("key_id")}
         except json.JSONDecodeError:
             return {}
+        key_info = {"key": data.get("key"), "key_id": data.get("key_id")}
+        if key_info["key"] and key_info["key_id"]:
+            with _public_keys_lock:
+                _load_public_keys()[repo_path.lower()] = {**key_info, "fetched_at": time.time()}
+                save_json_file(PUBLIC_KEYS_FILE, _public_keys)
+        return key_info
     return {}
 
+
+def prefetch_public_keys(targets: List[Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """Mengambil public key banyak repo secara paralel (cache dipakai jika masih valid)."""
+    fetch = lambda target: get_repo_public_key(target['repo'], target['token'])
+    keys: Dict[str, Dict[str, str]] = {}
+    for target, key_info in run_batch(targets, fetch, token_of=lambda target: target['token']):
+        if key_info and key_info.get("key") and key_info.get("key_id"):
+            keys[target['repo']] = key_info
+    return keys
+
+
+def _get_sealed_box(public_key: str) -> Any:
+    """SealedBox per public key; modul NaCl hanya di-import sekali."""
+    global _nacl_modules
+    box = _sealed_boxes.get(public_key)
+    if box is not None:
+        return box
+    if _nacl_modules is None:
+        try:
+            from nacl import encoding, public
+        except ImportError:
+            raise ImportError("PyNaCl library is required. Install with: pip install PyNaCl")
+        _nacl_modules = (encoding, public)
+    encoding, public = _nacl_modules
+    public_key_obj = public.PublicKey(public_key.encode("utf-8"), encoding.Base64Encoder())
+    box = public.SealedBox(public_key_obj)
+    _sealed_boxes[public_key] = box
+    return box
+
+
 def encrypt_secret(public_key: str, secret_value: str) -> str:
     """Mengenkripsi nilai secret menggunakan PyNaCl."""
-    try:
-        from nacl import encoding, public
-        public_key_obj = public.PublicKey(public_key.encode("utf-8"), encoding.Base64Encoder())
-        sealed_box = public.SealedBox(public_key_obj)
-        encrypted = sealed_box.encrypt(secret_value.encode("utf-8"))
-        return base64.b64encode(encrypted).decode("utf-8")
-    except ImportError:
-        raise ImportError("PyNaCl library is required. Install with: pip install PyNaCl")
-
-def set_secret_via_api(repo_path: str, token: str, name: str, value: str) -> bool:
-    """Mengatur secret di repositori GitHub menggunakan API dengan enkripsi."""
-    try:
-        key_info = get_repo_public_key(repo_path, token)
-        if not key_info or not key_info.get("key") or not key_info.get("key_id"):
-            print_error("Failed to get repository public key")
-            return False
+    encrypted = _get_sealed_box(public_key).encrypt(secret_value.encode("utf-8"))
+    return base64.b64encode(encrypted).decode("utf-8")
 
-        encrypted_value = encrypt_secret(key_info["key"], value)
 
-        payload = {
-            "encrypted_value": encrypted_value,
+def seal_secret_for_repos(secret_value: str, repo_keys: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """Mengenkripsi satu nilai secret untuk banyak repo dalam satu pass.
+
+    Returns:
+        {repo_path: {"encrypted_value": ..., "key_id": ...}}
+    """
+    plaintext = secret_value.encode("utf-8")
+    sealed: Dict[str, Dict[str, str]] = {}
+    for repo_path, key_info in repo_keys.items():
+        encrypted = _get_sealed_box(key_info["key"]).encrypt(plaintext)
+        sealed[repo_path] = {
+            "encrypted_value": base64.b64encode(encrypted).decode("utf-8"),
             "key_id": key_info["key_id"]
         }
+    return sealed
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(payload, f)
-            temp_file_path = f.name
 
-        cmd = f'gh api -X PUT repos/{repo_path}/actions/secrets/{name} --input "{temp_file_path}"'
-        proc = run_command(cmd, env={"GH_TOKEN": token}, timeout=30)
-        
-        Path(temp_file_path).unlink()
+def _is_key_mismatch(error: str) -> bool:
+    error = (error or "").lower()
+    return "key_id" in error or "public key" in error or "http 422" in error
+
+
+def put_encrypted_secret(repo_path: str, token: str, name: str, payload: Dict[str, str]) -> Dict[str, Any]:
+    return run_gh_api(f"api -X PUT repos/{repo_path}/actions/secrets/{name}", token, timeout=30, input_data=payload)
+
+
+def list_repo_secrets(repo_path: str, token: str) -> Optional[Dict[str, Optional[float]]]:
+    """Daftar secret repo sebagai {nama: updated_at (epoch)}; None jika gagal."""
+    result = run_gh_api(f"api repos/{repo_path}/actions/secrets?per_page=100", token, max_retries=2)
+    if not result["success"]:
+        return None
+    try:
+        data = json.loads(result["output"])
+    except json.JSONDecodeError:
+        return None
+    return {
+        item.get("name"): parse_github_time(item.get("updated_at"))
+        for item in data.get("secrets", [])
+    }
+
+
+def verify_secret(repo_path: str, token: str, name: str, written_at: float) -> Tuple[bool, Optional[float]]:
+    """Memverifikasi satu secret lewat endpoint list secrets.
 
-        if proc.returncode in [0, 201, 204]:
-            time.sleep(3)
-            verify_result = run_gh_api(f"api repos/{repo_path}/actions/secrets/{name}", token, max_retries=1)
-            return verify_result["success"]
+    Secret dianggap terverifikasi jika ada dan updated_at tidak lebih lama
+    dari waktu tulis (dengan toleransi selisih jam). Mengembalikan
+    (terverifikasi, updated_at).
+    """
+    secrets = list_repo_secrets(repo_path, token)
+    if not secrets or name not in secrets:
+        return False, None
+    updated_at = secrets[name]
+    if updated_at is not None and updated_at < written_at - float(get_setting("secret_verify_skew")):
+        return False, None
+    return True, updated_at
+
+
+def verify_secrets_bulk(writes: Dict[str, Dict[str, Any]], name: str) -> Dict[str, Optional[float]]:
+    """Memverifikasi banyak secret sekaligus (paralel) dengan verify_secret.
+
+    `writes` berisi {repo_path: {"token": ..., "written_at": epoch}}.
+    Mengembalikan {repo_path: updated_at} untuk repo yang terverifikasi.
+    """
+    items = list(writes.items())
+    verified: Dict[str, Optional[float]] = {}
+    check = lambda item: verify_secret(item[0], item[1]["token"], name, item[1]["written_at"])
+    for (repo_path, _), outcome in run_batch(items, check, token_of=lambda item: item[1]["token"]):
+        if outcome and outcome[0]:
+            verified[repo_path] = outcome[1]
+    return verified
+
+
+def secret_fingerprint(value: str) -> str:
+    """SHA-256 dari nilai plaintext secret (hanya hash yang disimpan)."""
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def set_secret_via_api(repo_path: str, token: str, name: str, value: str, sealed: Optional[Dict[str, str]] = None) -> bool:
+    """Mengatur secret di repositori GitHub menggunakan API dengan enkripsi.
+
+    Verifikasi tidak dilakukan di sini; lihat verify_secrets_bulk. `sealed`
+    (hasil seal_secret_for_repos) dipakai langsung jika ada. Bila PUT ditolak
+    karena key_id tidak cocok, public key diambil ulang dan nilai
+    dienkripsi ulang sekali.
+    """
+    try:
+        payload = sealed
+        if payload is None:
+            key_info = get_repo_public_key(repo_path, token)
+            if not key_info or not key_info.get("key") or not key_info.get("key_id"):
+                print_error("Failed to get repository public key")
+                return False
+            payload = {"encrypted_value": encrypt_secret(key_info["key"], value), "key_id": key_info["key_id"]}
+
+        result = put_encrypted_secret(repo_path, token, name, payload)
+
+        if not result["success"] and _is_key_mismatch(result.get("error")):
+            key_info = get_repo_public_key(repo_path, token, refresh=True)
+            if key_info.get("key") and key_info.get("key_id"):
+                payload = {"encrypted_value": encrypt_secret(key_info["key"], value), "key_id": key_info["key_id"]}
+                result = put_encrypted_secret(repo_path, token, name, payload)
+
+        if result["success"]:
+            return True
         
-        print_warning(f"Set secret failed with code {proc.returncode}: {proc.stderr[:100]}")
+        print_warning(f"Set secret failed: {(result.get('error') or '')[:100]}")
         return False
     except Exception as e:
         print_error(f"Error setting secret: {str(e)}")
@@ -90,7 +223,7 @@ def invoke_auto_set_secrets():
         print_error("Konfigurasi belum diset.")
         return
 
-    token_cache = load_json_file(TOKEN_CACHE_FILE)
+    token_cache = load_live_token_cache()
     total_accounts = len(token_cache)
     print_info(f"📊 Memulai proses untuk {total_accounts} akun...")
 
@@ -101,51 +234,119 @@ def invoke_auto_set_secrets():
 
     api_keys_json = json.dumps(api_keys)
 
-    print("Pilih target:\n 1. Main repo saja\n 2. Main repo + semua forked repos")
-    choice = input("\nPilihan (1/2): ").strip()
+    print("Pilih target:\n 1. Main repo saja\n 2. Main repo + semua forked repos\n 3. Sesuai rencana scheduler (key per akun)")
+    choice = input("\nPilihan (1/2/3): ").strip()
 
-    targets = [{
-        'repo': f"{config['main_account_username']}/{config['main_repo_name']}",
-        'token': config['main_token']
-    }]
+    if choice == '3':
+        targets = [
+            {'repo': t['repo'], 'token': t['token'], 'value': json.dumps(t['keys'])}
+            for t in get_plan_targets(config, token_cache)
+        ]
+        if not targets:
+            print_error("Rencana scheduler belum dibuat atau kosong.")
+            return
+    else:
+        targets = [{
+            'repo': f"{config['main_account_username']}/{config['main_repo_name']}",
+            'token': config['main_token'],
+            'value': api_keys_json
+        }]
 
     if choice == '2':
-        forked_users = read_file_lines(FORKED_REPOS_FILE)
+        forked_users = get_state_store().users_with("forked")
         targets.extend([
-            {'repo': f"{u}/{config['main_repo_name']}", 'token': t}
+            {'repo': f"{u}/{config['main_repo_name']}", 'token': t, 'value': api_keys_json}
             for t, u in token_cache.items() if u in forked_users
         ])
 
+    for target in targets:
+        target['fingerprint'] = secret_fingerprint(target['value'])
+
     if input(f"\n🎯 Target: {len(targets)} repos. Lanjutkan? (y/n): ").lower() != 'y':
         print_warning("Operasi dibatalkan.")
         return
 
-    secrets_set_log = read_file_lines(SECRETS_SET_FILE)
+    secret_name = "DATAGRAM_API_KEYS"
+    state_store = get_state_store()
+    known_fingerprints = state_store.secret_fingerprints(secret_name)
     success_count = 0
     failed_count = 0
 
-    for i, target in enumerate(targets, 1):
-        repo_path = target['repo']
-        token = target['token']
+    def is_current(target: Dict[str, str]) -> bool:
+        return known_fingerprints.get(target['repo']) == target['fingerprint']
 
-        print(f"\n[{i}/{len(targets)}] Processing: {repo_path}")
+    pending = [t for t in targets if not is_current(t)]
+    unchanged_count = len(targets) - len(pending)
+    legacy_count = sum(1 for t in pending if t['repo'] in known_fingerprints and known_fingerprints[t['repo']] is None)
+    print_info(f"📋 Tidak berubah: {unchanged_count}, Perlu update: {len(pending)}"
+               + (f" (termasuk {legacy_count} dari cache lama tanpa fingerprint)" if legacy_count else ""))
+    if not pending:
+        print_success("✅ Semua secret sudah sesuai.")
+        return
 
-        if repo_path in secrets_set_log:
-            print_info(" ℹ️ Already set (skipped)")
-            continue
-        
-        print_info(f" 🔑 Setting secret DATAGRAM_API_KEYS...")
-        if set_secret_via_api(repo_path, token, "DATAGRAM_API_KEYS", api_keys_json):
-            print_success(" ✅ Secret set and verified")
-            append_to_file(SECRETS_SET_FILE, repo_path)
-            success_count += 1
+    print_info(f"🔐 Mengambil public key & mengenkripsi untuk {len(pending)} repo...")
+    repo_keys = prefetch_public_keys(pending)
+    sealed: Dict[str, Dict[str, str]] = {}
+    try:
+        for value in {t['value'] for t in pending}:
+            sealed.update(seal_secret_for_repos(value, {
+                t['repo']: repo_keys[t['repo']] for t in pending
+                if t['value'] == value and t['repo'] in repo_keys
+            }))
+    except ImportError as e:
+        print_error(str(e))
+        return
+
+    def apply_secret(entry: Tuple[int, Dict[str, str]]) -> Any:
+        i, target = entry
+        repo_path = target['repo']
+        print(f"\n[{i}/{len(pending)}] Processing: {repo_path}")
+        print_info(f" 🔑 Setting secret {secret_name}...")
+        written_at = time.time()
+        if set_secret_via_api(repo_path, target['token'], secret_name, target['value'], sealed.get(repo_path)):
+            print_success(" ✅ Secret uploaded")
+            return written_at
+        print_error(" ❌ Failed to set secret")
+        return False
+
+    writes: Dict[str, Dict[str, Any]] = {}
+    entries = list(enumerate(pending, 1))
+    for (_, target), outcome in run_batch(entries, apply_secret, token_of=lambda entry: entry[1]['token']):
+        if outcome:
+            writes[target['repo']] = {"token": target['token'], "written_at": outcome}
         else:
-            print_error(" ❌ Failed to set secret")
             failed_count += 1
 
-        time.sleep(2)
+    if writes:
+        print_info(f"\n🔍 Memverifikasi {len(writes)} secret...")
+        verified = verify_secrets_bulk(writes, secret_name)
+        unverified = [repo_path for repo_path in writes if repo_path not in verified]
+
+        if unverified:
+            print_warning(f"⚠️ {len(unverified)} secret belum terverifikasi, mencoba ulang...")
+            retry_entries = [(i, t) for i, t in entries if t['repo'] in unverified]
+            retried: Dict[str, Dict[str, Any]] = {}
+            for (_, target), outcome in run_batch(retry_entries, apply_secret, token_of=lambda entry: entry[1]['token']):
+                if outcome:
+                    retried[target['repo']] = {"token": target['token'], "written_at": outcome}
+            verified.update(verify_secrets_bulk(retried, secret_name))
+
+        fingerprints = {t['repo']: t['fingerprint'] for t in pending}
+        records: Dict[str, Dict[str, Any]] = {}
+        for repo_path in writes:
+            if repo_path in verified:
+                updated_at = verified[repo_path]
+                records[repo_path] = {
+                    "sha256": fingerprints[repo_path],
+                    "updated_at": updated_at if updated_at is not None else time.time()
+                }
+                success_count += 1
+            else:
+                print_error(f" ❌ {repo_path}: verifikasi gagal")
+                failed_count += 1
+        state_store.record_secrets(secret_name, records)
 
     print_success(f"\n{'='*47}")
     print_success(f"✅ Proses selesai!")
-    print_info(f"   Berhasil: {success_count}, Gagal: {failed_count}, Total: {total_accounts}")
+    print_info(f"   Berhasil: {success_count}, Gagal: {failed_count}, Tidak berubah: {unchanged_count}, Total: {total_accounts}")
     print_success(f"{'='*47}")
@@ -1,5 +1,6 @@
 # orchestrator/setup.py
 
+import time
 import getpass
 from pathlib import Path
 
@@ -14,11 +15,13 @@ from .helpers import (
     load_json_file,
     save_json_file,
     validate_api_key_format,
+    token_files_lock,
     API_KEYS_FILE,
     TOKENS_FILE,
     CONFIG_FILE,
     TOKEN_CACHE_FILE
 )
+from .tokens import validate_tokens, missing_scopes, REQUIRED_SCOPES, EXPIRY_WARNING_DAYS
 
 def initialize_configuration():
     """Meminta input user untuk membuat file konfigurasi utama."""
@@ -100,45 +103,73 @@ def import_github_tokens():
 
     tokens = [line for line in read_file_lines(Path(source_file)) if line.startswith(("ghp_", "github_pat_"))]
     if tokens:
-        TOKENS_FILE.write_text("\n".join(tokens), encoding="utf-8")
+        with token_files_lock:
+            TOKENS_FILE.write_text("\n".join(tokens), encoding="utf-8")
         print_success(f"✅ Berhasil mengimpor {len(tokens)} token")
     else:
         print_error("Tidak ada token valid ditemukan.")
 
 def validate_github_tokens():
-    """Memvalidasi semua token GitHub dan menyimpan yang valid."""
+    """Memvalidasi semua token GitHub secara paralel dan menyimpan yang valid."""
     print_header("5. VALIDATE GITHUB TOKENS")
     if not TOKENS_FILE.exists():
         print_error("File tokens.txt belum ada.")
         return
 
-    tokens = read_file_lines(TOKENS_FILE)
+    tokens = list(dict.fromkeys(read_file_lines(TOKENS_FILE)))
     print_info(f"Memvalidasi {len(tokens)} token...")
 
-    token_cache = load_json_file(TOKEN_CACHE_FILE)
-    valid_tokens, invalid_tokens = [], []
+    started = time.time()
+    records = validate_tokens(tokens, force=True)
+    usernames = {}
+    valid_tokens, invalid_tokens, failed_tokens, flagged = [], [], [], []
+    expiring_before = time.time() + EXPIRY_WARNING_DAYS * 86400
 
     for i, token in enumerate(tokens, 1):
-        print(f"[{i}/{len(tokens)}] Validating...", end="", flush=True)
-        if token in token_cache:
-            print_success(f" ✅ @{token_cache[token]} (cached)")
-            valid_tokens.append(token)
+        record = records[token]
+        if record["status"] == "invalid":
+            reason = "Kedaluwarsa" if record.get("expires_at") else "Invalid"
+            print_error(f"[{i}/{len(tokens)}] ❌ {reason} ({token[:8]}...{token[-4:]})")
+            invalid_tokens.append(token)
+            continue
+        if record["status"] == "error":
+            print_warning(f"[{i}/{len(tokens)}] ⚠️ Gagal dicek ({token[:8]}...{token[-4:]}): {record.get('error')}")
+            failed_tokens.append(token)
             continue
 
-        result = run_gh_api("api user --jq .login", token, max_retries=2)
-        if result["success"]:
-            username = result["output"]
-            print_success(f" ✅ @{username}")
-            token_cache[token] = username
-            valid_tokens.append(token)
+        username = record["username"]
+        usernames[token] = username
+        valid_tokens.append(token)
+        notes = []
+        missing = missing_scopes(record.get("scopes"))
+        if missing:
+            notes.append(f"tanpa scope {', '.join(missing)}")
+            flagged.append(username)
+        if record.get("expires_at") and record["expires_at"] < expiring_before:
+            notes.append(f"kedaluwarsa {time.strftime('%Y-%m-%d', time.localtime(record['expires_at']))}")
+        if notes:
+            print_warning(f"[{i}/{len(tokens)}] ⚠️ @{username} ({'; '.join(notes)})")
         else:
-            print_error(f" ❌ Invalid")
-            invalid_tokens.append(token)
-
-    save_json_file(TOKEN_CACHE_FILE, token_cache)
-
-    if valid_tokens:
-        TOKENS_FILE.write_text("\n".join(valid_tokens), encoding="utf-8")
-        print_success(f"\nValidasi selesai! Valid: {len(valid_tokens)}/{len(tokens)}. Token invalid otomatis dihapus.")
+            print_success(f"[{i}/{len(tokens)}] ✅ @{username}")
+
+    kept_tokens = valid_tokens + failed_tokens
+    with token_files_lock:
+        # Dibaca ulang di dalam lock: revalidasi background mungkin baru saja mengubahnya.
+        token_cache = load_json_file(TOKEN_CACHE_FILE)
+        for token in invalid_tokens:
+            token_cache.pop(token, None)
+        token_cache.update(usernames)
+        save_json_file(TOKEN_CACHE_FILE, token_cache)
+        if kept_tokens:
+            TOKENS_FILE.write_text("\n".join(kept_tokens), encoding="utf-8")
+
+    if kept_tokens:
+        print_success(f"\nValidasi selesai dalam {time.time() - started:.1f}s! Valid: {len(valid_tokens)}/{len(tokens)}. "
+                      "Token invalid otomatis dihapus.")
+        if failed_tokens:
+            print_warning(f"⚠️ {len(failed_tokens)} token gagal dicek (jaringan/API) dan tetap disimpan, coba lagi nanti.")
+        if flagged:
+            print_warning(f"⚠️ {len(flagged)} token tidak punya scope {'/'.join(REQUIRED_SCOPES)}; "
+                          "fork, deploy, dan trigger workflow akan gagal untuk akun tersebut.")
     else:
-        print_warning("Tidak ada token valid.")
\ No newline at end of file
+        print_warning("Tidak ada token valid.")
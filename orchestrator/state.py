@@ -0,0 +1,279 @@
+# orchestrator/state.py
+
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from .helpers import (
+    read_file_lines,
+    load_json_file,
+    write_log,
+    STATE_DB_FILE,
+    INVITED_USERS_FILE,
+    ACCEPTED_USERS_FILE,
+    FORKED_REPOS_FILE,
+    SECRETS_SET_FILE,
+    SECRETS_STATE_FILE,
+    WORKFLOWS_ENABLED_FILE
+)
+
+# Status per akun yang dulu disimpan sebagai file teks terpisah.
+ACCOUNT_FLAGS = ("invited", "accepted", "forked")
+
+_LEGACY_ACCOUNT_FILES = {
+    "invited": INVITED_USERS_FILE,
+    "accepted": ACCEPTED_USERS_FILE,
+    "forked": FORKED_REPOS_FILE,
+}
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS accounts ("
+    " username TEXT PRIMARY KEY COLLATE NOCASE,"
+    " invited_at REAL, accepted_at REAL, forked_at REAL, updated_at REAL)",
+    "CREATE INDEX IF NOT EXISTS idx_accounts_invited ON accounts(invited_at)",
+    "CREATE INDEX IF NOT EXISTS idx_accounts_accepted ON accounts(accepted_at)",
+    "CREATE INDEX IF NOT EXISTS idx_accounts_forked ON accounts(forked_at)",
+    "CREATE TABLE IF NOT EXISTS repos ("
+    " repo TEXT PRIMARY KEY COLLATE NOCASE, username TEXT COLLATE NOCASE,"
+    " workflow_enabled_at REAL, updated_at REAL)",
+    "CREATE INDEX IF NOT EXISTS idx_repos_username ON repos(username)",
+    "CREATE TABLE IF NOT EXISTS secrets ("
+    " repo TEXT COLLATE NOCASE, name TEXT, sha256 TEXT, updated_at REAL,"
+    " PRIMARY KEY (repo, name))",
+    "CREATE TABLE IF NOT EXISTS tokens ("
+    " token_id TEXT PRIMARY KEY, username TEXT COLLATE NOCASE, status TEXT,"
+    " scopes TEXT, expires_at REAL, rate_limit INTEGER, rate_remaining INTEGER,"
+    " rate_reset REAL, validated_at REAL)",
+    "CREATE INDEX IF NOT EXISTS idx_tokens_validated ON tokens(validated_at)",
+    "CREATE TABLE IF NOT EXISTS migrations (source TEXT PRIMARY KEY, imported_at REAL)",
+)
+
+TOKEN_COLUMNS = ("username", "status", "scopes", "expires_at", "rate_limit",
+                 "rate_remaining", "rate_reset", "validated_at")
+
+
+class StateStore:
+    """State orchestrator (akun, repo, secret, token) di satu database SQLite mode WAL.
+
+    Semua tulis berupa upsert dalam transaksi dan aman dipanggil dari banyak
+    worker thread. Saat pertama dibuka, file cache teks lama diimpor sekali;
+    file-nya dibiarkan apa adanya dan impornya dicatat di tabel `migrations`.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+            self._conn = conn
+            self._import_legacy()
+        return self._conn
+
+    def _import_legacy(self):
+        """Impor cache teks/JSON lama sekali per file.
+
+        File lama tidak di-rename (sebagian ikut ter-track di git); baris di
+        tabel `migrations` mencegah impor ulang pada pembukaan berikutnya.
+        """
+        imported = {row[0] for row in self._conn.execute("SELECT source FROM migrations")}
+
+        def pending(file_path: Path) -> bool:
+            return file_path.name not in imported and file_path.exists()
+
+        migrated: List[Path] = []
+        now = time.time()
+        with self._conn:
+            for flag, file_path in _LEGACY_ACCOUNT_FILES.items():
+                if pending(file_path):
+                    for username in read_file_lines(file_path):
+                        self._upsert_flag(username, flag, now)
+                    migrated.append(file_path)
+
+            if pending(WORKFLOWS_ENABLED_FILE):
+                for repo_path in read_file_lines(WORKFLOWS_ENABLED_FILE):
+                    self._upsert_repo(repo_path, now)
+                migrated.append(WORKFLOWS_ENABLED_FILE)
+
+            if pending(SECRETS_SET_FILE):
+                # Tanpa fingerprint: dianggap berubah dan disinkronkan ulang sekali.
+                for repo_path in read_file_lines(SECRETS_SET_FILE):
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO secrets (repo, name, sha256, updated_at) VALUES (?, ?, NULL, NULL)",
+                        (repo_path, "DATAGRAM_API_KEYS"),
+                    )
+                migrated.append(SECRETS_SET_FILE)
+
+            if pending(SECRETS_STATE_FILE):
+                for repo_path, secrets in load_json_file(SECRETS_STATE_FILE).items():
+                    for name, info in secrets.items():
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO secrets (repo, name, sha256, updated_at) VALUES (?, ?, ?, ?)",
+                            (repo_path, name, info.get("sha256"), info.get("updated_at")),
+                        )
+                migrated.append(SECRETS_STATE_FILE)
+
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO migrations (source, imported_at) VALUES (?, ?)",
+                [(file_path.name, now) for file_path in migrated],
+            )
+
+        for file_path in migrated:
+            write_log(f"State migrated from {file_path.name}")
+
+    def _upsert_flag(self, username: str, flag: str, when: Optional[float]):
+        column = f"{flag}_at"
+        self._conn.execute(
+            f"INSERT INTO accounts (username, {column}, updated_at) VALUES (?, ?, ?) "
+            f"ON CONFLICT(username) DO UPDATE SET {column} = excluded.{column}, updated_at = excluded.updated_at",
+            (username, when, time.time()),
+        )
+
+    def _upsert_repo(self, repo_path: str, enabled_at: Optional[float]):
+        self._conn.execute(
+            "INSERT INTO repos (repo, username, workflow_enabled_at, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(repo) DO UPDATE SET workflow_enabled_at = excluded.workflow_enabled_at,"
+            " updated_at = excluded.updated_at",
+            (repo_path, repo_path.split("/", 1)[0], enabled_at, time.time()),
+        )
+
+    # --- akun -------------------------------------------------------------
+
+    def mark(self, username: str, flag: str):
+        """Menandai akun (invited / accepted / forked)."""
+        with self._lock:
+            db = self._db()
+            with db:
+                self._upsert_flag(username, flag, time.time())
+
+    def unmark(self, username: str, flag: str):
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute(f"UPDATE accounts SET {flag}_at = NULL, updated_at = ? WHERE username = ?",
+                           (time.time(), username))
+
+    def has(self, username: str, flag: str) -> bool:
+        with self._lock:
+            row = self._db().execute(
+                f"SELECT 1 FROM accounts WHERE username = ? AND {flag}_at IS NOT NULL", (username,)
+            ).fetchone()
+        return row is not None
+
+    def users_with(self, flag: str) -> Set[str]:
+        with self._lock:
+            rows = self._db().execute(f"SELECT username FROM accounts WHERE {flag}_at IS NOT NULL").fetchall()
+        return {row[0] for row in rows}
+
+    def clear_flag(self, flag: str) -> int:
+        with self._lock:
+            db = self._db()
+            with db:
+                return db.execute(f"UPDATE accounts SET {flag}_at = NULL WHERE {flag}_at IS NOT NULL").rowcount
+
+    # --- repo -------------------------------------------------------------
+
+    def set_workflow_enabled(self, repo_path: str, enabled: bool):
+        with self._lock:
+            db = self._db()
+            with db:
+                self._upsert_repo(repo_path, time.time() if enabled else None)
+
+    def repos_with_workflow_enabled(self) -> Set[str]:
+        with self._lock:
+            rows = self._db().execute("SELECT repo FROM repos WHERE workflow_enabled_at IS NOT NULL").fetchall()
+        return {row[0] for row in rows}
+
+    def clear_workflow_enabled(self) -> int:
+        with self._lock:
+            db = self._db()
+            with db:
+                return db.execute("UPDATE repos SET workflow_enabled_at = NULL "
+                                  "WHERE workflow_enabled_at IS NOT NULL").rowcount
+
+    # --- secret -----------------------------------------------------------
+
+    def secret_fingerprints(self, name: str) -> Dict[str, Optional[str]]:
+        """{repo: sha256} untuk secret; sha256 None = entri lama tanpa fingerprint."""
+        with self._lock:
+            rows = self._db().execute("SELECT repo, sha256 FROM secrets WHERE name = ?", (name,)).fetchall()
+        return {repo: sha256 for repo, sha256 in rows}
+
+    def record_secrets(self, name: str, records: Dict[str, Dict[str, Optional[float]]]):
+        """Upsert banyak secret dalam satu transaksi: {repo: {"sha256", "updated_at"}}."""
+        if not records:
+            return
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO secrets (repo, name, sha256, updated_at) VALUES (?, ?, ?, ?)",
+                    [(repo, name, info["sha256"], info["updated_at"]) for repo, info in records.items()],
+                )
+
+    def clear_secrets(self) -> int:
+        with self._lock:
+            db = self._db()
+            with db:
+                return db.execute("DELETE FROM secrets").rowcount
+
+    # --- token ------------------------------------------------------------
+
+    def token_records(self) -> Dict[str, Dict[str, Any]]:
+        """{token_id: record} hasil validasi token terakhir."""
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT token_id, {', '.join(TOKEN_COLUMNS)} FROM tokens"
+            ).fetchall()
+        return {row[0]: dict(zip(TOKEN_COLUMNS, row[1:])) for row in rows}
+
+    def record_tokens(self, records: Dict[str, Dict[str, Any]]):
+        """Upsert hasil validasi banyak token dalam satu transaksi."""
+        if not records:
+            return
+        placeholders = ", ".join("?" for _ in range(len(TOKEN_COLUMNS) + 1))
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    f"INSERT OR REPLACE INTO tokens (token_id, {', '.join(TOKEN_COLUMNS)}) VALUES ({placeholders})",
+                    [(token_id, *(record.get(column) for column in TOKEN_COLUMNS))
+                     for token_id, record in records.items()],
+                )
+
+    def clear_tokens(self) -> int:
+        with self._lock:
+            db = self._db()
+            with db:
+                return db.execute("DELETE FROM tokens").rowcount
+
+    def clear_all(self):
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM accounts")
+                db.execute("DELETE FROM repos")
+                db.execute("DELETE FROM secrets")
+                db.execute("DELETE FROM tokens")
+
+
+_state_store: Optional[StateStore] = None
+_state_store_lock = threading.Lock()
+
+
+def get_state_store() -> StateStore:
+    global _state_store
+    with _state_store_lock:
+        if _state_store is None:
+            _state_store = StateStore(STATE_DB_FILE)
+        return _state_store
@@ -0,0 +1,228 @@
+# orchestrator/tokens.py
+
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .helpers import (
+    print_warning,
+    run_gh_api,
+    get_setting,
+    get_rate_governor,
+    read_file_lines,
+    load_json_file,
+    save_json_file,
+    write_log,
+    token_files_lock,
+    TOKENS_FILE,
+    TOKEN_CACHE_FILE
+)
+from .http_client import parse_included_response
+from .state import get_state_store
+
+# Scope classic PAT yang dibutuhkan fork, secrets, deploy, dan trigger workflow.
+REQUIRED_SCOPES = ("repo", "workflow")
+# Token yang kedaluwarsa dalam rentang ini diberi peringatan saat validasi.
+EXPIRY_WARNING_DAYS = 7
+# Jeda minimum antar putaran validasi ulang di background (detik).
+MIN_REVALIDATE_INTERVAL = 60
+
+_validation_lock = threading.Lock()
+_background_thread: Optional[threading.Thread] = None
+
+
+def token_id(token: str) -> str:
+    """ID token untuk state store (token mentah tidak disimpan di database)."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def parse_token_expiration(value: Optional[str]) -> Optional[float]:
+    """Parse header `GitHub-Authentication-Token-Expiration` (mis. `2026-11-01 00:00:00 UTC`) menjadi epoch."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value.strip().replace("UTC", "+0000"), "%Y-%m-%d %H:%M:%S %z").timestamp()
+    except ValueError:
+        return None
+
+
+def missing_scopes(scopes: Optional[str]) -> List[str]:
+    """Scope wajib yang tidak dimiliki token (fine-grained PAT tidak punya daftar scope)."""
+    if scopes is None:
+        return []
+    granted = {scope.strip() for scope in scopes.split(",") if scope.strip()}
+    return [scope for scope in REQUIRED_SCOPES if scope not in granted]
+
+
+def inspect_token(token: str) -> Dict[str, Any]:
+    """Memvalidasi satu token lewat `GET /user` dan mencatat header scope, expiry, rate limit.
+
+    Status: "valid", "invalid" (401 / kedaluwarsa), atau "error" (gagal
+    sementara, misalnya jaringan; token tidak dianggap mati).
+    """
+    now = time.time()
+    result = run_gh_api("api -i user", token, max_retries=2)
+    if not result["success"]:
+        error = result.get("error") or ""
+        dead = "401" in error or "bad credentials" in error.lower()
+        return {"status": "invalid" if dead else "error", "validated_at": now, "error": error}
+
+    status, headers, body = parse_included_response(result["output"])
+    get_rate_governor().record_headers(token, headers, status)
+    try:
+        username = json.loads(body).get("login")
+    except (json.JSONDecodeError, AttributeError):
+        username = None
+    if not username:
+        return {"status": "error", "validated_at": now, "error": "Respons /user tidak berisi login"}
+
+    def header_number(name: str) -> Optional[int]:
+        value = headers.get(name)
+        return int(value) if value and value.isdigit() else None
+
+    expires_at = parse_token_expiration(headers.get("github-authentication-token-expiration"))
+    return {
+        "username": username,
+        "status": "invalid" if expires_at and expires_at <= now else "valid",
+        "scopes": headers.get("x-oauth-scopes"),
+        "expires_at": expires_at,
+        "rate_limit": header_number("x-ratelimit-limit"),
+        "rate_remaining": header_number("x-ratelimit-remaining"),
+        "rate_reset": header_number("x-ratelimit-reset"),
+        "validated_at": now,
+    }
+
+
+def _is_fresh(record: Optional[Dict[str, Any]], ttl: float, now: float) -> bool:
+    if not record or record.get("status") not in ("valid", "invalid") or not record.get("validated_at"):
+        return False
+    if record["status"] == "valid" and record.get("expires_at") and record["expires_at"] <= now:
+        return False
+    return now - record["validated_at"] < ttl
+
+
+def validate_tokens(tokens: List[str], force: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Memvalidasi banyak token secara paralel.
+
+    Token yang hasil validasinya masih dalam `token_validation_ttl` tidak
+    dicek ulang (kecuali `force`). Hasil disimpan di state store; kegagalan
+    sementara tidak menimpa hasil sebelumnya.
+
+    Returns:
+        {token: record} dengan status "valid", "invalid", atau "error".
+    """
+    ttl = float(get_setting("token_validation_ttl"))
+    with _validation_lock:
+        store = get_state_store()
+        known = store.token_records()
+        now = time.time()
+
+        results: Dict[str, Dict[str, Any]] = {}
+        stale = []
+        for token in dict.fromkeys(tokens):
+            record = known.get(token_id(token))
+            if not force and _is_fresh(record, ttl, now):
+                results[token] = record
+            else:
+                stale.append(token)
+
+        if stale:
+            workers = max(1, min(len(stale), int(get_setting("token_validation_concurrency"))))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                checked = list(zip(stale, pool.map(inspect_token, stale)))
+
+            updates = {}
+            for token, record in checked:
+                previous = known.get(token_id(token))
+                if record["status"] == "error" and previous:
+                    results[token] = {**previous, "error": record["error"]}
+                    continue
+                results[token] = record
+                if record["status"] != "error":
+                    updates[token_id(token)] = record
+            store.record_tokens(updates)
+            write_log(f"Token validation: {len(stale)} checked, "
+                      f"{sum(1 for _, r in checked if r['status'] == 'invalid')} invalid")
+
+    return results
+
+
+def prune_dead_tokens(dead_tokens: List[str]):
+    """Mengeluarkan token mati dari token cache dan tokens.txt."""
+    dead = set(dead_tokens)
+    if not dead:
+        return
+    with token_files_lock:
+        token_cache = load_json_file(TOKEN_CACHE_FILE)
+        if any(token in token_cache for token in dead):
+            save_json_file(TOKEN_CACHE_FILE, {t: u for t, u in token_cache.items() if t not in dead})
+        tokens = read_file_lines(TOKENS_FILE)
+        if any(token in dead for token in tokens):
+            TOKENS_FILE.write_text("\n".join(t for t in tokens if t not in dead), encoding="utf-8")
+
+
+def load_live_token_cache() -> Dict[str, str]:
+    """Token cache ({token: username}) tanpa token mati, untuk operasi massal.
+
+    Token yang validasinya sudah lewat TTL dicek ulang dulu secara paralel,
+    sehingga token yang dicabut atau kedaluwarsa tidak ikut batch panjang.
+    """
+    token_cache = load_json_file(TOKEN_CACHE_FILE)
+    if not token_cache:
+        return token_cache
+
+    records = validate_tokens(list(token_cache))
+    dead = [token for token, record in records.items() if record["status"] == "invalid"]
+    if dead:
+        print_warning(f"⚠️ {len(dead)} token tidak valid lagi (dicabut/kedaluwarsa), dikeluarkan dari cache: "
+                      + ", ".join(f"@{token_cache[t]}" for t in dead))
+        prune_dead_tokens(dead)
+
+    flagged = [token_cache[t] for t, record in records.items()
+               if record["status"] == "valid" and missing_scopes(record.get("scopes"))]
+    if flagged:
+        print_warning(f"⚠️ {len(flagged)} token tanpa scope {'/'.join(REQUIRED_SCOPES)}: "
+                      + ", ".join(f"@{u}" for u in flagged))
+
+    return {token: username for token, username in token_cache.items() if token not in dead}
+
+
+def _next_revalidation_delay(records: Dict[str, Dict[str, Any]], ttl: float) -> float:
+    now = time.time()
+    due = [record["validated_at"] + ttl - now for record in records.values() if record.get("validated_at")]
+    return max(MIN_REVALIDATE_INTERVAL, min(due) if due else ttl)
+
+
+def start_background_revalidation():
+    """Menjalankan thread daemon yang memvalidasi ulang token cache setiap TTL habis.
+
+    Tanpa output ke layar (hanya log) agar tidak mengganggu menu.
+    """
+    global _background_thread
+    ttl = float(get_setting("token_validation_ttl"))
+    if ttl <= 0 or (_background_thread is not None and _background_thread.is_alive()):
+        return
+
+    def loop():
+        while True:
+            delay = ttl
+            try:
+                token_cache = load_json_file(TOKEN_CACHE_FILE)
+                if token_cache:
+                    records = validate_tokens(list(token_cache))
+                    dead = [token for token, record in records.items() if record["status"] == "invalid"]
+                    if dead:
+                        prune_dead_tokens(dead)
+                        write_log(f"Background validation: {len(dead)} dead token(s) removed: "
+                                  + ", ".join(token_cache[t] for t in dead))
+                    delay = _next_revalidation_delay(records, ttl)
+            except Exception as e:
+                write_log(f"Background token validation error: {str(e)}")
+            time.sleep(delay)
+
+    _background_thread = threading.Thread(target=loop, name="token-revalidation", daemon=True)
+    _background_thread.start()
@@ -1,6 +1,8 @@
 # orchestrator/utils.py
 
 import json
+from typing import Dict, List, Tuple
+
 from .helpers import (
     print_success,
     print_error,
@@ -8,19 +10,24 @@ from .helpers import (
     print_warning,
     print_header,
     run_gh_api,
+    get_rate_governor,
+    get_rate_limit_status,
+    clear_response_cache,
     enable_workflow,
     disable_workflow,
+    get_workflow_id,
     load_json_file,
-    read_file_lines,
-    LOGS_DIR,
+    get_event_log,
+    tail_lines,
+    format_log_line,
+    LOG_FILE,
     TOKEN_CACHE_FILE,
-    INVITED_USERS_FILE,
-    ACCEPTED_USERS_FILE,
-    FORKED_REPOS_FILE,
-    SECRETS_SET_FILE,
-    WORKFLOWS_ENABLED_FILE,
     CONFIG_FILE
 )
+from .executor import run_batch
+from .state import get_state_store
+from .tokens import load_live_token_cache
+from .billing import get_actions_minutes
 
 def check_actions_usage(username: str, token: str) -> int:
     """
@@ -31,56 +38,32 @@ def check_actions_usage(username: str, token: str) -> int:
         token: GitHub personal access token
         
     Returns:
-        Total menit Actions yang telah digunakan
+        Total menit Actions yang telah digunakan (dari snapshot billing ber-TTL)
     """
-    result = run_gh_api(
-        f"api /users/{username}/settings/billing/usage",
-        token,
-        timeout=30
-    )
-    
-    if not result["success"]:
-        print_warning(f"⚠️ Gagal mengambil data billing untuk {username}: {result.get('error')}")
-        return 0
-    
-    try:
-        billing_data = json.loads(result["output"])
-        total_minutes = 0
-        
-        # Parse usageItems (bukan usage)
-        if "usageItems" in billing_data:
-            for item in billing_data["usageItems"]:
-                # Filter hanya Minutes dari Actions (exclude storage/GigabyteHours)
-                if (item.get("product") == "actions" and 
-                    item.get("unitType") == "Minutes"):
-                    total_minutes += item.get("quantity", 0)
-        
-        return int(total_minutes)
-    
-    except (json.JSONDecodeError, KeyError, ValueError) as e:
-        print_warning(f"⚠️ Error parsing billing data untuk {username}: {str(e)}")
-        return 0
+    return get_actions_minutes(username, token)
 
 
 def view_logs():
-    """Menampilkan 50 baris terakhir dari file log."""
+    """Menampilkan 50 event terakhir dari file log (dibaca dari belakang)."""
     print_header("VIEW LOGS")
-    log_file = LOGS_DIR / "setup.log"
+    get_event_log().flush()
 
-    if not log_file.exists():
+    if not LOG_FILE.exists():
         print_warning("Log file tidak ditemukan.")
         return
 
     try:
-        with open(log_file, "r", encoding="utf-8") as f:
-            logs = f.readlines()
+        logs = tail_lines(LOG_FILE, 50)
         if not logs:
             print_info("Log file kosong.")
             return
 
-        print_info(f"Menampilkan {min(len(logs), 50)} baris terakhir:\n")
-        for line in logs[-50:]:
-            print(line.strip())
+        print_info(f"Menampilkan {len(logs)} baris terakhir:\n")
+        for line in logs:
+            print(format_log_line(line))
+        rotated = get_event_log().rotated_segments()
+        if rotated:
+            print_info(f"\n📦 {len(rotated)} segmen lama (gzip) di {LOG_FILE.parent}")
     except Exception as e:
         print_error(f"Error membaca log: {str(e)}")
 
@@ -95,49 +78,125 @@ def clean_cache():
     print(" 4. Forked repos cache")
     print(" 5. Secrets set cache")
     print(" 6. Workflows enabled cache")
-    print(" 7. Hapus semua cache")
+    print(" 7. HTTP response cache (ETag)")
+    print(" 8. Hapus semua cache")
     print(" 0. Batal")
 
-    choice = input("\nPilihan (0-7): ").strip()
+    choice = input("\nPilihan (0-8): ").strip()
 
-    cache_files = {
-        '1': ('Token cache', TOKEN_CACHE_FILE),
-        '2': ('Invited users', INVITED_USERS_FILE),
-        '3': ('Accepted users', ACCEPTED_USERS_FILE),
-        '4': ('Forked repos', FORKED_REPOS_FILE),
-        '5': ('Secrets set', SECRETS_SET_FILE),
-        '6': ('Workflows enabled', WORKFLOWS_ENABLED_FILE)
+    store = get_state_store()
+    state_caches = {
+        '2': ('Invited users', lambda: store.clear_flag("invited")),
+        '3': ('Accepted users', lambda: store.clear_flag("accepted")),
+        '4': ('Forked repos', lambda: store.clear_flag("forked")),
+        '5': ('Secrets set', store.clear_secrets),
+        '6': ('Workflows enabled', store.clear_workflow_enabled)
     }
 
     if choice == '0':
         print_warning("Operasi dibatalkan.")
         return
+    elif choice == '1':
+        if TOKEN_CACHE_FILE.exists() and input("⚠️ Hapus Token cache? (y/n): ").lower() == 'y':
+            TOKEN_CACHE_FILE.unlink()
+            store.clear_tokens()
+            print_success("✅ Token cache berhasil dihapus!")
+        else:
+            print_warning("Token cache tidak ditemukan atau operasi dibatalkan.")
     elif choice == '7':
+        if input("⚠️ Hapus HTTP response cache? (y/n): ").lower() == 'y':
+            clear_response_cache()
+            print_success("✅ HTTP response cache berhasil dihapus!")
+        else:
+            print_warning("Operasi dibatalkan.")
+    elif choice == '8':
         if input("⚠️ Hapus SEMUA cache? (y/n): ").lower() != 'y':
             print_warning("Operasi dibatalkan.")
             return
-        for name, file_path in cache_files.values():
-            if file_path.exists():
-                file_path.unlink()
-                print_success(f"✅ {name} dihapus")
+        if TOKEN_CACHE_FILE.exists():
+            TOKEN_CACHE_FILE.unlink()
+            print_success("✅ Token cache dihapus")
+        store.clear_all()
+        print_success("✅ State (invited, accepted, forked, secrets, workflows, validasi token) dihapus")
+        clear_response_cache()
+        print_success("✅ HTTP response cache dihapus")
         print_success("\n✅ Semua cache berhasil dihapus!")
-    elif choice in cache_files:
-        name, file_path = cache_files[choice]
-        if file_path.exists() and input(f"⚠️ Hapus {name}? (y/n): ").lower() == 'y':
-            file_path.unlink()
-            print_success(f"✅ {name} berhasil dihapus!")
+    elif choice in state_caches:
+        name, clear = state_caches[choice]
+        if input(f"⚠️ Hapus {name}? (y/n): ").lower() == 'y':
+            cleared = clear()
+            print_success(f"✅ {name} berhasil dihapus! ({cleared} entri)")
         else:
-            print_warning(f"{name} tidak ditemukan atau operasi dibatalkan.")
+            print_warning("Operasi dibatalkan.")
     else:
         print_warning("Pilihan tidak valid.")
 
 
+def show_rate_limit_status():
+    """Menampilkan sisa kuota API (rate limit) per akun."""
+    print_header("RATE LIMIT STATUS")
+    config = load_json_file(CONFIG_FILE)
+    token_cache = load_live_token_cache()
+
+    if not config or not token_cache:
+        print_error("Konfigurasi atau token cache tidak ditemukan.")
+        return
+
+    accounts = {config['main_token']: config['main_account_username']}
+    accounts.update(token_cache)
+    governor = get_rate_governor()
+
+    def fetch_budget(entry: Tuple[str, str]) -> Dict:
+        token, _ = entry
+        status = get_rate_limit_status(token)
+        if status["remaining"] is None:
+            # Endpoint rate_limit tidak mengurangi kuota.
+            result = run_gh_api("api rate_limit", token, max_retries=1)
+            if result["success"]:
+                try:
+                    core = json.loads(result["output"]).get("resources", {}).get("core", {})
+                    governor.record_core_limits(token, core)
+                except (json.JSONDecodeError, AttributeError):
+                    pass
+            status = get_rate_limit_status(token)
+        return status
+
+    print(f"{'Akun':<25} {'Sisa/Limit':>15} {'Reset':>10} {'Throttled':>10}")
+    print('-' * 63)
+    for (token, username), status in run_batch(list(accounts.items()), fetch_budget, token_of=lambda entry: entry[0]):
+        if not status or status["remaining"] is None:
+            print_warning(f"@{username:<24} {'?':>15} {'-':>10} {'-':>10}")
+            continue
+        budget = f"{status['remaining']}/{status['limit']}"
+        reset_in = status['reset_in'] or 0
+        reset = f"{reset_in // 60}m {reset_in % 60}s"
+        line = f"@{username:<24} {budget:>15} {reset:>10} {status['throttled_count']:>10}"
+        if status['remaining'] < 100 or status['blocked_for']:
+            print_warning(line)
+        else:
+            print(line)
+
+
+def refresh_workflow_ids(targets: List[Dict[str, str]], workflow_file: str) -> int:
+    """Membangun ulang index workflow ID untuk banyak repo sekaligus."""
+    print_info(f"🔄 Refresh workflow ID untuk {len(targets)} repos...")
+    found = 0
+    lookup = lambda target: get_workflow_id(target['repo'], target['token'], workflow_file, use_cache=False)
+    for target, workflow_id in run_batch(targets, lookup, token_of=lambda target: target['token']):
+        if workflow_id:
+            found += 1
+        else:
+            print_warning(f"  ⚠️ {target['repo']}: workflow '{workflow_file}' tidak ditemukan")
+    print_success(f"✅ Index diperbarui: {found}/{len(targets)} repo memiliki workflow")
+    return found
+
+
 def manual_workflow_control():
     """Kontrol manual enable/disable workflow secara massal."""
     print_header("MANUAL WORKFLOW CONTROL")
     
     config = load_json_file(CONFIG_FILE)
-    token_cache = load_json_file(TOKEN_CACHE_FILE)
+    token_cache = load_live_token_cache()
     
     if not config or not token_cache:
         print_error("Konfigurasi atau token cache tidak ditemukan.")
@@ -158,7 +217,7 @@ def manual_workflow_control():
         print_warning("Operasi dibatalkan.")
         return
     
-    forked_users = read_file_lines(FORKED_REPOS_FILE)
+    forked_users = get_state_store().users_with("forked")
     targets = []
     
     if target_choice in ['1', '3']:
@@ -179,14 +238,23 @@ def manual_workflow_control():
     print("\nPilih aksi:")
     print(" 1. Enable workflow")
     print(" 2. Disable workflow")
+    print(" 3. Refresh workflow ID index")
     print(" 0. Batal")
     
-    action_choice = input("\nPilihan (0-2): ").strip()
+    action_choice = input("\nPilihan (0-3): ").strip()
     
     if action_choice == '0':
         print_warning("Operasi dibatalkan.")
         return
     
+    if action_choice == '3':
+        refresh_workflow_ids(targets, "datagram-runner.yml")
+        return
+    
+    if action_choice not in ('1', '2'):
+        print_warning("Pilihan tidak valid.")
+        return
+    
     workflow_file = "datagram-runner.yml"
     
     if input(f"\n🎯 Akan memproses {len(targets)} repos. Lanjutkan? (y/n): ").lower() != 'y':
@@ -196,7 +264,8 @@ def manual_workflow_control():
     success_count = 0
     failed_count = 0
     
-    for i, target in enumerate(targets, 1):
+    def toggle(entry: Tuple[int, Dict[str, str]]) -> bool:
+        i, target = entry
         repo_path = target['repo']
         token = target['token']
         
@@ -204,24 +273,24 @@ def manual_workflow_control():
         
         if action_choice == '1':
             if enable_workflow(repo_path, token, workflow_file):
+                get_state_store().set_workflow_enabled(repo_path, True)
                 print_success("✅ Workflow enabled")
-                success_count += 1
-            else:
-                print_error("❌ Failed to enable workflow")
-                failed_count += 1
-        elif action_choice == '2':
-            if disable_workflow(repo_path, token, workflow_file):
-                print_success("✅ Workflow disabled")
-                success_count += 1
-            else:
-                print_error("❌ Failed to disable workflow")
-                failed_count += 1
+                return True
+            print_error("❌ Failed to enable workflow")
+            return False
+        if disable_workflow(repo_path, token, workflow_file):
+            get_state_store().set_workflow_enabled(repo_path, False)
+            print_success("✅ Workflow disabled")
+            return True
+        print_error("❌ Failed to disable workflow")
+        return False
+    
+    entries = list(enumerate(targets, 1))
+    for _, ok in run_batch(entries, toggle, token_of=lambda entry: entry[1]['token'], delay=1):
+        if ok:
+            success_count += 1
         else:
-            print_warning("Pilihan tidak valid.")
-            return
-        
-        import time
-        time.sleep(1)
+            failed_count += 1
     
     print_success(f"\n{'='*47}")
     print_success(f"✅ Proses selesai!")
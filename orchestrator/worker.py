@@ -0,0 +1,286 @@
+# orchestrator/worker.py
+"""Worker Python jangka panjang untuk UI C# (JSON-RPC 2.0 lewat stdio).
+
+Dijalankan sekali oleh UI (`python -u -m orchestrator.worker`). Setiap pesan
+dibingkai seperti LSP: header `Content-Length: N` lalu baris kosong lalu N
+byte JSON UTF-8.
+
+UI → worker (request):
+    run       {"action": nama}  menjalankan satu aksi menu (lihat ACTIONS)
+    actions   {}                daftar aksi yang tersedia
+    ping      {}                cek worker masih hidup
+    shutdown  {}                menutup worker
+
+Worker → UI:
+    event (notifikasi)  {"id": id request, "type": success|error|warning|info|header|output, "text": ...}
+    prompt (request)    {"text": ..., "secret": bool}; UI membalas dengan result berupa string
+
+Import, cache (token, response cache, state store) dan connection pool
+HTTP tetap hangat di antara aksi, sehingga aksi tidak membayar biaya start
+interpreter dan import lagi.
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import getpass
+import builtins
+import threading
+import traceback
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+from .helpers import Style, initialize_directories, write_log, track_command, start_metrics_server
+from .setup import (
+    initialize_configuration,
+    import_api_keys,
+    show_api_keys_status,
+    import_github_tokens,
+    validate_github_tokens
+)
+from .collaboration import invoke_auto_invite, invoke_auto_accept, invoke_auto_create_or_sync_fork
+from .secrets import invoke_auto_set_secrets
+from .pipeline import invoke_onboarding_pipeline
+from .deployment import deploy_to_github, invoke_workflow_trigger, show_workflow_status
+from .scheduler import invoke_schedule_planner
+from .tokens import start_background_revalidation
+from .utils import view_logs, clean_cache, manual_workflow_control, show_rate_limit_status
+
+ACTIONS: Dict[str, Callable[[], None]] = {
+    "initialize_configuration": initialize_configuration,
+    "import_api_keys": import_api_keys,
+    "show_api_keys_status": show_api_keys_status,
+    "import_github_tokens": import_github_tokens,
+    "validate_github_tokens": validate_github_tokens,
+    "invoke_auto_invite": invoke_auto_invite,
+    "invoke_auto_accept": invoke_auto_accept,
+    "invoke_auto_create_or_sync_fork": invoke_auto_create_or_sync_fork,
+    "invoke_auto_set_secrets": invoke_auto_set_secrets,
+    "invoke_onboarding_pipeline": invoke_onboarding_pipeline,
+    "deploy_to_github": deploy_to_github,
+    "invoke_schedule_planner": invoke_schedule_planner,
+    "invoke_workflow_trigger": invoke_workflow_trigger,
+    "show_workflow_status": show_workflow_status,
+    "view_logs": view_logs,
+    "clean_cache": clean_cache,
+    "manual_workflow_control": manual_workflow_control,
+    "show_rate_limit_status": show_rate_limit_status,
+}
+
+# Kode error JSON-RPC 2.0.
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+_EVENT_TYPES = {
+    Style.GREEN: "success",
+    Style.FAIL: "error",
+    Style.WARNING: "warning",
+    Style.CYAN: "info",
+    Style.INFO: "info",
+    Style.HEADER: "header",
+}
+_ANSI = re.compile(r"\033\[[0-9;]*m")
+
+
+class RpcChannel:
+    """Membaca dan menulis pesan JSON-RPC berbingkai Content-Length."""
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO):
+        self._reader = reader
+        self._writer = writer
+        self._write_lock = threading.Lock()
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Pesan berikutnya; None jika stdin ditutup. ValueError jika bingkai/JSON rusak."""
+        length = None
+        has_headers = False
+        while True:
+            line = self._reader.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                if length is not None:
+                    break
+                if has_headers:
+                    raise ValueError("Header Content-Length tidak ada")
+                continue
+            has_headers = True
+            name, _, value = line.decode("ascii", "replace").partition(":")
+            if name.strip().lower() == "content-length":
+                try:
+                    length = int(value.strip())
+                except ValueError:
+                    raise ValueError(f"Content-Length tidak valid: {value.strip()!r}") from None
+                if length < 0:
+                    raise ValueError(f"Content-Length tidak valid: {length}")
+        body = self._reader.read(length)
+        if len(body) < length:
+            return None
+        message = json.loads(body.decode("utf-8"))
+        if not isinstance(message, dict):
+            raise ValueError("Pesan harus berupa object JSON")
+        return message
+
+    def send(self, message: Dict[str, Any]):
+        body = json.dumps({"jsonrpc": "2.0", **message}, ensure_ascii=False).encode("utf-8")
+        with self._write_lock:
+            self._writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+            self._writer.flush()
+
+    def notify(self, method: str, params: Dict[str, Any]):
+        self.send({"method": method, "params": params})
+
+
+class EventStream(io.TextIOBase):
+    """Pengganti sys.stdout: setiap baris output dikirim sebagai event bertipe.
+
+    Tipe diambil dari warna print_success/print_error/... (kode warna
+    pertama di baris), teks dikirim tanpa kode ANSI.
+    """
+
+    def __init__(self, channel: RpcChannel):
+        self._channel = channel
+        self._lock = threading.Lock()
+        self._buffer = ""
+        self.request_id: Any = None
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            self._buffer += text
+            *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            self._emit(line)
+        return len(text)
+
+    def flush_line(self):
+        """Mengirim sisa baris yang belum diakhiri newline (mis. sebelum prompt)."""
+        with self._lock:
+            line, self._buffer = self._buffer, ""
+        if line:
+            self._emit(line)
+
+    def _emit(self, line: str):
+        colour = _ANSI.search(line)
+        event_type = _EVENT_TYPES.get(colour.group(0), "output") if colour else "output"
+        self._channel.notify("event", {"id": self.request_id, "type": event_type, "text": _ANSI.sub("", line)})
+
+
+class Worker:
+    def __init__(self, channel: RpcChannel):
+        self.channel = channel
+        self.events = EventStream(channel)
+        self._prompt_counter = 0
+        self._running = True
+
+    def prompt(self, text: str = "", secret: bool = False) -> str:
+        """Pengganti input()/getpass(): meminta jawaban ke UI dan menunggu balasannya."""
+        self.events.flush_line()
+        self._prompt_counter += 1
+        prompt_id = f"prompt-{self._prompt_counter}"
+        self.channel.send({"id": prompt_id, "method": "prompt",
+                           "params": {"request": self.events.request_id, "text": _ANSI.sub("", str(text)), "secret": secret}})
+        while True:
+            message = self.channel.read()
+            if message is None:
+                raise EOFError("UI menutup koneksi")
+            if message.get("id") != prompt_id or "method" in message:
+                self.channel.send({"id": message.get("id"), "error": {
+                    "code": INVALID_REQUEST, "message": "Worker sedang menunggu jawaban prompt"}})
+                continue
+            if "error" in message:
+                raise EOFError(message["error"].get("message", "Prompt dibatalkan"))
+            return str(message.get("result") or "")
+
+    def run_action(self, name: str) -> Dict[str, Any]:
+        action = ACTIONS[name]
+        started = time.time()
+        original_stdout = sys.stdout
+        sys.stdout = self.events
+        try:
+            track_command(name, action)
+        finally:
+            self.events.flush_line()
+            sys.stdout = original_stdout
+        return {"action": name, "elapsed": round(time.time() - started, 3)}
+
+    def handle(self, message: Dict[str, Any]):
+        request_id = message.get("id")
+        method = message.get("method")
+        params = message.get("params") or {}
+        if not isinstance(method, str):
+            if request_id is not None:
+                self.channel.send({"id": request_id, "error": {"code": INVALID_REQUEST, "message": "method wajib diisi"}})
+            return
+
+        if method == "ping":
+            result: Any = {"pid": os.getpid(), "actions": len(ACTIONS)}
+        elif method == "actions":
+            result = sorted(ACTIONS)
+        elif method == "shutdown":
+            self._running = False
+            result = None
+        elif method == "run":
+            name = params.get("action") if isinstance(params, dict) else None
+            if name not in ACTIONS:
+                self.channel.send({"id": request_id, "error": {
+                    "code": INVALID_PARAMS, "message": f"Aksi tidak dikenal: {name}"}})
+                return
+            self.events.request_id = request_id
+            try:
+                result = self.run_action(name)
+            except EOFError as e:
+                result = {"action": name, "cancelled": True, "error": str(e)}
+            except Exception as e:
+                write_log(f"Worker action {name} failed: {traceback.format_exc()}", level="error",
+                          operation=name)
+                self.channel.send({"id": request_id, "error": {"code": INTERNAL_ERROR, "message": str(e)}})
+                return
+            finally:
+                self.events.request_id = None
+        else:
+            if request_id is not None:
+                self.channel.send({"id": request_id, "error": {
+                    "code": METHOD_NOT_FOUND, "message": f"Method tidak dikenal: {method}"}})
+            return
+
+        if request_id is not None:
+            self.channel.send({"id": request_id, "result": result})
+
+    def serve(self):
+        while self._running:
+            try:
+                message = self.channel.read()
+            except ValueError as e:
+                self.channel.send({"id": None, "error": {"code": PARSE_ERROR, "message": str(e)}})
+                continue
+            if message is None:
+                break
+            self.handle(message)
+
+
+def main():
+    channel = RpcChannel(sys.stdin.buffer, sys.stdout.buffer)
+    worker = Worker(channel)
+    # Output liar di luar aksi juga tidak boleh merusak bingkai protokol.
+    sys.stdout = worker.events
+    builtins.input = worker.prompt
+    getpass.getpass = lambda prompt="Password: ", stream=None: worker.prompt(prompt, secret=True)
+
+    initialize_directories()
+    start_background_revalidation()
+    start_metrics_server()
+    channel.notify("ready", {"actions": sorted(ACTIONS)})
+    worker.serve()
+
+
+if __name__ == "__main__":
+    main()